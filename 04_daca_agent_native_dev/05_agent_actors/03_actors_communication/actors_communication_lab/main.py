@@ -5,7 +5,7 @@ from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from dapr.ext.fastapi import DaprActor
 from dapr.actor import Actor, ActorInterface, ActorProxy, ActorId, actormethod
-from dapr.clients import DaprClient
+from event_publisher import event_publisher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -100,7 +100,6 @@ class ChatAgent(Actor, ChatAgentInterface):
 
     async def _publish_conversation_event(self, user_input: dict, response: dict) -> None:
         """Publish a ConversationUpdated event to the user-chat topic."""
-        # Note: publish_event is synchronous and may block; consider asyncio.to_thread in Step 5
         event_data = {
             "actor_id": self._actor_id.id,
             "history_key": self._history_key,
@@ -109,16 +108,14 @@ class ChatAgent(Actor, ChatAgentInterface):
             "input": user_input,
             "output": response
         }
-        with DaprClient() as client:
-            try:
-                client.publish_event(
-                    pubsub_name="daca-pubsub",
-                    topic_name="user-chat",
-                    data=json.dumps(event_data)
-                )
-                logging.info(f"Published event for {self._history_key}: {event_data}")
-            except Exception as e:
-                logging.error(f"Failed to publish event: {e}")
+        event_json = json.dumps(event_data)
+        # Published in the background on the shared client; the turn does not wait for the sidecar.
+        event_publisher.publish(
+            pubsub_name="daca-pubsub",
+            topic_name="user-chat",
+            data=event_json,
+        )
+        logging.info(f"Queued event for {self._history_key}: {len(event_json)} bytes")
 
     async def get_conversation_history(self) -> list[dict]:
         """Retrieve conversation history."""
@@ -258,6 +255,10 @@ async def startup():
     await actor.register_actor(MemoryAgentActor)
     logging.info("Registered actors: ChatAgent, ResponseAgent, MemoryAgentActor")
 
+@app.on_event("shutdown")
+async def shutdown():
+    await event_publisher.close()
+
 # FastAPI endpoints
 @app.post("/chat/{actor_id}")
 async def process_message(actor_id: str, data: Message):
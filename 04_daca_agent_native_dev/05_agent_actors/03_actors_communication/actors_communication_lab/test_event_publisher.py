@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+import pytest
+
+import event_publisher as module
+from event_publisher import EventPublisher
+
+
+class FakeDaprClient:
+    instances: list["FakeDaprClient"] = []
+
+    def __init__(self):
+        self.closed = False
+        self.release = asyncio.Event()
+        self.sent: list[str | bytes] = []
+        FakeDaprClient.instances.append(self)
+
+    async def publish_event(self, pubsub_name, topic_name, data, data_content_type=None):
+        if data == "slow":
+            await self.release.wait()
+        elif data == "bad":
+            raise ConnectionError("sidecar unavailable")
+        self.sent.append(data)
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def health_checks(monkeypatch):
+    threads = []
+    FakeDaprClient.instances = []
+    monkeypatch.setattr(module, "DaprClient", FakeDaprClient)
+    monkeypatch.setattr(module.DaprHealth, "wait_until_ready", lambda: threads.append(threading.current_thread()))
+    return threads
+
+
+@pytest.mark.asyncio
+async def test_events_share_one_client_created_off_the_event_loop(health_checks):
+    publisher = EventPublisher(max_concurrency=2)
+    for n in range(5):
+        assert publisher.publish("pubsub", "topic", f"event {n}")
+    await publisher.close()
+
+    (client,) = FakeDaprClient.instances
+    assert sorted(client.sent) == [f"event {n}" for n in range(5)]
+    assert client.closed
+    assert publisher.published == 5
+    assert health_checks and threading.main_thread() not in health_checks
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_events_still_pending_after_the_timeout(health_checks, caplog):
+    publisher = EventPublisher(max_concurrency=2, timeout=0.05)
+    for data in ("ok", "bad", "slow", "slow"):
+        publisher.publish("pubsub", "topic", data)
+
+    with caplog.at_level("INFO", logger=module.__name__):
+        await publisher.close()
+
+    assert not publisher._tasks
+    assert FakeDaprClient.instances[0].closed
+    assert (publisher.published, publisher.failed, publisher.dropped) == (1, 1, 2)
+    assert "1 published, 1 failed, 2 dropped" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_events_beyond_the_queue_are_dropped(health_checks):
+    publisher = EventPublisher(max_concurrency=1, max_pending=1, timeout=1)
+    accepted = [publisher.publish("pubsub", "topic", "slow") for _ in range(3)]
+    assert accepted == [True, True, False]
+
+    await asyncio.sleep(0.01)
+    FakeDaprClient.instances[0].release.set()
+    await publisher.close()
+    assert (publisher.published, publisher.failed, publisher.dropped) == (2, 0, 1)
@@ -6,7 +6,7 @@ from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from dapr.ext.fastapi import DaprActor
 from dapr.actor import Actor, ActorInterface, ActorProxy, ActorId, Remindable, actormethod
-from dapr.clients import DaprClient
+from event_publisher import event_publisher
 from typing import Callable, Dict, Optional
 
 # Configure logging
@@ -123,16 +123,14 @@ class ChatAgent(Actor, ChatAgentInterface, Remindable):
             "input": user_input,
             "output": response
         }
-        with DaprClient() as client:
-            try:
-                client.publish_event(
-                    pubsub_name="daca-pubsub",
-                    topic_name="user-chat",
-                    data=json.dumps(event_data)
-                )
-                logging.info(f"Published event for {self._history_key}: {event_data}")
-            except Exception as e:
-                logging.error(f"Failed to publish event: {e}")
+        event_json = json.dumps(event_data)
+        # Published in the background on the shared client; the turn does not wait for the sidecar.
+        event_publisher.publish(
+            pubsub_name="daca-pubsub",
+            topic_name="user-chat",
+            data=event_json,
+        )
+        logging.info(f"Queued event for {self._history_key}: {len(event_json)} bytes")
 
     async def get_conversation_history(self) -> list[dict]:
         """Retrieve conversation history."""
@@ -170,6 +168,10 @@ async def startup():
     await actor.register_actor(ChatAgent)
     logging.info(f"Registered actor: {ChatAgent.__name__}")
 
+@app.on_event("shutdown")
+async def shutdown():
+    await event_publisher.close()
+
 # FastAPI endpoints to invoke the actor
 @app.post("/chat/{actor_id}")
 async def process_message(actor_id: str, data: Message):
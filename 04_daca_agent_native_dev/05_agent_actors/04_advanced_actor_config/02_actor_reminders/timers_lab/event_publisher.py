@@ -0,0 +1,107 @@
+"""
+Process-wide publisher for actor pub/sub events.
+
+`with DaprClient() as client: client.publish_event(...)` inside an actor method opens a new
+gRPC channel for every event and blocks the event loop for the whole round trip. Instead,
+all actors in this process share one long-lived async `DaprClient`:
+
+- `publish()` hands the event to a background task and returns at once, so the actor turn
+  never waits for the sidecar.
+- At most `max_concurrency` publishes are in flight; up to `max_pending` more wait for a
+  slot. Beyond that, new events are dropped and logged rather than piling up in memory.
+- Each publish is bounded by `timeout` seconds.
+
+Call `await event_publisher.close()` on shutdown to flush pending events; events still
+pending after `timeout` seconds are cancelled and counted as dropped.
+"""
+
+import asyncio
+import logging
+import os
+
+from dapr.aio.clients import DaprClient
+from dapr.clients.health import DaprHealth
+
+logger = logging.getLogger(__name__)
+
+
+class EventPublisher:
+    def __init__(self, max_concurrency: int = 16, max_pending: int = 1000, timeout: float = 5.0):
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._client: DaprClient | None = None
+        self._client_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._tasks: set[asyncio.Task] = set()
+        self.published = 0
+        self.failed = 0
+        self.dropped = 0
+
+    async def _get_client(self) -> DaprClient:
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    logger.info("Creating shared async Dapr client for event publishing.")
+                    # DaprClient() runs a blocking sidecar health check. Wait for the sidecar in a
+                    # worker thread first so that check passes at once on the event loop.
+                    await asyncio.to_thread(DaprHealth.wait_until_ready)
+                    self._client = DaprClient()
+        return self._client
+
+    def publish(
+        self,
+        pubsub_name: str,
+        topic_name: str,
+        data: str | bytes,
+        data_content_type: str | None = None,
+    ) -> bool:
+        """Queue an event for publication. Returns False if it was dropped because the queue is full."""
+        if len(self._tasks) >= self.max_concurrency + self.max_pending:
+            self.dropped += 1
+            logger.error(f"Event publisher is full ({len(self._tasks)} events pending); dropping event for '{topic_name}'.")
+            return False
+        task = asyncio.create_task(self._publish(pubsub_name, topic_name, data, data_content_type))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _publish(self, pubsub_name: str, topic_name: str, data: str | bytes, data_content_type: str | None) -> None:
+        async with self._slots:
+            try:
+                client = await self._get_client()
+                await asyncio.wait_for(
+                    client.publish_event(
+                        pubsub_name=pubsub_name,
+                        topic_name=topic_name,
+                        data=data,
+                        data_content_type=data_content_type,
+                    ),
+                    self.timeout,
+                )
+                self.published += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Failed to publish event to '{topic_name}': {e}")
+
+    async def close(self) -> None:
+        """Wait up to `timeout` seconds for pending events, cancel the rest, then close the client."""
+        if self._tasks:
+            _, unfinished = await asyncio.wait(set(self._tasks), timeout=self.timeout)
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+            if unfinished:
+                self.dropped += len(unfinished)
+                logger.warning(f"Cancelled {len(unfinished)} events still pending at shutdown.")
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+        logger.info(f"Event publisher closed: {self.published} published, {self.failed} failed, {self.dropped} dropped.")
+
+
+event_publisher = EventPublisher(
+    max_concurrency=int(os.getenv("EVENT_PUBLISH_CONCURRENCY", "16")),
+    max_pending=int(os.getenv("EVENT_PUBLISH_MAX_PENDING", "1000")),
+    timeout=float(os.getenv("EVENT_PUBLISH_TIMEOUT_SECONDS", "5")),
+)
@@ -0,0 +1,113 @@
+"""
+Benchmark: Protobuf ConversationEvent vs the double-encoded JSON event on the user-chat topic.
+
+Publisher encoding and subscriber decoding are timed; the CloudEvent in between is built
+the way Dapr delivers it to `/subscribe`, and its size is reported as bytes on the wire:
+
+- json:     publisher `json.dumps(event)`, delivered as a JSON string in the CloudEvent's
+            `data`; subscriber `json.loads` of the CloudEvent, then of the nested string.
+- protobuf: publisher `ConversationEvent.SerializeToString()` with data_content_type
+            application/protobuf, delivered base64-encoded in `data_base64`; subscriber
+            decodes it with `decode_conversation_event` from main.py.
+- protobuf_raw: as protobuf, for subscriptions with rawPayload, where the body is the
+            serialized event itself.
+
+    uv run python bench_events.py --events 20000 --content-words 40
+"""
+
+import argparse
+import base64
+import json
+import time
+import uuid
+
+import message_pb2
+from main import PROTOBUF_CONTENT_TYPE, decode_conversation_event
+
+WORDS = "hello how can the agent help you with your order invoice refund or schedule today".split()
+
+
+def cloud_event(**data_fields: object) -> bytes:
+    """CloudEvent envelope with the attributes Dapr adds on publish."""
+    return json.dumps({
+        "id": str(uuid.uuid4()),
+        "source": "chat-agent",
+        "type": "com.dapr.event.sent",
+        "specversion": "1.0",
+        "pubsubname": "daca-pubsub",
+        "topic": "user-chat",
+        "traceid": "00-" + uuid.uuid4().hex + "-" + uuid.uuid4().hex[:16] + "-01",
+        "traceparent": "00-" + uuid.uuid4().hex + "-" + uuid.uuid4().hex[:16] + "-01",
+        "tracestate": "",
+        **data_fields,
+    }).encode("utf-8")
+
+
+def event_fields(index: int, content_words: int) -> dict:
+    content = " ".join(WORDS[(index + i) % len(WORDS)] for i in range(content_words))
+    return {
+        "actor_id": f"user{index % 100}",
+        "history_key": f"history-user{index % 100}",
+        "actor_type": "ChatAgent",
+        "event_type": "ConversationUpdated",
+        "input": {"role": "user", "content": content},
+        "output": {"role": "assistant", "content": f"Got your message: {content}"},
+    }
+
+
+# Each path: (publisher encode, what Dapr delivers to /subscribe, subscriber decode).
+# Only encode and decode run in the app, so only they are timed.
+PATHS = {
+    "json": (
+        lambda fields: json.dumps(fields).encode("utf-8"),
+        lambda payload: (cloud_event(datacontenttype="text/plain", data=payload.decode("utf-8")), "application/cloudevents+json"),
+        lambda body, _: json.loads(json.loads(body)["data"])["input"]["content"],
+    ),
+    "protobuf": (
+        lambda fields: message_pb2.ConversationEvent(**fields).SerializeToString(),
+        lambda payload: (
+            cloud_event(datacontenttype=PROTOBUF_CONTENT_TYPE, data_base64=base64.b64encode(payload).decode("ascii")),
+            "application/cloudevents+json",
+        ),
+        lambda body, content_type: decode_conversation_event(body, content_type).input.content,
+    ),
+    "protobuf_raw": (
+        lambda fields: message_pb2.ConversationEvent(**fields).SerializeToString(),
+        lambda payload: (payload, PROTOBUF_CONTENT_TYPE),
+        lambda body, content_type: decode_conversation_event(body, content_type).input.content,
+    ),
+}
+
+
+def measure(path: str, events: list[dict]) -> dict[str, float]:
+    encode, deliver, decode = PATHS[path]
+    started = time.perf_counter()
+    payloads = [encode(fields) for fields in events]
+    encode_seconds = time.perf_counter() - started
+    deliveries = [deliver(payload) for payload in payloads]
+    started = time.perf_counter()
+    contents = [decode(body, content_type) for body, content_type in deliveries]
+    decode_seconds = time.perf_counter() - started
+    assert contents == [fields["input"]["content"] for fields in events]
+    return {
+        "events_per_second": round(len(events) / (encode_seconds + decode_seconds)),
+        "publish_encode_us": round(encode_seconds / len(events) * 1_000_000, 2),
+        "subscribe_decode_us": round(decode_seconds / len(events) * 1_000_000, 2),
+        "payload_bytes_per_event": round(sum(map(len, payloads)) / len(events), 1),
+        "wire_bytes_per_event": round(sum(len(body) for body, _ in deliveries) / len(events), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--content-words", type=int, default=40, help="Words per message content")
+    args = parser.parse_args()
+
+    events = [event_fields(i, args.content_words) for i in range(args.events)]
+    results = {path: measure(path, events) for path in PATHS}
+    print(json.dumps({"config": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
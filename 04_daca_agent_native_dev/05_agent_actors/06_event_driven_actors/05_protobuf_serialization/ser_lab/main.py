@@ -1,11 +1,13 @@
+import base64
 import logging
 import json
 from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel
 from dapr.ext.fastapi import DaprActor
 from dapr.actor import Actor, ActorInterface, ActorProxy, ActorId, actormethod
-from dapr.clients import DaprClient
-from google.protobuf.json_format import MessageToDict, ParseDict
+from event_publisher import event_publisher
+from google.protobuf.json_format import MessageToDict, ParseDict, ParseError
+from google.protobuf.message import DecodeError
 import message_pb2
 
 # Configure logging
@@ -30,115 +32,147 @@ class ChatAgentInterface(ActorInterface):
     async def get_conversation_history(self) -> list[dict] | None:
         pass
 
+# Conversation history is stored as serialized protobuf. Serialized messages of a repeated
+# field can be concatenated, so a turn appends its new `Message` records as bytes instead of
+# parsing and re-serializing the whole history. Truncation to the last MAX_HISTORY_MESSAGES
+# happens in a compaction pass once the stored history reaches COMPACT_AT_MESSAGES, so the
+# bytes written per turn stay bounded however long the conversation runs.
+MAX_HISTORY_MESSAGES = 10  # last 5 exchanges
+COMPACT_AT_MESSAGES = 2 * MAX_HISTORY_MESSAGES
+
+
+def encode_messages(*messages: dict) -> bytes:
+    """Serialize messages as `ConversationHistory` records that can be appended to a history."""
+    return message_pb2.ConversationHistory(
+        messages=[message_pb2.Message(role=m["role"], content=m["content"]) for m in messages]
+    ).SerializeToString()
+
+
+PROTOBUF_CONTENT_TYPE = "application/protobuf"
+
+
+def decode_conversation_event(body: bytes, content_type: str | None) -> message_pb2.ConversationEvent:
+    """
+    Decode a ConversationEvent delivered by Dapr. Binary event data arrives base64-encoded in
+    the CloudEvent's `data_base64`, or as the raw body for subscriptions with rawPayload. JSON
+    events from publishers that predate the Protobuf envelope are still accepted.
+    """
+    if content_type and content_type.split(";")[0].strip() in (PROTOBUF_CONTENT_TYPE, "application/octet-stream"):
+        return message_pb2.ConversationEvent.FromString(body)
+    cloud_event = json.loads(body)
+    if "data_base64" in cloud_event:
+        return message_pb2.ConversationEvent.FromString(base64.b64decode(cloud_event["data_base64"]))
+    data = cloud_event.get("data", {})
+    return ParseDict(json.loads(data) if isinstance(data, str) else data, message_pb2.ConversationEvent(), ignore_unknown_fields=True)
+
+
+def as_history_bytes(value: object) -> bytes:
+    """State holding bytes comes back from the JSON state serializer as a base64 string."""
+    if isinstance(value, str):
+        return base64.b64decode(value)
+    return value or b""
+
+
 # Implement the actor
 class ChatAgent(Actor, ChatAgentInterface):
     def __init__(self, ctx, actor_id):
         super().__init__(ctx, actor_id)
         self._history_key = f"history-{actor_id.id}"
         self._actor_id = actor_id
+        self._history = b""
+        self._message_count = 0
 
     async def _on_activate(self) -> None:
-        """Initialize state on actor activation and attempt migration."""
+        """Load the history once per activation, migrating a legacy JSON list to Protobuf."""
         logging.info(f"Activating actor for {self._history_key}")
+        found, stored = await self._state_manager.try_get_state(self._history_key)
+        history = message_pb2.ConversationHistory()
+        if isinstance(stored, list):
+            logging.warning(f"Migrating legacy list state for {self._history_key} to Protobuf.")
+            for item in stored[-MAX_HISTORY_MESSAGES:]:
+                history.messages.add(role=item.get("role", ""), content=item.get("content", ""))
+            await self._save_history(history.SerializeToString(), len(history.messages))
+            return
         try:
-            history_bytes = await self._state_manager.get_state(self._history_key)
-            if not history_bytes:
-                logging.info(f"State not found for {self._history_key}, initializing with Protobuf")
-                await self._state_manager.set_state(self._history_key, message_pb2.ConversationHistory().SerializeToString())
-            else:
-                try:
-                    history = message_pb2.ConversationHistory()
-                    history.ParseFromString(history_bytes)
-                    logging.info(f"Protobuf state found for {self._history_key}: {len(history_bytes)} bytes")
-                except Exception as e:
-                    logging.warning(f"Failed to parse Protobuf state for {self._history_key}. Attempting migration from list.")
-                    try:
-                        # Attempt to load as a list (assuming this was the old format)
-                        old_history_list = json.loads(history_bytes.decode('utf-8'))
-                        new_history = message_pb2.ConversationHistory()
-                        for item in old_history_list:
-                            msg = new_history.messages.add()
-                            msg.role = item.get('role', '')
-                            msg.content = item.get('content', '')
-                        await self._state_manager.set_state(self._history_key, new_history.SerializeToString())
-                        logging.info(f"Successfully migrated state for {self._history_key} to Protobuf.")
-                    except Exception as migration_error:
-                        logging.error(f"Failed to migrate state for {self._history_key}: {migration_error}")
-                        # Consider initializing a new Protobuf state if migration fails
-                        await self._state_manager.set_state(self._history_key, message_pb2.ConversationHistory().SerializeToString())
+            stored_bytes = as_history_bytes(stored) if found else b""
+            history.ParseFromString(stored_bytes)
+            self._history = stored_bytes
         except Exception as e:
-            logging.warning(f"Non-critical error in _on_activate: {e}")
-            await self._state_manager.set_state(self._history_key, message_pb2.ConversationHistory().SerializeToString())
+            logging.error(f"Failed to parse Protobuf state for {self._history_key}, starting over: {e}")
+            history.Clear()
+            await self._save_history(b"", 0)
+        self._message_count = len(history.messages)
+        logging.info(f"Protobuf state for {self._history_key}: {len(self._history)} bytes, {self._message_count} messages")
+
+    async def _save_history(self, history: bytes, message_count: int) -> None:
+        # The in-memory copy only changes once the state write has been accepted.
+        await self._state_manager.set_state(self._history_key, history)
+        self._history = history
+        self._message_count = message_count
+
+    @staticmethod
+    def _compacted(history_bytes: bytes) -> bytes:
+        """Re-encode a history keeping only the last MAX_HISTORY_MESSAGES messages."""
+        history = message_pb2.ConversationHistory()
+        history.ParseFromString(history_bytes)
+        del history.messages[:-MAX_HISTORY_MESSAGES]
+        return history.SerializeToString()
 
     async def process_message(self, user_input: dict) -> dict:
-        """Process a user message and append to history with Protobuf serialization."""
+        """Process a user message and append it and the reply to the Protobuf history."""
         try:
             logging.info(f"Processing message for {self._history_key}: {user_input}")
-            # Load history
-            history_bytes = await self._state_manager.get_state(self._history_key)
-            history = message_pb2.ConversationHistory()
-            if history_bytes:
-                history.ParseFromString(history_bytes)
-            else:
-                history = message_pb2.ConversationHistory()
-            
-            # Append user message
-            user_message = history.messages.add()
-            user_message.role = user_input["role"]
-            user_message.content = user_input["content"]
-            
+
             # Generate response
             response_content = f"Got your message: {user_input['content']}"
             response = {"role": "assistant", "content": response_content}
-            response_message = history.messages.add()
-            response_message.role = response["role"]
-            response_message.content = response["content"]
-            
-            # Limit to last 5 exchanges (10 messages, as each exchange has 2 messages)
-            if len(history.messages) > 10:
-                history.messages[:] = history.messages[-10:]
-            
-            # Save updated history
-            await self._state_manager.set_state(self._history_key, history.SerializeToString())
+
+            # Append only the two new records; the existing history is not parsed.
+            history = self._history + encode_messages(user_input, response)
+            message_count = self._message_count + 2
+            if message_count >= COMPACT_AT_MESSAGES:
+                history, message_count = self._compacted(history), MAX_HISTORY_MESSAGES
+                logging.info(f"Compacted history for {self._history_key} to {len(history)} bytes")
+            await self._save_history(history, message_count)
             logging.info(f"Processed message for {self._history_key}: {user_input['content']}")
-            
+
             # Publish event
             await self._publish_conversation_event(user_input, response)
-            
+
             return response
         except Exception as e:
             logging.error(f"Error processing message for {self._history_key}: {e}")
             raise
 
     async def _publish_conversation_event(self, user_input: dict, response: dict) -> None:
-        """Publish a ConversationUpdated event to the user-chat topic."""
-        event_data = {
-            "actor_id": self._actor_id.id,
-            "history_key": self._history_key,
-            "actor_type": "ChatAgent",
-            "event_type": "ConversationUpdated",
-            "input": user_input,
-            "output": response
-        }
-        with DaprClient() as client:
-            try:
-                client.publish_event(
-                    pubsub_name="daca-pubsub",
-                    topic_name="user-chat",
-                    data=json.dumps(event_data)
-                )
-                logging.info(f"Published event for {self._history_key}: {event_data}")
-            except Exception as e:
-                logging.error(f"Failed to publish event: {e}")
+        """Publish a ConversationUpdated event to the user-chat topic as a Protobuf ConversationEvent."""
+        event = message_pb2.ConversationEvent(
+            actor_id=self._actor_id.id,
+            history_key=self._history_key,
+            actor_type="ChatAgent",
+            event_type="ConversationUpdated",
+            input=message_pb2.Message(role=user_input["role"], content=user_input["content"]),
+            output=message_pb2.Message(role=response["role"], content=response["content"]),
+        )
+        event_bytes = event.SerializeToString()
+        # Published in the background on the shared client; the turn does not wait for the sidecar.
+        event_publisher.publish(
+            pubsub_name="daca-pubsub",
+            topic_name="user-chat",
+            data=event_bytes,
+            data_content_type=PROTOBUF_CONTENT_TYPE,
+        )
+        logging.info(f"Queued event for {self._history_key}: {len(event_bytes)} bytes")
 
     async def get_conversation_history(self) -> list[dict]:
-        """Retrieve conversation history with Protobuf deserialization."""
+        """Retrieve the last MAX_HISTORY_MESSAGES messages with Protobuf deserialization."""
         try:
-            history_bytes = await self._state_manager.get_state(self._history_key)
-            if not history_bytes:
+            if not self._history:
                 return []
             history = message_pb2.ConversationHistory()
-            history.ParseFromString(history_bytes)
+            history.ParseFromString(self._history)
+            # Appended records may not be compacted yet; expose the same window either way.
+            del history.messages[:-MAX_HISTORY_MESSAGES]
             # Convert Protobuf to list of dicts for compatibility
             history_dict = MessageToDict(history)
             return history_dict.get("messages", [])
@@ -152,6 +186,10 @@ async def startup():
     await actor.register_actor(ChatAgent)
     logging.info(f"Registered actor: {ChatAgent.__name__}")
 
+@app.on_event("shutdown")
+async def shutdown():
+    await event_publisher.close()
+
 @app.post("/test/json")
 async def test_json(message: Message):
     raw = json.dumps(message.model_dump()).encode("utf-8")
@@ -189,17 +227,15 @@ async def get_conversation_history(actor_id: str):
 
 # Subscription endpoint for pub/sub events
 @app.post("/subscribe")
-async def subscribe_message(data: dict):
-    """Handle events from the user-chat topic."""
+async def subscribe_message(request: Request):
+    """Handle Protobuf ConversationEvents from the user-chat topic."""
     try:
-        logging.info(f"\n\n->[SUBSCRIPTION] Received event: {data}\n\n")
-        event_data_raw = data.get("data", "{}")
-        event_data = json.loads(event_data_raw)
-        user_id = event_data.get("actor_id", "unknown")
-        input_message = event_data.get("input", {}).get("content", "no message")
-        output_message = event_data.get("output", {}).get("content", "no response")
+        event = decode_conversation_event(await request.body(), request.headers.get("content-type"))
+        user_id = event.actor_id or "unknown"
+        input_message = event.input.content or "no message"
+        output_message = event.output.content or "no response"
         logging.info(f"Received event: User {user_id} sent '{input_message}', got '{output_message}'")
         return {"status": "SUCCESS"}
-    except json.JSONDecodeError as e:
+    except (ValueError, DecodeError, ParseError) as e:
         logging.error(f"Failed to decode event data: {e}")
         return {"status": "FAILED"}
\ No newline at end of file
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rmessage.proto\"(\n\x07Message\x12\x0c\n\x04role\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\"1\n\x13\x43onversationHistory\x12\x1a\n\x08messages\x18\x01 \x03(\x0b\x32\x08.Messageb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rmessage.proto\"(\n\x07Message\x12\x0c\n\x04role\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\"1\n\x13\x43onversationHistory\x12\x1a\n\x08messages\x18\x01 \x03(\x0b\x32\x08.Message\"\x95\x01\n\x11\x43onversationEvent\x12\x10\n\x08\x61\x63tor_id\x18\x01 \x01(\t\x12\x13\n\x0bhistory_key\x18\x02 \x01(\t\x12\x12\n\nactor_type\x18\x03 \x01(\t\x12\x12\n\nevent_type\x18\x04 \x01(\t\x12\x17\n\x05input\x18\x05 \x01(\x0b\x32\x08.Message\x12\x18\n\x06output\x18\x06 \x01(\x0b\x32\x08.Messageb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -35,4 +35,6 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_MESSAGE']._serialized_end=57
   _globals['_CONVERSATIONHISTORY']._serialized_start=59
   _globals['_CONVERSATIONHISTORY']._serialized_end=108
+  _globals['_CONVERSATIONEVENT']._serialized_start=111
+  _globals['_CONVERSATIONEVENT']._serialized_end=260
 # @@protoc_insertion_point(module_scope)
@@ -18,3 +18,19 @@ class ConversationHistory(_message.Message):
     MESSAGES_FIELD_NUMBER: _ClassVar[int]
     messages: _containers.RepeatedCompositeFieldContainer[Message]
     def __init__(self, messages: _Optional[_Iterable[_Union[Message, _Mapping]]] = ...) -> None: ...
+
+class ConversationEvent(_message.Message):
+    __slots__ = ("actor_id", "history_key", "actor_type", "event_type", "input", "output")
+    ACTOR_ID_FIELD_NUMBER: _ClassVar[int]
+    HISTORY_KEY_FIELD_NUMBER: _ClassVar[int]
+    ACTOR_TYPE_FIELD_NUMBER: _ClassVar[int]
+    EVENT_TYPE_FIELD_NUMBER: _ClassVar[int]
+    INPUT_FIELD_NUMBER: _ClassVar[int]
+    OUTPUT_FIELD_NUMBER: _ClassVar[int]
+    actor_id: str
+    history_key: str
+    actor_type: str
+    event_type: str
+    input: Message
+    output: Message
+    def __init__(self, actor_id: _Optional[str] = ..., history_key: _Optional[str] = ..., actor_type: _Optional[str] = ..., event_type: _Optional[str] = ..., input: _Optional[_Union[Message, _Mapping]] = ..., output: _Optional[_Union[Message, _Mapping]] = ...) -> None: ...
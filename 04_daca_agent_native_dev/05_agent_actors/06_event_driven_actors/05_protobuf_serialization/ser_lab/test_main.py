@@ -0,0 +1,109 @@
+import pytest
+from dapr.actor import ActorId
+
+import main
+import message_pb2
+from main import COMPACT_AT_MESSAGES, MAX_HISTORY_MESSAGES, ChatAgent, encode_messages
+
+
+class InMemoryStateManager:
+    """The part of Dapr's `ActorStateManager` ChatAgent uses, kept in a dict."""
+
+    def __init__(self):
+        self.state: dict[str, object] = {}
+        self.fail_writes = False
+
+    async def try_get_state(self, key: str) -> tuple[bool, object]:
+        return (key in self.state, self.state.get(key))
+
+    async def set_state(self, key: str, value: object) -> None:
+        if self.fail_writes:
+            raise ConnectionError("state store unavailable")
+        self.state[key] = value
+
+
+@pytest.fixture(autouse=True)
+def published(monkeypatch):
+    events = []
+    monkeypatch.setattr(main.event_publisher, "publish", lambda **event: events.append(event) or True)
+    return events
+
+
+@pytest.fixture
+def state_manager() -> InMemoryStateManager:
+    return InMemoryStateManager()
+
+
+async def chat_agent(state_manager: InMemoryStateManager) -> ChatAgent:
+    # Skips Actor.__init__, which needs a Dapr runtime context.
+    agent = ChatAgent.__new__(ChatAgent)
+    agent._state_manager = state_manager
+    agent._actor_id = ActorId("user-1")
+    agent._history_key = "history-user-1"
+    agent._history = b""
+    agent._message_count = 0
+    await agent._on_activate()
+    return agent
+
+
+def stored_messages(state_manager: InMemoryStateManager) -> list[str]:
+    return [m.content for m in message_pb2.ConversationHistory.FromString(state_manager.state["history-user-1"]).messages]
+
+
+def user(n: int) -> dict:
+    return {"role": "user", "content": f"message {n}"}
+
+
+@pytest.mark.asyncio
+async def test_turns_append_their_records_to_the_stored_bytes(state_manager, published):
+    agent = await chat_agent(state_manager)
+    await agent.process_message(user(1))
+    first = state_manager.state["history-user-1"]
+    await agent.process_message(user(2))
+
+    reply = {"role": "assistant", "content": "Got your message: message 2"}
+    assert state_manager.state["history-user-1"] == first + encode_messages(user(2), reply)
+    assert stored_messages(state_manager) == [
+        "message 1", "Got your message: message 1", "message 2", "Got your message: message 2"
+    ]
+    assert len(published) == 2
+
+
+@pytest.mark.asyncio
+async def test_history_is_compacted_to_the_latest_messages(state_manager):
+    agent = await chat_agent(state_manager)
+    turns = COMPACT_AT_MESSAGES // 2
+    for n in range(turns - 1):
+        await agent.process_message(user(n))
+    assert len(stored_messages(state_manager)) == COMPACT_AT_MESSAGES - 2
+
+    await agent.process_message(user(turns - 1))
+    messages = stored_messages(state_manager)
+    assert len(messages) == MAX_HISTORY_MESSAGES
+    assert messages[-2:] == [f"message {turns - 1}", f"Got your message: message {turns - 1}"]
+    assert agent._message_count == MAX_HISTORY_MESSAGES
+    assert await agent.get_conversation_history() == [
+        {"role": role, "content": content} for role, content in zip(["user", "assistant"] * turns, messages, strict=False)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_write_leaves_the_in_memory_history_unchanged(state_manager):
+    agent = await chat_agent(state_manager)
+    for n in range(COMPACT_AT_MESSAGES // 2 - 1):
+        await agent.process_message(user(n))
+    history, message_count = agent._history, agent._message_count
+
+    # This turn would compact the history.
+    state_manager.fail_writes = True
+    with pytest.raises(ConnectionError):
+        await agent.process_message(user(99))
+    assert (agent._history, agent._message_count) == (history, message_count)
+
+
+@pytest.mark.asyncio
+async def test_legacy_list_state_is_migrated_on_activation(state_manager):
+    state_manager.state["history-user-1"] = [user(n) for n in range(MAX_HISTORY_MESSAGES + 2)]
+    agent = await chat_agent(state_manager)
+    assert stored_messages(state_manager) == [f"message {n}" for n in range(2, MAX_HISTORY_MESSAGES + 2)]
+    assert agent._message_count == MAX_HISTORY_MESSAGES
@@ -0,0 +1,276 @@
+"""
+Load-generation benchmark for BaseActor, without a Dapr sidecar or a model API key.
+
+The actors run inside Dapr's own `ActorManager` (so activation, pre/post hooks, state
+serialization and the per-turn transactional save are the real code paths), backed by:
+
+- `InMemoryActorClient`: a stand-in for the sidecar's actor state/reminder API, with an
+  optional per-call latency.
+- `FakeEngineAdapter`: registered as engine type "fake"; answers after a configurable delay.
+
+Each of N actor ids runs its workload sequentially (Dapr actors are single-threaded) while
+all actors run concurrently: messages through ProcessMessage, reminders scheduled with
+ScheduleReminder and then fired, knowledge writes and semantic QueryKnowledge calls.
+
+    uv run python benchmarks/actor_bench.py --actors 200 --messages 20 --engine-latency-ms 50
+
+Results (throughput, p50/p95/p99 per operation, memory and state bytes per actor) are
+printed as JSON, or written to `--output`, so runs can be compared over time.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from typing import Any, Literal
+
+from dapr.actor import ActorId, Remindable
+from dapr.actor.runtime._type_information import ActorTypeInformation
+from dapr.actor.runtime.context import ActorRuntimeContext
+from dapr.actor.runtime.manager import ActorManager
+from dapr.clients.base import DaprActorClientBase
+from dapr.serializers import DefaultJSONSerializer
+
+from ambient_actor.actors.base_actor import BaseActor
+from ambient_actor.actors.metrics import MeteredStateSerializer
+from ambient_actor.actors.reminders import reminder_handler
+from ambient_actor.agents.engine_adapter import AgenticEngineAdapter
+from ambient_actor.agents.engine_registry import engine_registry
+
+
+class InMemoryActorClient(DaprActorClientBase):
+    """Actor state and reminders kept in process memory, as the sidecar would store them."""
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.state: dict[tuple[str, str, str], bytes] = {}
+        self.reminders: dict[tuple[str, str, str], bytes] = {}
+        self.calls: dict[str, int] = {}
+
+    async def _round_trip(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+    async def invoke_method(self, actor_type: str, actor_id: str, method: str, data: bytes | None = None) -> bytes:
+        raise NotImplementedError("Actor-to-actor calls are not simulated")
+
+    async def save_state_transactionally(self, actor_type: str, actor_id: str, data: bytes) -> None:
+        await self._round_trip("save_state")
+        for operation in json.loads(data):
+            key = (actor_type, actor_id, operation["request"]["key"])
+            if operation["operation"] == "delete":
+                self.state.pop(key, None)
+            else:
+                self.state[key] = json.dumps(operation["request"]["value"]).encode("utf-8")
+
+    async def get_state(self, actor_type: str, actor_id: str, name: str) -> bytes:
+        await self._round_trip("get_state")
+        return self.state.get((actor_type, actor_id, name), b"")
+
+    async def register_reminder(self, actor_type: str, actor_id: str, name: str, data: bytes) -> None:
+        await self._round_trip("register_reminder")
+        self.reminders[(actor_type, actor_id, name)] = data
+
+    async def unregister_reminder(self, actor_type: str, actor_id: str, name: str) -> None:
+        await self._round_trip("unregister_reminder")
+        self.reminders.pop((actor_type, actor_id, name), None)
+
+    async def register_timer(self, actor_type: str, actor_id: str, name: str, data: bytes) -> None:
+        await self._round_trip("register_timer")
+
+    async def unregister_timer(self, actor_type: str, actor_id: str, name: str) -> None:
+        await self._round_trip("unregister_timer")
+
+    def state_bytes(self, actor_type: str) -> int:
+        return sum(len(value) for (type_name, _, _), value in self.state.items() if type_name == actor_type)
+
+
+@dataclass
+class FakeEngineAdapter(AgenticEngineAdapter):
+    latency_seconds: float = 0.0
+    reply: str = "ok"
+
+    async def initialize(self, agent_name: str, agent_instructions: str, agent_tools: list[Any], model: str | Any) -> None:
+        pass
+
+    async def process_input(
+        self,
+        input_text: str | list[dict[str, str]],
+        run_method: Literal["run", "run_sync", 'stream'],
+        context: dict[str, object] | None = None,
+    ) -> dict[str, object]:
+        await asyncio.sleep(self.latency_seconds)
+        conversation = [{"role": "user", "content": input_text}] if isinstance(input_text, str) else list(input_text)
+        conversation.append({"role": "assistant", "content": self.reply})
+        return {"conversation": conversation, "run_method": run_method, "final_output": self.reply}
+
+
+@engine_registry.register("fake")
+async def create_fake_engine(engine_config: dict[str, object]) -> FakeEngineAdapter:
+    return FakeEngineAdapter(latency_seconds=float(engine_config.get("latency_ms", 0)) / 1000)  # type: ignore[arg-type]
+
+
+class BenchActor(BaseActor, Remindable):
+    """BaseActor with a no-op handler for the benchmark's reminders."""
+
+    # Dapr only treats an actor type as remindable if `Remindable` is among its direct bases.
+
+    @reminder_handler(prefix="bench_")
+    async def _on_bench_reminder(self, name: str, task_data: dict[str, object]) -> None:
+        pass
+
+
+def _peak_rss_bytes() -> int:
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": at(0.50),
+        "p95_ms": at(0.95),
+        "p99_ms": at(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+class Bench:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.client = InMemoryActorClient(latency_seconds=args.state_latency_ms / 1000)
+        self.serializer = DefaultJSONSerializer()
+        ctx = ActorRuntimeContext(
+            ActorTypeInformation.create(BenchActor),
+            self.serializer,
+            MeteredStateSerializer(BenchActor.__name__),
+            self.client,
+        )
+        self.manager = ActorManager(ctx)
+        self.engine_config = {
+            "engine_type": "fake",
+            "run_method": "run",
+            "name": "Bench Agent",
+            "latency_ms": args.engine_latency_ms,
+        }
+        self.latencies: dict[str, list[float]] = {}
+
+    async def call(self, op: str, actor_id: ActorId, method: str, payload: object) -> object:
+        body = self.serializer.serialize(payload)
+        started = time.perf_counter()
+        result = await self.manager.dispatch(actor_id, method, body)
+        self.latencies.setdefault(op, []).append(time.perf_counter() - started)
+        return json.loads(result)
+
+    async def fire_reminders(self, actor_id: ActorId) -> None:
+        for (_, owner, name), body in list(self.client.reminders.items()):
+            if owner != actor_id.id:
+                continue
+            started = time.perf_counter()
+            await self.manager.fire_reminder(actor_id, name, body)
+            self.latencies.setdefault("reminder_fire", []).append(time.perf_counter() - started)
+
+    async def run_actor(self, index: int) -> None:
+        args = self.args
+        actor_id = ActorId(f"bench-{index}")
+        for i in range(args.messages):
+            await self.call("process_message", actor_id, "ProcessMessage", {
+                "message_data": {"role": "user", "content": f"message {i} from actor {index} " * args.message_words},
+                "engine_config": self.engine_config,
+                "engine_type": "fake",
+            })
+        for i in range(args.reminders):
+            await self.call("schedule_reminder", actor_id, "ScheduleReminder", {
+                "reminder_name": f"bench_reminder_{i}",
+                "task_data": {"index": i},
+                "due_time_seconds": 0,
+            })
+        await self.fire_reminders(actor_id)
+        for i in range(args.knowledge_entries):
+            await self.call("update_knowledge_entry", actor_id, "UpdateKnowledgeEntry", {
+                "entry_id": f"doc_{i}",
+                "data_payload": {"text": f"document {i} about topic {i % 7} for actor {index}"},
+            })
+        for i in range(args.queries):
+            await self.call("query_knowledge", actor_id, "QueryKnowledge", {
+                "query": {"semantic_query": f"topic {i % 7}"},
+                "query_config": {"top_k": 3},
+            })
+
+    async def run(self) -> dict[str, object]:
+        args = self.args
+        # tracemalloc is exact but slows Python down several times, so it is opt-in;
+        # otherwise memory is the growth of the process's peak RSS.
+        if args.trace_memory:
+            tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0] if args.trace_memory else _peak_rss_bytes()
+        started = time.perf_counter()
+        await asyncio.gather(*(self.run_actor(i) for i in range(args.actors)))
+        elapsed = time.perf_counter() - started
+        if args.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            memory = {"traced_bytes_per_actor": (current - baseline) // max(args.actors, 1), "traced_peak_bytes": peak}
+        else:
+            memory = {"rss_growth_bytes_per_actor": (_peak_rss_bytes() - baseline) // max(args.actors, 1)}
+        memory["state_bytes_per_actor"] = self.client.state_bytes(BenchActor.__name__) // max(args.actors, 1)
+
+        operations = sum(len(samples) for samples in self.latencies.values())
+        return {
+            "benchmark": "ambient_actor.BaseActor",
+            "timestamp": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "config": vars(args),
+            "elapsed_seconds": round(elapsed, 3),
+            "operations": operations,
+            "throughput_ops_per_second": round(operations / elapsed, 1) if elapsed else None,
+            "latency": {op: percentiles(samples) for op, samples in sorted(self.latencies.items())},
+            "memory": memory,
+            "state_calls": dict(sorted(self.client.calls.items())),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--actors", type=int, default=100, help="Concurrent actor ids")
+    parser.add_argument("--messages", type=int, default=10, help="ProcessMessage calls per actor")
+    parser.add_argument("--message-words", type=int, default=8, help="Repetitions of the message text")
+    parser.add_argument("--reminders", type=int, default=2, help="Reminders scheduled and fired per actor")
+    parser.add_argument("--knowledge-entries", type=int, default=20, help="Knowledge entries written per actor")
+    parser.add_argument("--queries", type=int, default=10, help="Semantic knowledge queries per actor")
+    parser.add_argument("--engine-latency-ms", type=float, default=20.0, help="Fake engine response time")
+    parser.add_argument("--state-latency-ms", type=float, default=1.0, help="Simulated sidecar round trip")
+    parser.add_argument("--trace-memory", action="store_true", help="Measure memory with tracemalloc (slow)")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--log-level", default="WARNING", help="Log level while the benchmark runs")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(args.log_level)
+
+    report = asyncio.run(Bench(args).run())
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(encoded + "\n")
+    else:
+        print(encoded)
+
+
+if __name__ == "__main__":
+    main()
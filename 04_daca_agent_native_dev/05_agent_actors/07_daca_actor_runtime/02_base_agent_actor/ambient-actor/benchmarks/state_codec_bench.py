@@ -0,0 +1,128 @@
+"""
+Encode/decode time and stored size of the actor state codecs on conversation histories.
+
+Histories are shaped like the items the OpenAI Agents SDK returns from `to_input_list()`
+(user messages, assistant output messages, tool calls and tool results), with a mix of
+short and long turns. For each codec and history length the benchmark reports:
+
+- `encoded_bytes`: output of the codec itself.
+- `stored_bytes`: what the Dapr state store receives, i.e. the JSON-serialized envelope
+  (base64 of the encoded bytes) or the plain JSON value for "json".
+- `encode_us` / `decode_us`: median time to turn the history into those stored bytes and
+  back, including the actor state serializer's own JSON pass.
+
+    uv run python benchmarks/state_codec_bench.py --lengths 10 50 200 --repeat 200
+
+Codecs whose library is not installed are skipped and listed under "unavailable".
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import time
+from datetime import datetime, UTC
+
+from dapr.serializers import DefaultJSONSerializer
+
+from ambient_actor.actors.state_codecs import STATE_CODECS, decode_state, encode_state
+
+ALL_CODECS = ("json", "json+zstd", "msgpack", "msgpack+zstd", "protobuf", "protobuf+zstd")
+WORDS = (
+    "the actor keeps its conversation in state and answers questions about orders invoices "
+    "shipping refunds accounts weather travel schedules meetings reports budgets code reviews"
+).split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def conversation_history(length: int, seed: int = 7) -> list[dict[str, object]]:
+    rng = random.Random(seed)
+    history: list[dict[str, object]] = []
+    while len(history) < length:
+        history.append({"role": "user", "content": _text(rng, rng.randint(5, 40))})
+        if rng.random() < 0.25:
+            call_id = f"call_{rng.getrandbits(64):016x}"
+            history.append({
+                "type": "function_call",
+                "call_id": call_id,
+                "name": rng.choice(["lookup_order", "get_weather", "search_docs"]),
+                "arguments": json.dumps({"query": _text(rng, 4), "limit": rng.randint(1, 10)}),
+                "status": "completed",
+            })
+            history.append({"type": "function_call_output", "call_id": call_id, "output": _text(rng, rng.randint(10, 80))})
+        history.append({
+            "id": f"msg_{rng.getrandbits(64):016x}",
+            "type": "message",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": _text(rng, rng.randint(20, 200)), "annotations": []}],
+        })
+    return history[:length]
+
+
+def _median_us(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1_000_000, 2)
+
+
+def run(args: argparse.Namespace) -> dict[str, object]:
+    serializer = DefaultJSONSerializer()
+    codecs = [name for name in args.codecs if name in STATE_CODECS]
+    results: dict[str, dict[str, dict[str, float | int]]] = {}
+    for length in args.lengths:
+        history = conversation_history(length)
+        json_bytes = len(serializer.serialize(history))
+        per_codec: dict[str, dict[str, float | int]] = {}
+        for name in codecs:
+            codec = STATE_CODECS[name]
+            stored = encode_state(history, codec)
+            if decode_state(stored)[0] != history:
+                raise AssertionError(f"Codec '{name}' does not round-trip the history")
+            raw = serializer.serialize(stored)
+            stored_bytes = len(raw)
+            per_codec[name] = {
+                "encoded_bytes": len(codec.encode(history)),
+                "stored_bytes": stored_bytes,
+                "stored_ratio_vs_json": round(stored_bytes / json_bytes, 3),
+                "encode_us": _median_us(
+                    lambda history=history, codec=codec: serializer.serialize(encode_state(history, codec)), args.repeat
+                ),
+                "decode_us": _median_us(lambda raw=raw: decode_state(serializer.deserialize(raw)), args.repeat),
+            }
+        results[f"{length}_messages"] = per_codec
+    return {
+        "benchmark": "ambient_actor.state_codecs",
+        "timestamp": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "unavailable": [name for name in args.codecs if name not in STATE_CODECS],
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 50, 200], help="History lengths in messages")
+    parser.add_argument("--codecs", nargs="+", default=list(ALL_CODECS), help="Codecs to compare")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed calls per measurement")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    encoded = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(encoded + "\n")
+    else:
+        print(encoded)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,71 @@ This file implements the BaseActor for the DACA Actor Runtime.
 It provides the foundational capabilities for all DACA agents, inheriting from Dapr's Actor and Remindable classes, and implementing the comprehensive BaseActorInterface.
 """
 
+import asyncio
 import json
 import logging
+import os
+import random
+import time
 
 from typing import cast
 from datetime import timedelta, datetime, UTC
 
 from ambient_actor.agents.engine_adapter import AgenticEngineAdapter
+from ambient_actor.agents.engine_pool import engine_pool, engine_config_key
+from ambient_actor.agents.engine_registry import engine_registry
 from ambient_actor.agents.openai_adapter import OpenAIEngineAdapter
-from dapr.actor import Actor, Remindable, ActorId
-from dapr.clients import DaprClient
+import ambient_actor.agents.composite_adapter  # noqa: F401  registers the "composite" engine type
+from dapr.actor import Actor, ActorInterface, Remindable, ActorId
 from ambient_actor.actors.interface import BaseActorInterface
+from ambient_actor.actors.cancellation import TurnCancelled, TurnDeadlineExceeded, deadline_after, turn_cancellations
+from ambient_actor.actors.context_window import (
+    ContextWindow,
+    DEFAULT_MAX_TOKENS,
+    DEFAULT_SUMMARY_MAX_TOKENS,
+)
+from ambient_actor.actors.conversation_store import ConversationStore
+from ambient_actor.actors.dapr_clients import shared_dapr_client
+from ambient_actor.actors.hitl_outbox import (
+    HITL_FEEDBACK_TOPIC,
+    HITL_PUBSUB_NAME,
+    HITL_REQUESTS_TOPIC,
+    OUTBOX_DRAIN_DELAY_SECONDS,
+    OUTBOX_DRAIN_PERIOD_SECONDS,
+    OUTBOX_DRAIN_REMINDER,
+    HitlOutbox,
+)
+from ambient_actor.actors.knowledge_index import (
+    DEFAULT_MEMORY_TYPE,
+    DEFAULT_TOP_K,
+    Embedder,
+    HashingEmbedder,
+    KnowledgeIndex,
+    payload_text,
+)
+from ambient_actor.actors.metrics import (
+    activation_seconds,
+    current_method,
+    engine_seconds,
+    reminder_lag_seconds,
+    turn_seconds,
+)
+from ambient_actor.actors.plan_index import PlanIndex
+from ambient_actor.actors.reminders import (
+    SCHEDULED_AT_KEY,
+    ReminderRegistry,
+    decode_payload,
+    encode_payload,
+    reminder_handler,
+    reminder_lag,
+    stamp_schedule,
+    unwrap_task_data,
+)
+from ambient_actor.actors.request_coalescing import IdempotencyLog, request_identity
+from ambient_actor.actors.review_index import ReviewIndex
+from ambient_actor.actors.state_codecs import codec_state_manager
+from ambient_actor.actors.stream_hub import stream_hub
+from ambient_actor.actors.stream_ingest import StreamReassembler, decode_chunk
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,6 +75,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Plan status recorded for each `control_goal_plan` action; other actions keep the current status.
+PLAN_ACTION_STATUSES = {
+    "pause": "paused",
+    "resume": "running",
+    "retry_failed_step": "running",
+    "complete": "completed",
+    "fail": "failed",
+}
+# Upper bound on the per-activation cache of known-absent state keys.
+MAX_ABSENT_STATE_KEYS = 4096
+# Largest text stream turned into a single knowledge entry; bigger ones stay in parts.
+MAX_STREAM_KNOWLEDGE_BYTES = int(os.getenv("MAX_STREAM_KNOWLEDGE_BYTES", str(1024 * 1024)))
+# Fraction of turns whose full conversation is logged when DEBUG logging is on.
+CONVERSATION_LOG_SAMPLE_RATE = float(os.getenv("CONVERSATION_LOG_SAMPLE_RATE", "0.1"))
+
 
 class BaseActor(Actor, BaseActorInterface, Remindable):
     """
@@ -28,10 +97,38 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
     stub implementations for the DACA BaseActorInterface.
     """
 
+    # Embedding function for the knowledge index; subclasses can plug in a real model.
+    knowledge_embedder: Embedder = HashingEmbedder()
+    # State read on every activation; prefetched together so the first turn finds them cached.
+    hot_state_keys: tuple[str, ...] = ("actor_status", "conversation_head", "conversation_summary")
+    # Binary codecs for state keys, by key pattern (see actors/state_codecs.py), e.g.
+    # {"conversation_chunk_*": "msgpack+zstd"}. Keys without a match are stored as JSON.
+    state_codecs: dict[str, str] = {}
+
     def __init__(self, ctx, actor_id: ActorId):
         super().__init__(ctx, actor_id)
         self.actor_type = self.__class__.__name__
         self.agentic_engine: AgenticEngineAdapter | OpenAIEngineAdapter | None = None
+        self._engine_key: str | None = None
+        # State access goes through the per-key codecs declared in `state_codecs`.
+        self.state = codec_state_manager(self._state_manager, self.state_codecs)
+        self.conversation_store = ConversationStore(self.state)
+        self.context_window = ContextWindow(self.state, self.conversation_store)
+        self.plan_index = PlanIndex(self.state)
+        self.knowledge_index = KnowledgeIndex(self.state, self.knowledge_embedder)
+        self.stream_reassembler = StreamReassembler(self.state)
+        self.idempotency_log = IdempotencyLog(self.state)
+        self.hitl_outbox = HitlOutbox(self.state)
+        self.review_index = ReviewIndex(self.state)
+        self._pending_actor_status: dict[str, object] | None = None
+        self.activation_ms: float | None = None
+        # Negative cache of keys known not to exist, valid for this activation only.
+        self._absent_state: set[str] = set()
+        self._absent_in_turn: set[str] = set()
+        self._turn_started = time.perf_counter()
+        # Deadline and cancel token of the current turn's engine calls (see actors/cancellation.py).
+        self._turn_deadline_at: float | None = None
+        self._turn_cancel_token: str | None = None
 
         # self.actor_id is already available via self.id from the base Actor class
         # but having it explicitly can be convenient. self.id is ActorId type.
@@ -45,39 +142,81 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
         - Initializing actor state (if not already present).
         - Loading actor-specific configuration.
         - Registering any default reminders or timers needed for the actor's lifecycle.
+
+        Activation sits on the critical path of the first call, so it does no sequential
+        round trips: the hot keys are prefetched concurrently into the state manager's
+        cache, and the activation metadata is only written with the first turn.
         """
-        logger.info(f"Actor '{self.id.id}' of type '{self.actor_type}' _on_activate: Activating.")
+        started = time.perf_counter()
+        logger.debug(f"Actor '{self.id.id}' of type '{self.actor_type}' _on_activate: Activating.")
 
-        # Example: Initialize a basic status state if it doesn't exist
-        status_exists = await self._state_manager.contains_state("actor_status")
-        if not status_exists:
-            initial_status = {
+        hot_state = await self._prefetch_state(self.hot_state_keys)
+
+        current_status = hot_state.get("actor_status")
+        now = datetime.now(UTC).isoformat()
+        if current_status is None:
+            current_status = {
                 "status": "active",
-                "last_activated_at": datetime.now(UTC).isoformat(),
+                "last_activated_at": now,
                 "version": "1.0.0",  # Example version
             }
-            await self._state_manager.set_state("actor_status", initial_status)
-            logger.info(f"Actor '{self.id.id}': Initialized 'actor_status' state. Initial state: {initial_status}")
+            logger.info(f"Actor '{self.id.id}': Initializing 'actor_status' state: {current_status}")
+        elif isinstance(current_status, dict):
+            current_status["last_activated_at"] = now
         else:
-            # Optionally update activation time if status exists
-            current_status = await self._get_actor_state("actor_status", default={})
-            if isinstance(current_status, dict):  # Ensure it's a dictionary
-                current_status["last_activated_at"] = datetime.now(UTC).isoformat()
-                await self._state_manager.set_state("actor_status", current_status)
-                logger.info(f"Actor '{self.id.id}': Updated 'last_activated_at' in 'actor_status'. Current state: {current_status}")
-            else:
-                logger.warning(f"Actor '{self.id.id}': 'actor_status' state exists but is not a dictionary. Re-initializing.")
-                initial_status = {
-                    "status": "active_reinitialized",
-                    "last_activated_at": datetime.now(UTC).isoformat(),
-                    "version": "1.0.0",  # Example version
-                }
-                await self._state_manager.set_state("actor_status", initial_status)
+            logger.warning(f"Actor '{self.id.id}': 'actor_status' state exists but is not a dictionary. Re-initializing.")
+            current_status = {
+                "status": "active_reinitialized",
+                "last_activated_at": now,
+                "version": "1.0.0",  # Example version
+            }
+        # Written by `_on_post_actor_method`, so it is committed with the first turn's changes.
+        self._pending_actor_status = current_status
 
         # Further initialization, such as loading configuration or setting up
         # default reminders/timers, would go here.
         # E.g., await self._load_configuration()
-        logger.info(f"Actor '{self.id.id}' of type '{self.actor_type}' _on_activate: Activation complete.")
+        self.activation_ms = (time.perf_counter() - started) * 1000
+        activation_seconds.observe(self.activation_ms / 1000, self.actor_type, "activate")
+        logger.info(
+            f"Actor '{self.id.id}' of type '{self.actor_type}' _on_activate: "
+            f"Activation complete in {self.activation_ms:.1f} ms."
+        )
+
+    async def _prefetch_state(self, state_names: tuple[str, ...]) -> dict[str, object]:
+        """
+        Load several keys concurrently. Dapr has no bulk actor-state read, so this issues
+        one `try_get_state` per key in parallel; found values land in the state manager's
+        cache and later reads of them in this activation are free.
+        """
+        results = await asyncio.gather(
+            *(self.state.try_get_state(name) for name in state_names)
+        )
+        return {name: value for name, (found, value) in zip(state_names, results, strict=True) if found}
+
+    async def _on_pre_actor_method(self, method_context) -> None:
+        """Runs before every actor method/reminder."""
+        self._absent_in_turn.clear()
+        current_method.set(method_context.method_name)
+        self._turn_started = time.perf_counter()
+        self._turn_deadline_at = None
+        self._turn_cancel_token = None
+        # A failed turn leaves the in-memory vector index ahead of the saved state.
+        self.knowledge_index.discard_uncommitted()
+
+    async def _on_post_actor_method(self, method_context) -> None:
+        """Runs after every actor method/reminder, just before Dapr saves the turn's state."""
+        if self._pending_actor_status is not None:
+            status, self._pending_actor_status = self._pending_actor_status, None
+            await self._set_actor_state("actor_status", status)
+        # Misses seen in a turn are only trusted once the turn completes: a failed turn may
+        # have observed its own uncommitted removals.
+        if len(self._absent_state) + len(self._absent_in_turn) > MAX_ABSENT_STATE_KEYS:
+            self._absent_state.clear()
+        self._absent_state |= self._absent_in_turn
+        self._absent_in_turn.clear()
+        self.knowledge_index.commit()
+        turn_seconds.observe(time.perf_counter() - self._turn_started, self.actor_type, method_context.method_name)
 
     async def _on_deactivate(self) -> None:
         """
@@ -96,43 +235,28 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
     async def _timer_event_adapter(self, packed_state_bytes: bytes) -> None:
         """
         Adapter for Dapr timer callbacks to match the linter-expected signature.
-        It decodes the actual timer name from packed_state_bytes, then calls
-        the main receive_reminder method. The full packed_state_bytes is passed
-        as 'state' to receive_reminder, which will then decode the user_task_data.
+        It decodes the wrapper once to find the actual timer name and the user_task_data,
+        then dispatches directly without decoding the payload a second time.
         """
         actual_timer_name_for_dispatch = "unknown_timer_via_adapter"  # Fallback
+        task_data: dict[str, object] = {}
 
         try:
-            decoded_wrapper = json.loads(packed_state_bytes.decode("utf-8"))
-            if (
-                isinstance(decoded_wrapper, dict)
-                and "actual_timer_name_for_dispatch" in decoded_wrapper
-            ):
-                actual_timer_name_for_dispatch = decoded_wrapper[
-                    "actual_timer_name_for_dispatch"
-                ]
+            timer_name, task_data = unwrap_task_data(decode_payload(packed_state_bytes))
+            if timer_name is not None:
+                actual_timer_name_for_dispatch = timer_name
             else:
                 logger.warning(
                     f"Actor '{self.id.id}': Timer state for _timer_event_adapter "
                     f"did not contain 'actual_timer_name_for_dispatch'. Using fallback name '{actual_timer_name_for_dispatch}'."
                 )
-        except Exception as e:
+        except ValueError as e:
             logger.warning(
                 f"Actor '{self.id.id}': Failed to decode wrapped state in _timer_event_adapter: {e}. "
                 f"Using fallback name '{actual_timer_name_for_dispatch}'. Raw state: {packed_state_bytes[:100]!r}"
             )
 
-        # Call receive_reminder. Due_time, period, ttl are conceptual here,
-        # as Dapr provides them to receive_reminder based on registration when called by string name.
-        # The adapter pattern means we pass indicative values.
-        await self.receive_reminder(
-            name=actual_timer_name_for_dispatch,
-            # Pass the full wrapper, receive_reminder will parse user_task_data
-            state=packed_state_bytes,
-            due_time=timedelta(seconds=0),
-            period=timedelta(seconds=0),
-            ttl=None,
-        )
+        await self._dispatch_reminder(actual_timer_name_for_dispatch, task_data)
 
     async def receive_reminder(
         self,
@@ -145,89 +269,70 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
         """
         Dapr runtime callback when a reminder or timer fires.
         The `name` corresponds to the `reminder_name` or `timer_name` used during scheduling.
-        If called via `_timer_event_adapter` for a timer, `name` is the extracted actual timer name,
-        and `state` is the `packed_state_bytes` containing the wrapper.
+        The state may be JSON or msgpack task data, or a timer wrapper carrying `user_task_data`.
         """
-        logger.info(
+        logger.debug(
             f"Actor '{self.id.id}' received reminder/timer '{name}' "
             f"due at {due_time}, with period {period}."
         )
+        task_data: dict[str, object] = {}
         try:
-            task_data_dict: dict[str, object] = {}
-            if state:
-                decoded_outer_state = {}
-                try:
-                    decoded_outer_state = json.loads(state.decode("utf-8"))
-                except json.JSONDecodeError:
-                    logger.warning(
-                        f"Actor '{self.id.id}': State for '{name}' was not valid JSON. Raw: {state.decode('utf-8', errors='replace')[:100]}"
-                    )
-                    # If state is not JSON at all, task_data_dict remains empty, or handle as non-JSON if expected for some reminders.
-
-                if (
-                    isinstance(decoded_outer_state, dict)
-                    and "actual_timer_name_for_dispatch" in decoded_outer_state
-                    and "user_task_data" in decoded_outer_state
-                ):
-                    # This indicates the state came from _timer_event_adapter (it's the wrapper)
-                    task_data_dict = decoded_outer_state.get("user_task_data", {})
-                    # 'name' should already be the actual_timer_name_for_dispatch set by the adapter
-                    logger.info(
-                        f"Actor '{self.id.id}': Timer event for '{name}' via adapter. Extracted user_task_data."
-                    )
-                # It's a JSON dict, but not the timer wrapper
-                elif isinstance(decoded_outer_state, dict):
-                    # Assume this is a reminder or a timer called directly (if that path existed)
-                    # where the state is directly the user's task_data.
-                    task_data_dict = decoded_outer_state
-                    logger.info(
-                        f"Actor '{self.id.id}': Reminder event or direct timer event for '{name}'. State is task_data."
-                    )
-                else:  # Not a dict or not the wrapper
-                    logger.info(
-                        f"Actor '{self.id.id}': State for '{name}' was not a dictionary after decoding or not the timer wrapper. Content: {str(decoded_outer_state)[:100]}"
-                    )
+            _, task_data = unwrap_task_data(decode_payload(state))
+        except ValueError as e:
+            # Keep firing the handler with empty task data, as for any non-dict payload.
+            logger.warning(f"Actor '{self.id.id}': Could not decode state for '{name}': {e}")
 
-            logger.info(
-                f"Actor '{self.id.id}': Decoded task_data for '{name}': {task_data_dict}"
+        scheduled_at = task_data.pop(SCHEDULED_AT_KEY, None)
+        if isinstance(scheduled_at, (int, float)):
+            reminder_lag_seconds.observe(
+                reminder_lag(scheduled_at, due_time, period), self.actor_type, "receive_reminder"
             )
 
-            # Example: Generic handler, actual logic would dispatch based on 'name'
-            # or a 'task_type' field within task_data_dict.
-            if name == "example_reminder_from_interface":
-                logger.info(
-                    f"Actor '{self.id.id}': Handling specific reminder '{name}' with data: {task_data_dict}"
-                )
-                # TODO: Implement actual logic for this reminder
-            # This check now correctly uses the extracted/passed timer name
-            elif name.startswith("timer_"):
-                logger.info(
-                    f"Actor '{self.id.id}': Handling specific timer '{name}' with data: {task_data_dict}"
-                )
-                # TODO: Implement actual logic for this timer
-            else:
-                logger.warning(
-                    f"Actor '{self.id.id}': No specific handler for reminder/timer '{name}'. Data: {task_data_dict}"
-                )
+        await self._dispatch_reminder(name, task_data)
 
-            # Example: If it's a one-time reminder/timer (period is zero or not meaningful for timers after first fire),
-            # and it's not intended to be rescheduled by its handler, no further action here.
-            # If it's recurring, it will fire again based on 'period'.
+    @classmethod
+    def _reminder_registry(cls) -> ReminderRegistry:
+        """Handler registry for this actor class, built on first use."""
+        registry = cls.__dict__.get("_reminders")
+        if registry is None:
+            registry = ReminderRegistry.from_class(cls)
+            cls._reminders = registry
+        return registry
 
-        except (
-            json.JSONDecodeError
-        ):  # This might be less likely now if initial parsing is robust
-            logger.error(
-                f"Actor '{self.id.id}': Outer JSON decode failed for reminder/timer state for '{name}'. Raw state: {state.decode('utf-8', errors='replace')}"
-            )
-            raise
+    async def _dispatch_reminder(self, name: str, task_data: dict[str, object]) -> None:
+        try:
+            handled = await self._reminder_registry().dispatch(self, name, task_data)
         except Exception as e:
             logger.error(
                 f"Actor '{self.id.id}': Error processing reminder/timer '{name}': {e}",
                 exc_info=True,
             )
             raise
-        # Pass is implicit if no other statements are present
+        if not handled:
+            logger.warning(f"Actor '{self.id.id}': No specific handler for reminder/timer '{name}'.")
+
+    def get_reminder_stats(self) -> dict[str, dict[str, float | int]]:
+        """Per-handler call counts and latencies for this actor class."""
+        return self._reminder_registry().snapshot()
+
+    # --- Reminder/Timer Handlers ---
+
+    @reminder_handler("example_reminder_from_interface")
+    async def _on_example_reminder(self, name: str, task_data: dict[str, object]) -> None:
+        logger.debug(f"Actor '{self.id.id}': Handling specific reminder '{name}' with data: {task_data}")
+        # TODO: Implement actual logic for this reminder
+
+    @reminder_handler(prefix="timer_")
+    async def _on_timer(self, name: str, task_data: dict[str, object]) -> None:
+        logger.debug(f"Actor '{self.id.id}': Handling specific timer '{name}' with data: {task_data}")
+        # TODO: Implement actual logic for this timer
+
+    @reminder_handler(OUTBOX_DRAIN_REMINDER)
+    async def _on_hitl_outbox_drain(self, name: str, task_data: dict[str, object]) -> None:
+        result = await self.hitl_outbox.drain(self._publish_dapr_event)
+        logger.info(f"Actor '{self.id.id}': HITL outbox drain: {result}")
+        if result["remaining"] == 0:
+            await self.unregister_reminder(OUTBOX_DRAIN_REMINDER)
 
     # --- Interface Method Implementations (Stubs) ---
 
@@ -235,71 +340,295 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
     async def process_message(
         self, input: dict[str, str | list | dict]
     ) -> dict[str, object] | None:
-        logger.info(f"Actor '{self.id.id}' method 'process_message' called with: {input}")
-        
+        logger.info(f"Actor '{self.id.id}' method 'process_message' called")
+        log_conversation = self._sample_conversation_log()
+        if log_conversation:
+            logger.debug(f"Actor '{self.id.id}': process_message input: {input}")
+
         message_data = cast(dict, input.get("message_data", None))
         engine_config = cast(dict, input.get("engine_config", None))
         engine_type = cast(str, input.get("engine_type", "openai"))
         
         if engine_config is None:
             raise ValueError("Engine config is required")
-        
+
+        run_method = engine_config.get("run_method", "run")
+
+        # A client retry of a request this actor already answered (same X-Request-ID) gets
+        # the recorded answer instead of another engine run. Streamed turns answer over the
+        # stream hub, so they are never deduplicated.
+        request_key, has_request_id = request_identity(
+            message_data, cast(str | None, input.get("request_id")), cast(str | None, input.get("idempotency_key"))
+        )
+        if run_method != "stream" and request_key is not None:
+            previous = await self.idempotency_log.lookup(request_key)
+            if previous is not None:
+                logger.info(f"Actor '{self.id.id}': Duplicate request {request_key[:12]}; returning the recorded result.")
+                return {**previous, "actor_id": self.id.id, "deduplicated": True}
+
+        if self._begin_turn_limits(input):
+            return self._aborted_turn(TurnDeadlineExceeded("Deadline passed before the turn started"))
+
         engine = await self._get_engine(engine_type=engine_type if isinstance(engine_type, str) else "openai", engine_config=engine_config if isinstance(engine_config, dict) else {})
         
-        # get conversation and context from state
-        conversation = await self._get_actor_state("conversation")
-        
-        if conversation is None or not isinstance(conversation, list):
-            conversation = []
-            
-        # add message to conversation
-        conversation.append(message_data)
+        # build the budgeted context (recent turns + rolling summary) with the new message last
+        conversation = await self._build_turn_input([message_data], engine_config)
         
-        logger.info(f"\n\n Pre-engine Conversation: {conversation}\n\n")
-        
-        run_method = engine_config.get("run_method", "run")
-        
-        if run_method not in ["run", "run_sync"]:
+        if log_conversation:
+            logger.debug(f"Actor '{self.id.id}': Pre-engine Conversation: {conversation}")
+
+        if run_method not in ["run", "run_sync", "stream"]:
             raise ValueError(f"Invalid run_method: {run_method}")
         
         if run_method == "stream":
-            raise ValueError("Streaming is not supported yet")
-        
-        result = await engine.process_input(conversation, run_method= run_method)
-        
-        logger.info(f"\n\nEngine result: {result}\n\n")
+            return await self._stream_turn(engine, conversation, cast(str, input.get("stream_id", "")))
         
+        try:
+            result = await self._process_input(engine, conversation, run_method)
+        except (TurnDeadlineExceeded, TurnCancelled) as e:
+            return self._aborted_turn(e)
+        if log_conversation:
+            logger.debug(f"Actor '{self.id.id}': Engine result: {result}")
+
         # We can get and save output if run_method is as run or run_sync
         if run_method in ["run", "run_sync"]:
-            await self._state_manager.set_state("conversation", result.get("conversation"))
+            await self._append_turn(conversation, cast(list, result.get("conversation")))
         else:
-            logger.warning(f"No output from engine for message: {message_data}")        
+            logger.warning(f"Actor '{self.id.id}': No output from engine for run method '{run_method}'.")        
         
-        logger.info(f"\n\n Post-engine Conversation: {result.get('conversation')}\n\n")
-        return {
+        if log_conversation:
+            logger.debug(f"Actor '{self.id.id}': Post-engine Conversation: {result.get('conversation')}")
+        response = {
             "status": "received",
-            "actor_id": self.id.id,
             "conversation": result.get("conversation"),
             "final_output": result.get("final_output")
         }
+        if request_key is not None:
+            await self.idempotency_log.record(request_key, response, has_request_id=has_request_id)
+        return {**response, "actor_id": self.id.id}
+
+    async def process_message_batch(
+        self, input: dict[str, str | list | dict]
+    ) -> dict[str, object] | None:
+        messages = cast(list[dict], input.get("messages") or [])
+        engine_config = cast(dict, input.get("engine_config", None))
+        engine_type = cast(str, input.get("engine_type", "openai"))
+        mode = cast(str, input.get("mode", "sequential"))
+        logger.info(f"Actor '{self.id.id}' method 'process_message_batch' called with {len(messages)} messages, mode: {mode}")
+
+        if engine_config is None:
+            raise ValueError("Engine config is required")
+
+        run_method = engine_config.get("run_method", "run")
+
+        if run_method not in ["run", "run_sync"]:
+            raise ValueError(f"Invalid run_method for batch: {run_method}")
+
+        if mode not in ["sequential", "coalesced"]:
+            raise ValueError(f"Invalid batch mode: {mode}")
+
+        if self._begin_turn_limits(input):
+            return self._aborted_turn(TurnDeadlineExceeded("Deadline passed before the turn started"))
+
+        engine = await self._get_engine(engine_type=engine_type if isinstance(engine_type, str) else "openai", engine_config=engine_config if isinstance(engine_config, dict) else {})
+
+        # State writes are buffered by the actor state manager and committed in a single
+        # transaction when this method returns, however many messages the batch holds.
+        results: list[dict[str, object]] = []
+        try:
+            if mode == "coalesced":
+                conversation = await self._build_turn_input(messages, engine_config)
+                result = await self._process_input(engine, conversation, run_method)
+                await self._append_turn(conversation, cast(list, result.get("conversation")), pending_count=len(messages))
+                results.append({"message_count": len(messages), "final_output": result.get("final_output")})
+            else:
+                for message_data in messages:
+                    conversation = await self._build_turn_input([message_data], engine_config)
+                    result = await self._process_input(engine, conversation, run_method)
+                    await self._append_turn(conversation, cast(list, result.get("conversation")))
+                    results.append({"message_count": 1, "final_output": result.get("final_output")})
+        except (TurnDeadlineExceeded, TurnCancelled) as e:
+            # Messages answered before the abort are kept; the rest are not processed.
+            return {
+                **self._aborted_turn(e),
+                "mode": mode,
+                "processed": sum(cast(int, r["message_count"]) for r in results),
+                "results": results,
+            }
+
+        return {
+            "status": "received",
+            "actor_id": self.id.id,
+            "mode": mode,
+            "processed": len(messages),
+            "results": results
+        }
+
+    async def process_message_stream(
+        self, input: dict[str, str | list | dict]
+    ) -> dict[str, object] | None:
+        logger.info(f"Actor '{self.id.id}' method 'process_message_stream' called")
+        if self._sample_conversation_log():
+            logger.debug(f"Actor '{self.id.id}': process_message_stream input: {input}")
+
+        message_data = cast(dict, input.get("message_data", None))
+        engine_config = cast(dict, input.get("engine_config", None))
+        engine_type = cast(str, input.get("engine_type", "openai"))
+        stream_id = cast(str, input.get("stream_id", ""))
+
+        if engine_config is None:
+            raise ValueError("Engine config is required")
+        if not stream_id:
+            raise ValueError("stream_id is required for streaming")
+
+        if self._begin_turn_limits(input):
+            stream_hub.publish(stream_id, {"type": "error", "error_message": "deadline_exceeded"})
+            stream_hub.close(stream_id)
+            return {**self._aborted_turn(TurnDeadlineExceeded("Deadline passed before the turn started")), "stream_id": stream_id}
+
+        engine = await self._get_engine(engine_type=engine_type if isinstance(engine_type, str) else "openai", engine_config=engine_config if isinstance(engine_config, dict) else {})
+
+        conversation = await self._build_turn_input([message_data], engine_config)
+
+        return await self._stream_turn(engine, conversation, stream_id)
+
+    async def _stream_turn(
+        self, engine: AgenticEngineAdapter, conversation: list, stream_id: str
+    ) -> dict[str, object]:
+        """
+        Runs one streamed engine turn, fanning deltas out through the stream hub as they
+        arrive. The conversation is written to state once, after the final event.
+        """
+        final_event: dict[str, object] = {}
+        # The SSE endpoint subscribes before calling the actor, so a missing subscriber means
+        # the caller is on another replica and only the final result will reach it.
+        local = bool(stream_id) and stream_hub.has_subscribers(stream_id)
+        if stream_id and not local:
+            logger.warning(
+                f"Actor '{self.id.id}': No local subscriber for stream '{stream_id}'; "
+                "the caller is on another replica and gets the final result only."
+            )
+        started = time.perf_counter()
+        try:
+            async with turn_cancellations.guard(self._turn_cancel_token, self._turn_deadline_at):
+                async for event in engine.stream_input(conversation):
+                    if event["type"] == "final":
+                        final_event = event
+                    elif local:
+                        stream_hub.publish(stream_id, event)
+        except (TurnDeadlineExceeded, TurnCancelled) as e:
+            if stream_id:
+                stream_hub.publish(stream_id, {"type": "error", "error_message": str(e)})
+            return {**self._aborted_turn(e), "stream_id": stream_id}
+        except Exception as e:
+            logger.error(f"Actor '{self.id.id}': Streaming failed for stream '{stream_id}': {e}", exc_info=True)
+            if stream_id:
+                stream_hub.publish(stream_id, {"type": "error", "error_message": str(e)})
+            raise
+        finally:
+            engine_seconds.observe(time.perf_counter() - started, self.actor_type, current_method.get())
+            if stream_id:
+                stream_hub.close(stream_id)
+
+        await self._append_turn(conversation, cast(list, final_event.get("conversation")))
+
+        return {
+            "status": "received",
+            "actor_id": self.id.id,
+            "stream_id": stream_id,
+            "streamed": local,
+            "conversation": final_event.get("conversation"),
+            "final_output": final_event.get("final_output")
+        }
+
+    async def _process_input(
+        self, engine: AgenticEngineAdapter, conversation: list, run_method: str
+    ) -> dict[str, object]:
+        """Run one non-streamed engine call, recording its latency."""
+        started = time.perf_counter()
+        try:
+            async with turn_cancellations.guard(self._turn_cancel_token, self._turn_deadline_at):
+                return await engine.process_input(conversation, run_method=run_method)  # type: ignore[arg-type]
+        finally:
+            engine_seconds.observe(time.perf_counter() - started, self.actor_type, current_method.get())
+
+    def _begin_turn_limits(self, input: dict) -> bool:
+        """
+        Adopt the caller's `deadline_at` and `cancel_token` for this turn's engine calls.
+        Returns True if the deadline has already passed, e.g. while the request waited
+        behind other turns, so the turn can be skipped without touching the engine.
+
+        `deadline_at` was set on the caller's clock. If `timeout_seconds` is sent too, the
+        turn never runs longer than that from now, however far the clocks disagree.
+        """
+        deadline_at = input.get("deadline_at")
+        self._turn_deadline_at = float(deadline_at) if isinstance(deadline_at, (int, float)) else None
+        timeout_seconds = input.get("timeout_seconds")
+        if isinstance(timeout_seconds, (int, float)):
+            local_deadline = deadline_after(float(timeout_seconds))
+            self._turn_deadline_at = min(self._turn_deadline_at or local_deadline, local_deadline)
+        cancel_token = input.get("cancel_token")
+        self._turn_cancel_token = cancel_token if isinstance(cancel_token, str) else None
+        return self._turn_deadline_at is not None and time.time() >= self._turn_deadline_at
+
+    def _aborted_turn(self, error: Exception) -> dict[str, object]:
+        status = "cancelled" if isinstance(error, TurnCancelled) else "deadline_exceeded"
+        logger.warning(f"Actor '{self.id.id}': Turn {status}: {error}")
+        return {"status": status, "actor_id": self.id.id, "error_message": str(error)}
+
+    @staticmethod
+    def _sample_conversation_log() -> bool:
+        """Full conversation dumps are DEBUG-only and sampled; they are large and slow to format."""
+        return logger.isEnabledFor(logging.DEBUG) and random.random() < CONVERSATION_LOG_SAMPLE_RATE
+
+    async def _build_turn_input(self, pending: list[dict], engine_config: dict) -> list[dict]:
+        """Engine input for one turn: the token-budgeted context followed by the new messages."""
+        context = await self.context_window.build(
+            pending=pending,
+            max_tokens=int(engine_config.get("context_max_tokens", DEFAULT_MAX_TOKENS)),
+            summary_max_tokens=int(engine_config.get("summary_max_tokens", DEFAULT_SUMMARY_MAX_TOKENS)),
+        )
+        logger.debug(
+            f"Actor '{self.id.id}': Context has {context['included_messages']}/{context['total_messages']} "
+            f"messages, ~{context['token_estimate']} tokens."
+        )
+        return cast(list[dict], context["messages"])
+
+    async def _append_turn(
+        self, sent_conversation: list, result_conversation: list | None, pending_count: int = 1
+    ) -> None:
+        """
+        Persists only what this turn added: the new messages (the last `pending_count` items
+        sent to the engine) plus every item the engine appended after the input it was given.
+        """
+        if not result_conversation:
+            logger.warning(f"Actor '{self.id.id}': Engine returned no conversation; nothing persisted.")
+            return
+        await self.conversation_store.append(result_conversation[len(sent_conversation) - pending_count:])
 
     async def get_conversation_history(self) -> list[dict]:
         """Retrieve conversation history."""
         try:
-            history = await self._state_manager.get_state("conversation")
-            return history if isinstance(history, list) else []
+            return await self.conversation_store.read_all()
         except Exception as e:
-            logging.error(f"Error getting history for {self._history_key}: {e}")
+            logger.error(f"Actor '{self.id.id}': Error getting conversation history: {e}")
             return []
+
+    async def get_conversation_page(self, input: dict[str, object]) -> dict[str, object] | None:
+        chunk_index = cast(int | None, input.get("chunk_index"))
+        logger.info(f"Actor '{self.id.id}' method 'get_conversation_page' called for chunk: {chunk_index}")
+        return await self.conversation_store.read_page(chunk_index)
     
     async def process_event(
         self, input: dict[str, object]
     ) -> None:
         event_payload = cast(dict[str, object], input.get("event_payload"))
         event_metadata = cast(dict[str, object] | None, input.get("event_metadata"))
+        # Event payloads can carry user data; only their shape is logged above DEBUG.
         logger.info(
-            f"Actor '{self.id.id}' method 'process_event' called with payload: {event_payload}, metadata: {event_metadata}"
+            f"Actor '{self.id.id}' method 'process_event' called with {len(event_payload or {})} payload fields"
         )
+        logger.debug(f"Actor '{self.id.id}': process_event payload: {event_payload}, metadata: {event_metadata}")
         # TODO: Implement actual event processing logic, ensure idempotency using event_metadata
         pass
 
@@ -312,14 +641,13 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
         due_time_seconds = cast(int, input.get("due_time_seconds", 0))
         period_seconds = cast(int, input.get("period_seconds", 0))
         ttl_seconds = cast(int | None, input.get("ttl_seconds"))
+        payload_format = cast(str, input.get("payload_format", "json"))
         logger.info(
             f"Actor '{self.id.id}' method 'schedule_reminder' called for '{reminder_name}'"
         )
         try:
-            # Dapr reminders require state to be bytes. Convert dict to JSON string then bytes.
-            state_bytes = b""
-            if task_data:
-                state_bytes = json.dumps(task_data).encode("utf-8")
+            # Dapr reminders require state to be bytes: JSON by default, or compact msgpack.
+            state_bytes = encode_payload(stamp_schedule(task_data), payload_format)
 
             due_time_td = timedelta(seconds=due_time_seconds)
             period_td = (
@@ -379,8 +707,9 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
         # Combine data and metadata for storage if needed, or store separately
         # For this stub, we'll just save the payload under entry_id. Metadata handling can be more complex.
         combined_entry = {"payload": data_payload, "metadata": metadata or {}}
-        await self._state_manager.set_state(entry_id, combined_entry)
-        pass
+        await self._set_actor_state(entry_id, combined_entry)
+        memory_type = str((metadata or {}).get("memory_type", DEFAULT_MEMORY_TYPE))
+        await self.knowledge_index.upsert(entry_id, payload_text(data_payload or {}), memory_type)
 
     async def query_knowledge(
         self, input: dict[str, object]
@@ -389,10 +718,9 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
         memory_types = cast(list[str] | None, input.get("memory_types"))
         query_config = cast(dict[str, object] | None, input.get("query_config"))
         logger.info(
-            f"Actor '{self.id.id}' method 'query_knowledge' called with query: {query}"
+            f"Actor '{self.id.id}' method 'query_knowledge' called with query fields: {sorted(query or {})}"
         )
-        # TODO: Implement actual knowledge querying logic
-        # This might involve querying Dapr state, vector DBs, etc.
+        logger.debug(f"Actor '{self.id.id}': query_knowledge query: {query}, config: {query_config}")
         if "entry_id" in query and isinstance(query["entry_id"], str):
             entry_id_to_query = query["entry_id"]
             knowledge_entry = await self._get_actor_state(entry_id_to_query)
@@ -403,48 +731,133 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
                     f"Actor '{self.id.id}': Knowledge entry '{entry_id_to_query}' not found or not a dict."
                 )
                 return None
+
+        semantic_query = query.get("semantic_query") or query.get("text")
+        if isinstance(semantic_query, str):
+            return await self._semantic_knowledge_query(semantic_query, memory_types, query_config or {})
+
         return {
-            "status": "not_implemented",
+            "status": "unsupported_query",
             "query_received": query,
             "actor_id": self.id.id,
         }
 
+    async def _semantic_knowledge_query(
+        self, text: str, memory_types: list[str] | None, query_config: dict[str, object]
+    ) -> dict[str, object]:
+        top_k = int(cast(int, query_config.get("top_k", DEFAULT_TOP_K)))
+        min_score = cast(float | None, query_config.get("min_score"))
+        include_payload = bool(query_config.get("include_payload", True))
+        filters = cast(dict[str, object], query_config.get("filters") or {})
+
+        # Over-fetch when metadata filters may discard some of the nearest entries.
+        candidates = await self.knowledge_index.search(
+            text,
+            top_k=top_k * 4 if filters else top_k,
+            memory_types=memory_types,
+            min_score=min_score,
+        )
+        results: list[dict[str, object]] = []
+        for entry_id, score in candidates:
+            if len(results) >= top_k:
+                break
+            if not filters and not include_payload:
+                results.append({"entry_id": entry_id, "score": score})
+                continue
+            entry = await self._get_actor_state(entry_id, default=None)
+            if not isinstance(entry, dict):
+                continue
+            entry_metadata = cast(dict[str, object], entry.get("metadata") or {})
+            if any(entry_metadata.get(key) != value for key, value in filters.items()):
+                continue
+            result: dict[str, object] = {"entry_id": entry_id, "score": score}
+            if include_payload:
+                result["data"] = entry
+            results.append(result)
+
+        return {
+            "status": "success",
+            "actor_id": self.id.id,
+            "results": results,
+        }
+
     async def delete_knowledge_entry(self, entry_id: str) -> None:
         logger.info(
             f"Actor '{self.id.id}' method 'delete_knowledge_entry' called for entry_id: {entry_id}"
         )
-        await self._state_manager.remove_state(entry_id)
-        pass
+        await self._remove_actor_state(entry_id)
+        await self.knowledge_index.remove(entry_id)
 
     async def prepare_context(
         self, input: dict[str, object]
     ) -> dict[str, object] | None:
         query = cast(dict[str, object], input.get("query"))
-        config = cast(dict[str, object], input.get("config"))
-        logger.info(
-            f"Actor '{self.id.id}' method 'prepare_context' called with query: {query}, config: {config}"
+        config = cast(dict[str, object], input.get("config") or {})
+        logger.info(f"Actor '{self.id.id}' method 'prepare_context' called")
+        logger.debug(f"Actor '{self.id.id}': prepare_context query: {query}, config: {config}")
+        # Read-only preview: the rolling summary is only persisted by real engine turns.
+        context = await self.context_window.build(
+            max_tokens=int(cast(int, config.get("max_tokens", DEFAULT_MAX_TOKENS))),
+            summary_max_tokens=int(cast(int, config.get("summary_max_tokens", DEFAULT_SUMMARY_MAX_TOKENS))),
+            persist_summary=False,
         )
-        # TODO: Implement context preparation logic
         return {
-            "status": "not_implemented",
+            "status": "success",
             "context_for_query": query,
             "actor_id": self.id.id,
+            **context,
         }
 
     # --- Data Streaming ---
     async def ingest_stream_chunk(
         self, input: dict[str, object]
-    ) -> None:
+    ) -> dict[str, object] | None:
         stream_id = cast(str, input.get("stream_id"))
-        chunk_data = cast(bytes, input.get("chunk_data"))
+        chunk_data = cast(bytes | str, input.get("chunk_data") or b"")
         sequence_number = cast(int, input.get("sequence_number"))
         is_last_chunk = cast(bool, input.get("is_last_chunk"))
         metadata = cast(dict[str, object], input.get("metadata"))
         logger.info(
             f"Actor '{self.id.id}' method 'ingest_stream_chunk' called for stream_id: {stream_id}, seq: {sequence_number}, last: {is_last_chunk}"
         )
-        # TODO: Implement stream chunk ingestion logic
-        pass
+        progress = await self.stream_reassembler.add_chunk(
+            stream_id,
+            int(sequence_number),
+            decode_chunk(chunk_data),
+            bool(is_last_chunk),
+            metadata,
+        )
+        if progress["status"] == "complete":
+            manifest = await self.stream_reassembler.complete(stream_id)
+            logger.info(f"Actor '{self.id.id}': Stream '{stream_id}' complete ({manifest['size']} bytes).")
+            await self.on_stream_complete(stream_id, manifest)
+        return progress
+
+    async def on_stream_complete(self, stream_id: str, manifest: dict[str, object]) -> None:
+        """
+        Called once per stream with its manifest (see `StreamReassembler.complete`); the
+        payload stays in its stored parts, readable with `self.stream_reassembler.iter_parts`.
+        Subclasses override this to process documents, audio, etc. By default text streams
+        up to `MAX_STREAM_KNOWLEDGE_BYTES` become a knowledge entry, and anything else is
+        kept as its parts with the manifest stored under `stream_{id}_object`.
+        """
+        metadata = cast(dict[str, object], manifest["metadata"])
+        content_type = str(metadata.get("content_type", "application/octet-stream"))
+        size = cast(int, manifest["size"])
+        if content_type.startswith("text/") and size <= MAX_STREAM_KNOWLEDGE_BYTES:
+            data, _ = await self.stream_reassembler.assemble(stream_id)
+            await self.update_knowledge_entry({
+                "entry_id": f"stream_{stream_id}",
+                "data_payload": {"text": data.decode("utf-8", errors="replace")},
+                "metadata": {**metadata, "source": "stream", "stream_id": stream_id},
+            })
+            return
+        if content_type.startswith("text/"):
+            logger.warning(
+                f"Actor '{self.id.id}': Text stream '{stream_id}' ({size} bytes) is too large for one "
+                "knowledge entry; keeping it as stored parts."
+            )
+        await self._set_actor_state(f"stream_{stream_id}_object", {**manifest, "content_type": content_type})
 
     async def initiate_outgoing_stream(
         self, input: dict[str, object]
@@ -475,7 +888,7 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
         )
         # TODO: Implement plan initiation logic
         plan_id = f"plan_{self.id.id}_{datetime.utcnow().timestamp()}"
-        await self._state_manager.set_state(
+        await self._set_actor_state(
             f"plan_{plan_id}_status",
             {
                 "goal": goal_description,
@@ -484,6 +897,7 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
                 "parameters": plan_parameters or {},
             },
         )
+        await self.plan_index.upsert(plan_id, "initiated", goal=goal_description or "")
         return plan_id
 
     async def get_plan_execution_status(self, plan_id: str) -> dict[str, object] | None:
@@ -507,15 +921,17 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
         logger.info(
             f"Actor '{self.id.id}' method 'control_goal_plan' for plan_id: {plan_id}, action: {action}"
         )
-        # TODO: Implement plan control logic
-        # Example: update plan status based on action
-        # current_plan_status = await self._get_actor_state(f"plan_{plan_id}_status", default={})
-        # if isinstance(current_plan_status, dict):
-        #     current_plan_status['last_action'] = action
-        #     current_plan_status['last_action_params'] = parameters
-        #     current_plan_status['status'] = f"controlled_action_{action}" # Placeholder
-        #     await self._state_manager.set_state(f"plan_{plan_id}_status", current_plan_status)
-        pass
+        plan_status_key = f"plan_{plan_id}_status"
+        current_plan_status = await self._get_actor_state(plan_status_key, default=None)
+        if not isinstance(current_plan_status, dict):
+            logger.warning(f"Actor '{self.id.id}': Cannot control unknown plan '{plan_id}'.")
+            return
+        current_plan_status["last_action"] = action
+        current_plan_status["last_action_params"] = parameters or {}
+        # TODO: Implement plan control logic beyond status bookkeeping
+        current_plan_status["status"] = PLAN_ACTION_STATUSES.get(action, current_plan_status.get("status", "initiated"))
+        await self._set_actor_state(plan_status_key, current_plan_status)
+        await self.plan_index.upsert(plan_id, cast(str, current_plan_status["status"]))
 
     async def cancel_goal_plan(self, plan_id: str) -> None:
         logger.info(
@@ -526,11 +942,11 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
         current_plan_status = await self._get_actor_state(plan_status_key, default={})
         if isinstance(current_plan_status, dict):
             current_plan_status["status"] = "cancelled"
-            await self._state_manager.set_state(plan_status_key, current_plan_status)
+            await self._set_actor_state(plan_status_key, current_plan_status)
             logger.info(f"Actor '{self.id.id}': Plan '{plan_id}' marked as cancelled.")
         else:
             # If plan doesn't exist or state is malformed, still attempt to set a cancelled status
-            await self._state_manager.set_state(
+            await self._set_actor_state(
                 plan_status_key,
                 {
                     "status": "cancelled",
@@ -540,44 +956,60 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
             logger.info(
                 f"Actor '{self.id.id}': Plan '{plan_id}' status set to cancelled (original not found/malformed)."
             )
-        pass
+        await self.plan_index.upsert(plan_id, "cancelled")
 
     async def list_active_goal_plans(self) -> list[dict[str, object]] | None:
         logger.info(f"Actor '{self.id.id}' method 'list_active_goal_plans' called")
-        # TODO: Implement logic to list active plans (this is more complex)
-        # Would require querying state for all keys matching a pattern, e.g., "plan_*_status"
-        # and filtering them. This is not directly supported by basic key-value state stores easily.
-        # For now, returning an empty list. A more robust implementation might involve
-        # maintaining an index of active plans in a separate state entry.
-        return []
+        # Served from the plan index: one state read, no key scan.
+        listing = await self.plan_index.list()
+        return cast(list[dict[str, object]], listing["plans"])
 
+    async def list_goal_plans(
+        self, input: dict[str, object]
+    ) -> dict[str, object] | None:
+        statuses = cast(list[str] | None, input.get("statuses"))
+        include_terminal = bool(input.get("include_terminal", False))
+        offset = int(cast(int, input.get("offset", 0)))
+        limit = cast(int | None, input.get("limit"))
+        logger.info(
+            f"Actor '{self.id.id}' method 'list_goal_plans' called with statuses: {statuses}, offset: {offset}, limit: {limit}"
+        )
+        return await self.plan_index.list(
+            statuses=statuses, include_terminal=include_terminal, offset=offset, limit=limit
+        )
 
     async def get_agent_profile(self) -> dict[str, object] | None:
         logger.info(f"Actor '{self.id.id}' method 'get_agent_profile' called")
-        # TODO: Implement agent profile generation
-        try:
-            capabilities = [
-                method_name
-                for method_name in dir(BaseActorInterface)
-                if callable(getattr(BaseActorInterface, method_name))
-                and not method_name.startswith("_")
-                and hasattr(getattr(BaseActorInterface, method_name), "__actormethod__")
-            ]
-        except Exception as e:
-            logger.error(
-                f"Actor '{self.id.id}': Error introspecting BaseActorInterface for capabilities: {e}",
-                exc_info=True,
-            )
-            capabilities = ["error_introspecting_capabilities"]
-
         return {
             "actor_id": self.id.id,
             "actor_type": self.actor_type,
             "daca_interface_version": "1.0",  # Example
-            "capabilities": capabilities,
+            "capabilities": list(self._agent_capabilities()),
             "timestamp": datetime.utcnow().isoformat(),
         }
 
+    @classmethod
+    def _agent_capabilities(cls) -> tuple[str, ...]:
+        """
+        Actor methods exposed by this actor type's interfaces. They are fixed by the class,
+        so they are introspected once per actor type and kept as an immutable tuple.
+        """
+        capabilities = cls.__dict__.get("_capabilities")
+        if capabilities is None:
+            interfaces = [
+                klass
+                for klass in cls.__mro__
+                if issubclass(klass, ActorInterface) and klass is not ActorInterface and not issubclass(klass, Actor)
+            ]
+            capabilities = tuple(sorted({
+                method_name
+                for interface in interfaces
+                for method_name, attr in vars(interface).items()
+                if not method_name.startswith("_") and callable(attr) and hasattr(attr, "__actormethod__")
+            }))
+            cls._capabilities = capabilities
+        return capabilities
+
     # --- Human-in-the-Loop (HITL) ---
     async def flag_for_human_review(
         self,
@@ -591,7 +1023,6 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
         logger.info(
             f"Actor '{self.id.id}' method 'flag_for_human_review' called for request_id: {review_request_id}"
         )
-        # TODO: Implement HITL flagging logic (e.g., publish event to HITL system)
         hitl_event = {
             "review_request_id": review_request_id,
             "task_context": task_context,
@@ -602,11 +1033,19 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
             "timestamp": datetime.utcnow().isoformat(),
             "status": "flagged_for_review",
         }
-        # Example: await self._publish_dapr_event("hitl_requests_topic", hitl_event)
-        # For now, we can save this to actor state or just log
-        await self._state_manager.set_state(f"hitl_review_{review_request_id}", hitl_event)
-        logger.info(f"HITL_FLAGGED: {json.dumps(hitl_event)}")
-        pass
+        # The review record, its index entry and the outgoing event commit together; the
+        # event is published later by the outbox drain reminder, outside this turn.
+        await self._set_actor_state(f"hitl_review_{review_request_id}", hitl_event)
+        await self.review_index.upsert(
+            review_request_id,
+            "flagged_for_review",
+            assigned_to=assigned_to,
+            confidence_score=confidence_score,
+            review_instructions=review_instructions,
+        )
+        event_id = await self._enqueue_hitl_event(HITL_REQUESTS_TOPIC, hitl_event)
+        # The event itself is in the outbox; task_context is user data and stays out of the logs.
+        logger.info(f"HITL_FLAGGED: review {review_request_id}, status flagged_for_review, outbox event {event_id}")
 
     async def provide_human_feedback(
         self,
@@ -631,16 +1070,70 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
             "status": "feedback_received",
         }
         # Example: update the state of the HITL request
-        await self._state_manager.set_state(f"hitl_review_{review_request_id}", feedback_event)
-        logger.info(f"HITL_FEEDBACK_RECEIVED: {json.dumps(feedback_event)}")
+        await self._set_actor_state(f"hitl_review_{review_request_id}", feedback_event)
+        await self.review_index.upsert(
+            review_request_id,
+            "feedback_received",
+            resolution_status=resolution_status,
+            reviewer_id=(reviewer_details or {}).get("id"),
+        )
+        event_id = await self._enqueue_hitl_event(HITL_FEEDBACK_TOPIC, feedback_event)
+        logger.info(
+            f"HITL_FEEDBACK_RECEIVED: review {review_request_id}, status {resolution_status}, outbox event {event_id}"
+        )
         # Potentially trigger further processing based on feedback
         # if resolution_status == "approved":
         #    await self._resume_task_after_hitl(review_request_id, feedback_payload)
         pass
 
+    async def list_review_requests(
+        self, input: dict[str, object]
+    ) -> dict[str, object] | None:
+        statuses = cast(list[str] | None, input.get("statuses"))
+        assigned_to = cast(str | None, input.get("assigned_to"))
+        offset = int(cast(int, input.get("offset", 0)))
+        limit = cast(int | None, input.get("limit"))
+        logger.info(
+            f"Actor '{self.id.id}' method 'list_review_requests' called with statuses: {statuses}, assigned_to: {assigned_to}"
+        )
+        reviews = await self.review_index.list(statuses=statuses, assigned_to=assigned_to, offset=offset, limit=limit)
+        return {**reviews, "outbox": await self.hitl_outbox.stats()}
+
+    async def _enqueue_hitl_event(self, topic: str, event: dict[str, object]) -> str | None:
+        """
+        Queue a HITL event in the outbox, scheduling the drain reminder if none is pending.
+        Returns the outbox event id, or None if the same event was already queued.
+        """
+        event_id, needs_drain = await self.hitl_outbox.enqueue(topic, event)
+        if needs_drain:
+            # Registering the reminder is the only sidecar call left in the turn, and only
+            # the first event of a burst pays it.
+            await self.register_reminder(
+                name=OUTBOX_DRAIN_REMINDER,
+                state=encode_payload(stamp_schedule({})),
+                due_time=timedelta(seconds=OUTBOX_DRAIN_DELAY_SECONDS),
+                period=timedelta(seconds=OUTBOX_DRAIN_PERIOD_SECONDS),
+            )
+        logger.debug(f"Actor '{self.id.id}': Queued HITL event {event_id} on '{topic}'.")
+        return event_id
+
+    async def _publish_dapr_event(self, topic: str, event: dict[str, object], event_id: str) -> None:
+        d = await shared_dapr_client.get()
+        await shared_dapr_client.run(
+            d.publish_event(
+                pubsub_name=HITL_PUBSUB_NAME,
+                topic_name=topic,
+                data=json.dumps(event),
+                data_content_type="application/json",
+                # Subscribers dedupe redeliveries on the CloudEvent id.
+                publish_metadata={"cloudevent.id": event_id},
+            )
+        )
+
     # --- Dapr Workflow Interaction (Retained for explicit orchestration if needed) ---
-    # Note: These require dapr.clients.DaprClient, which means the actor needs
-    # to be able to instantiate it. This is generally fine but adds a dependency.
+    # Note: These use the process-wide async Dapr client (see dapr_clients.py), so they
+    # never block the event loop and reuse one gRPC channel. Each call accepts an optional
+    # "timeout_seconds" in its input.
     async def start_external_workflow(
         self,
         input: dict[str, object]
@@ -649,26 +1142,29 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
         workflow_component_name = cast(str, input.get("workflow_component_name", "dapr"))
         workflow_input = cast(dict[str, object], input.get("workflow_input"))
         workflow_options = cast(dict[str, str], input.get("workflow_options"))
+        timeout = cast(float | None, input.get("timeout_seconds"))
         
         logger.info(
             f"Actor '{self.id.id}' method 'start_external_workflow' for workflow_name: {workflow_name}"
         )
         try:
-
-            with DaprClient() as d:
-                instance_id = d.start_workflow(
+            d = await shared_dapr_client.get()
+            instance_id = await shared_dapr_client.run(
+                d.start_workflow(
                     workflow_component=workflow_component_name,
                     workflow_name=workflow_name,
                     input=workflow_input,
                     instance_id=workflow_options.get("instance_id")
                     if workflow_options
                     else None,
-                    workflow_options=workflow_options,  # Pass other options like task_queue
-                )
-                logger.info(
-                    f"Actor '{self.id.id}': Started workflow '{workflow_name}' with instance_id '{instance_id}'."
-                )
-                return instance_id.instance_id
+                    workflow_options=workflow_options or {},  # Pass other options like task_queue
+                ),
+                timeout,
+            )
+            logger.info(
+                f"Actor '{self.id.id}': Started workflow '{workflow_name}' with instance_id '{instance_id}'."
+            )
+            return instance_id.instance_id
         except Exception as e:
             logger.error(
                 f"Actor '{self.id.id}': Failed to start workflow '{workflow_name}': {e}",
@@ -684,22 +1180,25 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
         event_name = cast(str, input.get("event_name"))
         event_payload = cast(dict[str, object], input.get("event_payload"))
         workflow_component_name = cast(str, input.get("workflow_component_name", "dapr"))
+        timeout = cast(float | None, input.get("timeout_seconds"))
         
         logger.info(
             f"Actor '{self.id.id}' method 'send_event_to_workflow' for instance_id: {workflow_instance_id}, event: {event_name}"
         )
         try:
-
-            with DaprClient() as d:
+            d = await shared_dapr_client.get()
+            await shared_dapr_client.run(
                 d.raise_workflow_event(
                     instance_id=workflow_instance_id,
                     workflow_component=workflow_component_name,
                     event_name=event_name,
                     event_data=event_payload,
-                )
-                logger.info(
-                    f"Actor '{self.id.id}': Sent event '{event_name}' to workflow '{workflow_instance_id}'."
-                )
+                ),
+                timeout,
+            )
+            logger.info(
+                f"Actor '{self.id.id}': Sent event '{event_name}' to workflow '{workflow_instance_id}'."
+            )
         except Exception as e:
             logger.error(
                 f"Actor '{self.id.id}': Failed to send event '{event_name}' to workflow '{workflow_instance_id}': {e}",
@@ -713,34 +1212,37 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
     ) -> dict[str, object] | None:
         workflow_instance_id = cast(str, input.get("workflow_instance_id"))
         workflow_component_name = cast(str, input.get("workflow_component_name", "dapr"))
+        timeout = cast(float | None, input.get("timeout_seconds"))
         logger.info(
             f"Actor '{self.id.id}' method 'get_external_workflow_status' for instance_id: {workflow_instance_id}"
         )
         try:
-
-            with DaprClient() as d:
-                resp = d.get_workflow(
+            d = await shared_dapr_client.get()
+            resp = await shared_dapr_client.run(
+                d.get_workflow(
                     instance_id=workflow_instance_id,
                     workflow_component=workflow_component_name,
-                )
-                logger.info(
-                    f"Actor '{self.id.id}': Retrieved status for workflow '{workflow_instance_id}'."
-                )
-                # The response object (WorkflowReference) has attributes like instance_id, runtime_status, etc.
-                # Convert to dict for generic return type if needed.
-                return {
-                    "instance_id": resp.instance_id,
-                    "workflow_name": resp.workflow_name,
-                    "created_at": resp.created_at.isoformat()
-                    if resp.created_at
-                    else None,
-                    "last_updated_at": resp.last_updated_at.isoformat()
-                    if resp.last_updated_at
-                    and isinstance(resp.last_updated_at, datetime)
-                    else resp.last_updated_at,
-                    "runtime_status": resp.runtime_status,
-                    "properties": resp.properties,  # Contains input, output, custom_status if set
-                }
+                ),
+                timeout,
+            )
+            logger.info(
+                f"Actor '{self.id.id}': Retrieved status for workflow '{workflow_instance_id}'."
+            )
+            # The response object (WorkflowReference) has attributes like instance_id, runtime_status, etc.
+            # Convert to dict for generic return type if needed.
+            return {
+                "instance_id": resp.instance_id,
+                "workflow_name": resp.workflow_name,
+                "created_at": resp.created_at.isoformat()
+                if resp.created_at
+                else None,
+                "last_updated_at": resp.last_updated_at.isoformat()
+                if resp.last_updated_at
+                and isinstance(resp.last_updated_at, datetime)
+                else resp.last_updated_at,
+                "runtime_status": resp.runtime_status,
+                "properties": resp.properties,  # Contains input, output, custom_status if set
+            }
         except Exception as e:
             logger.error(
                 f"Actor '{self.id.id}': Failed to get status for workflow '{workflow_instance_id}': {e}",
@@ -754,18 +1256,22 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
     ) -> None:
         workflow_instance_id = cast(str, input.get("workflow_instance_id"))
         workflow_component_name = cast(str, input.get("workflow_component_name", "dapr"))
+        timeout = cast(float | None, input.get("timeout_seconds"))
         logger.info(
             f"Actor '{self.id.id}' method 'terminate_external_workflow' for instance_id: {workflow_instance_id}"
         )
         try:
-            with DaprClient() as d:
+            d = await shared_dapr_client.get()
+            await shared_dapr_client.run(
                 d.terminate_workflow(
                     instance_id=workflow_instance_id,
                     workflow_component=workflow_component_name,
-                )
-                logger.info(
-                    f"Actor '{self.id.id}': Terminated workflow '{workflow_instance_id}'."
-                )
+                ),
+                timeout,
+            )
+            logger.info(
+                f"Actor '{self.id.id}': Terminated workflow '{workflow_instance_id}'."
+            )
         except Exception as e:
             logger.error(
                 f"Actor '{self.id.id}': Failed to terminate workflow '{workflow_instance_id}': {e}",
@@ -781,52 +1287,51 @@ class BaseActor(Actor, BaseActorInterface, Remindable):
         self, state_name: str, default: list[dict[str, str]] | None = []
     ) -> object | list[dict[str, str]] | None:
         """
-        Helper to retrieve a specific state value.
-        This is a thin wrapper around self._state_manager.get_state() primarily
-        for centralized logging and default value handling.
-        It could be replaced by direct calls if desired, sacrificing some logging clarity.
+        Helper to retrieve a specific state value, returning `default` when it is missing.
+        Reads never write: a missing key is not materialized with the default. Keys found
+        missing are remembered for the rest of the activation (see `_set_actor_state`), so
+        repeated lookups of an absent entry or plan cost no state store round trip.
         """
-        logger.debug(f"Actor '{self.id.id}': Attempting to get state '{state_name}'.")
-        try:
-            # Dapr's state_manager.get_state returns the value directly if found.
-            # It raises a KeyError if not found.
-            value = await self._state_manager.get_state(state_name)
-            logger.debug(
-                f"Actor '{self.id.id}': Retrieved state '{state_name}' successfully."
-            )
-            return value
-        except (
-            KeyError
-        ):  # Dapr's actor._state_manager.get_state raises KeyError if key not found.
-            logger.info(
-                f"Actor '{self.id.id}': State '{state_name}' not found, returning default."
-            )
-            # add a new state with the default value
-            await self._state_manager.set_state(state_name, default)
+        if state_name in self._absent_state or state_name in self._absent_in_turn:
+            logger.debug(f"Actor '{self.id.id}': State '{state_name}' known absent, returning default.")
             return default
+        try:
+            found, value = await self.state.try_get_state(state_name)
         except Exception as e:
             logger.error(
                 f"Actor '{self.id.id}': Error getting state '{state_name}': {e}",
                 exc_info=True,
             )
             return default
-        
-    async def _create_engine(self, engine_type: str, engine_config: dict[str, str | list]) -> None:
-        if engine_type == "openai":
-            engine = OpenAIEngineAdapter()
-            await engine.initialize(
-                agent_name=engine_config.get("name", "DACA Agent"), # type: ignore
-                agent_instructions=engine_config.get("instructions", "You are a helpful assistant"), # type: ignore
-                agent_tools=engine_config.get("tools", []), # type: ignore
-                model=engine_config.get("model", "gpt-4") # type: ignore
-            )
-            self.agentic_engine = engine
-        else:
-            raise ValueError(f"Unsupported engine type: {engine_type}")
+        if not found:
+            logger.debug(f"Actor '{self.id.id}': State '{state_name}' not found, returning default.")
+            self._absent_in_turn.add(state_name)
+            return default
+        return value
+
+    async def _set_actor_state(self, state_name: str, value: object) -> None:
+        """Write a state value; all writes to keys read with `_get_actor_state` go through here."""
+        self._absent_state.discard(state_name)
+        self._absent_in_turn.discard(state_name)
+        await self.state.set_state(state_name, value)
+
+    async def _remove_actor_state(self, state_name: str) -> None:
+        """Remove a state value. Raises KeyError if it does not exist."""
+        await self.state.remove_state(state_name)
+        self._absent_in_turn.add(state_name)
+
+    async def _create_engine(self, engine_type: str, engine_config: dict[str, str | list]) -> AgenticEngineAdapter:
+        # Engine types are looked up in the registry; see agents/engine_registry.py.
+        return await engine_registry.create(engine_type, engine_config)
         
     async def _get_engine(self, engine_config: dict[str, str | list], engine_type: str = "openai") -> AgenticEngineAdapter:
-        if self.agentic_engine is None:
-            await self._create_engine(engine_type=engine_type, engine_config=engine_config)
+        # Engines are shared process-wide by config, so a fresh activation reuses a warm adapter.
+        key = engine_config_key(engine_type, engine_config)
+        if self.agentic_engine is None or self._engine_key != key:
+            self.agentic_engine = await engine_pool.get_or_create(
+                key, lambda: self._create_engine(engine_type=engine_type, engine_config=engine_config)
+            )
+            self._engine_key = key
         
         if not isinstance(self.agentic_engine, AgenticEngineAdapter):
             raise ValueError("Agentic engine is not properly initialized")
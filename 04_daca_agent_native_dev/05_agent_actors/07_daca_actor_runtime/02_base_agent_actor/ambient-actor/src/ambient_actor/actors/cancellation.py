@@ -0,0 +1,107 @@
+"""
+Deadlines and cooperative cancellation for engine calls inside actor turns.
+
+An actor turn holds the actor's lock for as long as its engine call runs, so a request
+the client has abandoned must not be allowed to run to completion:
+
+- Deadline: callers pass an absolute `deadline_at` (epoch seconds) with the actor call.
+  The engine call is cancelled when it passes, and the turn ends with
+  `TurnDeadlineExceeded`. `deadline_at` is read on the actor host's clock, so it assumes
+  the hosts' clocks agree (NTP); callers also send the relative `timeout_seconds`, which
+  bounds the turn from when it starts if the actor host's clock runs behind.
+- Cancellation: callers also pass a `cancel_token`. Calling
+  `turn_cancellations.cancel(token)` cancels the engine call registered under that token
+  (for example when the HTTP client disconnects), and the turn ends with `TurnCancelled`.
+  A token cancelled before its turn starts (the request is still queued behind other
+  turns) makes that turn end as soon as it reaches the engine.
+
+Cancellation travels into the engine adapter as an ordinary `asyncio.CancelledError`,
+which aborts the in-flight model request. A `run_sync` call that is already running in a
+worker thread cannot be interrupted: the turn still ends at once, but the thread runs
+on (see agents/sync_runner.py). Like the stream hub, the registry is
+process-local: it reaches actors hosted by the same app process that serves the HTTP
+endpoint. Actors hosted elsewhere are still bounded by the deadline.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+# Tokens cancelled before their turn started are remembered up to this many.
+MAX_PENDING_CANCELLATIONS = 1024
+
+
+class TurnDeadlineExceeded(TimeoutError):
+    """The caller's deadline passed before the engine call finished."""
+
+
+class TurnCancelled(Exception):
+    """The caller cancelled the request while the engine call was running."""
+
+
+def deadline_after(timeout_seconds: float) -> float:
+    return time.time() + timeout_seconds
+
+
+class TurnCancellations:
+    """Registry of running engine calls by cancel token."""
+
+    def __init__(self):
+        self._tasks: dict[str, asyncio.Task] = {}
+        # Insertion-ordered so the oldest pending cancellations are dropped first.
+        self._cancelled: dict[str, None] = {}
+
+    def cancel(self, token: str) -> bool:
+        """
+        Cancel the engine call registered under `token`, or the next one to register under it.
+        Returns True if a running engine call was cancelled.
+        """
+        self._cancelled[token] = None
+        while len(self._cancelled) > MAX_PENDING_CANCELLATIONS:
+            del self._cancelled[next(iter(self._cancelled))]
+        task = self._tasks.get(token)
+        if task is None or task.done():
+            return False
+        logger.info(f"TurnCancellations: cancelling engine call for request '{token}'.")
+        task.cancel()
+        return True
+
+    @asynccontextmanager
+    async def guard(self, token: str | None, deadline_at: float | None) -> AsyncIterator[None]:
+        """
+        Run the enclosed block under the deadline and make it cancellable by `token`.
+        Without either, the block runs unguarded.
+        """
+        task = asyncio.current_task()
+        if token and task is not None:
+            self._tasks[token] = task
+        loop = asyncio.get_running_loop()
+        when = loop.time() + (deadline_at - time.time()) if deadline_at is not None else None
+        timeout = asyncio.timeout_at(when)
+        try:
+            if token in self._cancelled:
+                raise TurnCancelled(f"Request '{token}' was cancelled by the caller")
+            async with timeout:
+                yield
+        except TimeoutError as e:
+            if not timeout.expired():
+                # The engine's own timeout (e.g. an HTTP read timeout), not the turn deadline.
+                raise
+            raise TurnDeadlineExceeded("Deadline exceeded before the engine call finished") from e
+        except asyncio.CancelledError:
+            if token is None or token not in self._cancelled or task is None:
+                raise
+            # Our own cancellation: absorb it so the turn can end normally.
+            task.uncancel()
+            raise TurnCancelled(f"Request '{token}' was cancelled by the caller") from None
+        finally:
+            if token:
+                self._tasks.pop(token, None)
+                self._cancelled.pop(token, None)
+
+
+turn_cancellations = TurnCancellations()
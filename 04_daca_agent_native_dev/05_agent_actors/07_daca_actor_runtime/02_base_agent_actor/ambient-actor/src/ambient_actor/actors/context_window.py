@@ -0,0 +1,199 @@
+"""
+Token-budgeted context window for DACA actors.
+
+The engine receives the most recent turns that fit into `max_tokens`, preceded by a
+rolling summary of everything older. Messages that slide out of the window are folded
+into the summary once and the summary is kept under its own `summary_max_tokens` budget,
+so prompt size (and model latency) stays bounded no matter how long the history grows.
+
+The summary is extractive (one condensed line per message, oldest lines dropped first)
+so building it never costs an extra model call inside the actor turn.
+"""
+
+import json
+import logging
+from functools import lru_cache
+
+from dapr.actor.runtime.state_manager import ActorStateManager
+
+from ambient_actor.actors.conversation_store import ConversationStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TOKENS = 8000
+DEFAULT_SUMMARY_MAX_TOKENS = 512
+# The summary never takes more than this share of `max_tokens`.
+MAX_SUMMARY_FRACTION = 0.25
+# Rough chars-per-token ratio for English text with BPE tokenizers. Token counts in this
+# module are estimates, not the model's tokenizer: code, JSON and non-English text can
+# take noticeably more tokens, so leave headroom below the model's real context limit.
+CHARS_PER_TOKEN = 4
+# Per-message framing (role, separators) added to every estimate.
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_LINE_CHARS = 200
+SUMMARY_HEADER = "Summary of the earlier conversation:\n"
+
+
+def _message_text(message: dict) -> str:
+    content = message.get("content")
+    if isinstance(content, str):
+        return content
+    return json.dumps(message, sort_keys=True, default=str)
+
+
+@lru_cache(maxsize=4096)
+def _estimate_text_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+
+def estimate_tokens(message: dict) -> int:
+    """Cached token estimate for a single conversation item."""
+    return _estimate_text_tokens(_message_text(message))
+
+
+def _summary_line(message: dict) -> str:
+    role = message.get("role") or message.get("type") or "item"
+    text = " ".join(_message_text(message).split())
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[: SUMMARY_LINE_CHARS - 3] + "..."
+    return f"{role}: {text}"
+
+
+def _trim_summary_lines(lines: list[str], summary_max_tokens: int) -> list[str]:
+    """
+    Drop the oldest lines until the summary message, header and framing included, fits
+    `summary_max_tokens`.
+    """
+    max_chars = (summary_max_tokens - MESSAGE_OVERHEAD_TOKENS) * CHARS_PER_TOKEN - len(SUMMARY_HEADER)
+    size = sum(len(line) + 1 for line in lines)
+    start = 0
+    while start < len(lines) and size > max_chars:
+        size -= len(lines[start]) + 1
+        start += 1
+    return lines[start:]
+
+
+class ContextWindow:
+    """Builds engine input from the chunked conversation store plus a rolling summary."""
+
+    def __init__(
+        self,
+        state_manager: ActorStateManager,
+        store: ConversationStore,
+        summary_key: str = "conversation_summary",
+    ):
+        self._state_manager = state_manager
+        self.store = store
+        self.summary_key = summary_key
+
+    async def build(
+        self,
+        pending: list[dict] | None = None,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        summary_max_tokens: int = DEFAULT_SUMMARY_MAX_TOKENS,
+        persist_summary: bool = True,
+    ) -> dict[str, object]:
+        """
+        Return `{"messages", "summary", "token_estimate", "included_messages", "total_messages"}`.
+        `pending` messages (e.g. the new user message) are always included and count
+        against the budget first. Without pending messages the latest stored turn is always
+        included, even if it alone exceeds the budget.
+        """
+        pending = pending or []
+        summary_max_tokens = max(0, min(summary_max_tokens, int(max_tokens * MAX_SUMMARY_FRACTION)))
+        budget = max_tokens - summary_max_tokens - sum(estimate_tokens(m) for m in pending)
+        head = await self.store.load_head()
+        total = head["length"]
+
+        # Walk backwards through the chunks until the budget is used up.
+        window: list[dict] = []
+        used = 0
+        full = False
+        async for _, chunk in self.store.iter_chunks(reverse=True):
+            for message in reversed(chunk):
+                cost = estimate_tokens(message)
+                if used + cost > budget:
+                    full = True
+                    break
+                window.append(message)
+                used += cost
+            if full:
+                break
+        window.reverse()
+
+        if not pending and len(window) < total and not any(m.get("role") == "user" for m in window):
+            # Over budget before reaching a user message: keep the whole latest turn anyway.
+            window = await self._latest_turn(total, head["chunk_size"])
+            used = sum(estimate_tokens(m) for m in window)
+
+        # Never start the window with a tool output whose call was cut off.
+        while window and window[0].get("type") == "function_call_output":
+            used -= estimate_tokens(window.pop(0))
+
+        window_start = total - len(window)
+        summary = await self._fold_summary(
+            window_start, head["chunk_size"], summary_max_tokens, persist_summary
+        )
+
+        messages: list[dict] = []
+        if summary["text"]:
+            messages.append({"role": "system", "content": f"{SUMMARY_HEADER}{summary['text']}"})
+        messages.extend(window)
+        messages.extend(pending)
+
+        return {
+            "messages": messages,
+            "summary": summary["text"],
+            "token_estimate": sum(estimate_tokens(m) for m in messages),
+            "included_messages": len(window),
+            "total_messages": total,
+        }
+
+    async def _latest_turn(self, total: int, chunk_size: int) -> list[dict]:
+        """The stored messages from the last user message on (just the last one if there is none)."""
+        messages: list[dict] = []
+        for index in range((total - 1) // chunk_size, -1, -1):
+            messages[:0] = await self.store.read_chunk(index)
+            for position in range(len(messages) - 1, -1, -1):
+                if messages[position].get("role") == "user":
+                    return messages[position:]
+        return messages[-1:]
+
+    async def _fold_summary(
+        self, window_start: int, chunk_size: int, summary_max_tokens: int, persist: bool
+    ) -> dict[str, object]:
+        found, summary = await self._state_manager.try_get_state(self.summary_key)
+        if not found or not isinstance(summary, dict):
+            summary = {"text": "", "covered": 0}
+
+        covered = int(summary.get("covered", 0))
+        lines = [line for line in str(summary.get("text", "")).split("\n") if line]
+        if window_start <= covered:
+            if window_start < covered:
+                # The window grew back over summarized messages (e.g. a larger budget this
+                # turn). The summary has one line per message, newest last, so drop the
+                # lines for the messages that are now sent verbatim.
+                del lines[max(len(lines) - (covered - window_start), 0):]
+            # The stored summary may come from a turn with a larger summary budget.
+            trimmed = _trim_summary_lines(lines, summary_max_tokens)
+            if window_start == covered and len(trimmed) == len(lines):
+                return summary
+            summary = {"text": "\n".join(trimmed), "covered": window_start}
+            if persist:
+                await self._state_manager.set_state(self.summary_key, summary)
+            return summary
+
+        # Fold only the messages that left the window since the last turn. Anything
+        # older than what the summary budget can hold would be trimmed anyway.
+        max_lines = max(1, summary_max_tokens * CHARS_PER_TOKEN // SUMMARY_LINE_CHARS)
+        fold_from = max(covered, window_start - max_lines)
+        for index in range(fold_from // chunk_size, (window_start - 1) // chunk_size + 1):
+            chunk = await self.store.read_chunk(index)
+            start = max(fold_from - index * chunk_size, 0)
+            end = min(window_start - index * chunk_size, len(chunk))
+            lines.extend(_summary_line(message) for message in chunk[start:end])
+
+        summary = {"text": "\n".join(_trim_summary_lines(lines, summary_max_tokens)), "covered": window_start}
+        if persist:
+            await self._state_manager.set_state(self.summary_key, summary)
+        return summary
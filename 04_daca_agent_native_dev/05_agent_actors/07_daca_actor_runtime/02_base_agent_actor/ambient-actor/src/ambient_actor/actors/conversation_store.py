@@ -0,0 +1,134 @@
+"""
+Segmented, append-only conversation storage for DACA actors.
+
+Instead of one ever-growing `conversation` list that is rewritten on every turn, the
+history is split into fixed-size chunks stored under their own keys, plus a small head
+record that indexes them:
+
+    conversation_head      -> {"chunk_size": 50, "chunk_count": 3, "length": 128}
+    conversation_chunk_0   -> [50 messages]
+    conversation_chunk_1   -> [50 messages]
+    conversation_chunk_2   -> [28 messages]   (tail)
+
+An append only touches the tail chunk (and a new chunk when it fills up) and the head,
+so the per-turn write cost stays flat regardless of history length. Reads can page
+through chunks lazily.
+"""
+
+import logging
+from collections.abc import AsyncIterator
+
+from dapr.actor.runtime.state_manager import ActorStateManager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 50
+
+
+class ConversationStore:
+    """Chunked conversation history on top of an actor's state manager."""
+
+    def __init__(
+        self,
+        state_manager: ActorStateManager,
+        key: str = "conversation",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self._state_manager = state_manager
+        self.key = key
+        self.head_key = f"{key}_head"
+        self.chunk_size = chunk_size
+
+    def chunk_key(self, index: int) -> str:
+        return f"{self.key}_chunk_{index}"
+
+    async def load_head(self) -> dict[str, int]:
+        """Return the head record, migrating a legacy single-key list on first access."""
+        found, head = await self._state_manager.try_get_state(self.head_key)
+        if found and isinstance(head, dict):
+            return head
+
+        head = {"chunk_size": self.chunk_size, "chunk_count": 0, "length": 0}
+        found, legacy = await self._state_manager.try_get_state(self.key)
+        if found:
+            if isinstance(legacy, list) and legacy:
+                logger.info(f"Migrating legacy '{self.key}' list of {len(legacy)} messages to chunks.")
+                head = await self._write_messages(head, legacy)
+            await self._state_manager.remove_state(self.key)
+        return head
+
+    async def append(self, messages: list[dict]) -> dict[str, int]:
+        """Append messages, writing only the tail chunk(s) and the head."""
+        head = await self.load_head()
+        if not messages:
+            return head
+        return await self._write_messages(head, messages)
+
+    async def read_chunk(self, index: int) -> list[dict]:
+        found, chunk = await self._state_manager.try_get_state(self.chunk_key(index))
+        return chunk if found and isinstance(chunk, list) else []
+
+    async def iter_chunks(self, reverse: bool = False) -> AsyncIterator[tuple[int, list[dict]]]:
+        """Lazily yield `(chunk_index, messages)` pairs, oldest first unless `reverse`."""
+        head = await self.load_head()
+        indexes = range(head["chunk_count"])
+        for index in reversed(indexes) if reverse else indexes:
+            yield index, await self.read_chunk(index)
+
+    async def read_all(self) -> list[dict]:
+        messages: list[dict] = []
+        async for _, chunk in self.iter_chunks():
+            messages.extend(chunk)
+        return messages
+
+    async def read_tail(self, count: int) -> list[dict]:
+        """Return the last `count` messages, reading only the chunks that hold them."""
+        collected: list[list[dict]] = []
+        remaining = count
+        async for _, chunk in self.iter_chunks(reverse=True):
+            if remaining <= 0:
+                break
+            collected.append(chunk[-remaining:])
+            remaining -= len(chunk)
+        return [message for chunk in reversed(collected) for message in chunk]
+
+    async def read_page(self, chunk_index: int | None = None) -> dict[str, object]:
+        """Return one chunk as a page; defaults to the most recent chunk."""
+        head = await self.load_head()
+        if chunk_index is None:
+            chunk_index = head["chunk_count"] - 1
+        messages = (
+            await self.read_chunk(chunk_index)
+            if 0 <= chunk_index < head["chunk_count"]
+            else []
+        )
+        return {
+            "chunk_index": chunk_index,
+            "chunk_count": head["chunk_count"],
+            "total_messages": head["length"],
+            "messages": messages,
+        }
+
+    async def _write_messages(self, head: dict[str, int], messages: list[dict]) -> dict[str, int]:
+        chunk_size = head.get("chunk_size", self.chunk_size)
+        length = head["length"]
+        chunk_count = head["chunk_count"]
+
+        # Fill the current tail chunk first, then open new ones as needed.
+        pending = list(messages)
+        index = length // chunk_size
+        offset = length % chunk_size
+        while pending:
+            tail = await self.read_chunk(index) if offset else []
+            room = chunk_size - offset
+            tail = tail + pending[:room]
+            pending = pending[room:]
+            await self._state_manager.set_state(self.chunk_key(index), tail)
+            index += 1
+            offset = 0
+
+        length += len(messages)
+        chunk_count = max(chunk_count, -(-length // chunk_size))
+        new_head = {"chunk_size": chunk_size, "chunk_count": chunk_count, "length": length}
+        await self._state_manager.set_state(self.head_key, new_head)
+        return new_head
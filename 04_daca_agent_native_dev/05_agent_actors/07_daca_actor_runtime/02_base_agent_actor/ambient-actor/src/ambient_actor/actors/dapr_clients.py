@@ -0,0 +1,57 @@
+"""
+Process-wide async Dapr client shared by all actors on the host.
+
+Opening `with DaprClient() as d:` inside an actor method sets up a new gRPC channel per
+call and blocks the event loop for the whole round trip. Actors instead await calls on one
+lazily created `dapr.aio.clients.DaprClient`, whose channel is reused across calls and
+reconnects on its own if the sidecar restarts. Every call is bounded by a timeout so a slow
+sidecar cannot hold an actor turn indefinitely.
+"""
+
+import asyncio
+import logging
+import os
+from collections.abc import Awaitable
+from typing import TypeVar
+
+from dapr.aio.clients import DaprClient
+from dapr.clients.health import DaprHealth
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_CALL_TIMEOUT_SECONDS = float(os.getenv("DAPR_CLIENT_CALL_TIMEOUT_SECONDS", "10"))
+
+
+class SharedDaprClient:
+    """Lazily created, shared async Dapr client with per-call timeouts."""
+
+    def __init__(self, default_timeout: float = DEFAULT_CALL_TIMEOUT_SECONDS):
+        self.default_timeout = default_timeout
+        self._client: DaprClient | None = None
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> DaprClient:
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    logger.info("Creating shared async Dapr client.")
+                    # DaprClient() runs a blocking sidecar health check. Wait for the sidecar in
+                    # a worker thread first so that check passes at once on the event loop.
+                    await asyncio.to_thread(DaprHealth.wait_until_ready)
+                    self._client = DaprClient()
+        return self._client
+
+    async def run(self, call: Awaitable[T], timeout: float | None = None) -> T:
+        """Await a client call, cancelling it once the timeout expires."""
+        return await asyncio.wait_for(call, timeout or self.default_timeout)
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._client is not None:
+                await self._client.close()
+                self._client = None
+
+
+shared_dapr_client = SharedDaprClient()
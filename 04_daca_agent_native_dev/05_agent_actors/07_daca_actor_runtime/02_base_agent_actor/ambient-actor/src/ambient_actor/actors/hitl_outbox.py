@@ -0,0 +1,147 @@
+"""
+Transactional outbox for human-in-the-loop (HITL) events.
+
+Publishing to pub/sub from inside `FlagForHumanReview` would add a sidecar round trip,
+and its failure modes, to every flagging turn. Events are instead appended to an outbox
+kept in actor state:
+
+    hitl_outbox -> {
+        "pending": {"<event_id>": {"topic": ..., "data": {...}, "attempts": 0, "next_attempt_at": ...}},
+        "published": ["<event_id>", ...],   # recently published ids, oldest first
+        "dead_letter": {"<event_id>": {...}},
+        "drain_scheduled": true,
+    }
+
+The outbox is written in the same actor turn as the review record, and Dapr commits the
+turn's state in one transaction, so an event is queued if and only if the review change
+it describes is saved. A drain reminder later publishes pending events in batches, in its
+own turn, and removes them once the sidecar accepts them:
+
+- Batching: one drain turn publishes up to `batch_size` events concurrently, so a burst of
+  reviews costs a few drain turns instead of one publish per flagging turn.
+- Retries: failed events stay pending with exponential backoff. After
+  `MAX_PUBLISH_ATTEMPTS` they move to `dead_letter` instead of blocking the outbox.
+- Dedupe: event ids are derived from the event content, so a retried `FlagForHumanReview`
+  does not queue a second event. The id is also sent as the CloudEvent id, so subscribers
+  can drop the redelivery that happens if a drain turn publishes but fails to save.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+
+from dapr.actor.runtime.state_manager import ActorStateManager
+
+logger = logging.getLogger(__name__)
+
+# publish(topic, data, event_id); raises if the sidecar did not accept the event.
+Publisher = Callable[[str, dict[str, object], str], Awaitable[None]]
+
+HITL_PUBSUB_NAME = os.getenv("HITL_PUBSUB_NAME", "pubsub")
+HITL_REQUESTS_TOPIC = os.getenv("HITL_REQUESTS_TOPIC", "hitl_requests_topic")
+HITL_FEEDBACK_TOPIC = os.getenv("HITL_FEEDBACK_TOPIC", "hitl_feedback_topic")
+
+OUTBOX_DRAIN_REMINDER = "hitl_outbox_drain"
+# Delay before the first drain after the outbox fills, letting a burst collect into one batch.
+OUTBOX_DRAIN_DELAY_SECONDS = float(os.getenv("HITL_OUTBOX_DRAIN_DELAY_SECONDS", "1"))
+OUTBOX_DRAIN_PERIOD_SECONDS = float(os.getenv("HITL_OUTBOX_DRAIN_PERIOD_SECONDS", "10"))
+OUTBOX_BATCH_SIZE = int(os.getenv("HITL_OUTBOX_BATCH_SIZE", "50"))
+MAX_PUBLISH_ATTEMPTS = 8
+MAX_BACKOFF_SECONDS = 300.0
+MAX_PUBLISHED_IDS = 256
+MAX_DEAD_LETTERS = 100
+
+
+def outbox_event_id(topic: str, data: dict[str, object]) -> str:
+    """Content-derived event id; the event timestamp is left out so retries map to the same id."""
+    content = {key: value for key, value in data.items() if key != "timestamp"}
+    encoded = json.dumps([topic, content], sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class HitlOutbox:
+    """Outbox of HITL events stored under a single actor state key."""
+
+    def __init__(self, state_manager: ActorStateManager, key: str = "hitl_outbox"):
+        self._state_manager = state_manager
+        self.key = key
+
+    async def _load(self) -> dict[str, object]:
+        found, outbox = await self._state_manager.try_get_state(self.key)
+        outbox = outbox if found and isinstance(outbox, dict) else {}
+        outbox.setdefault("pending", {})
+        outbox.setdefault("published", [])
+        outbox.setdefault("dead_letter", {})
+        return outbox
+
+    async def enqueue(self, topic: str, data: dict[str, object]) -> tuple[str | None, bool]:
+        """
+        Queue an event for publication. Returns `(event_id, needs_drain)`: `event_id` is None
+        if the same event is already queued or was recently published, and `needs_drain` is
+        True if no drain reminder is scheduled yet.
+        """
+        outbox = await self._load()
+        pending = outbox["pending"]
+        event_id = outbox_event_id(topic, data)
+        if event_id in pending or event_id in outbox["published"]:
+            logger.info(f"HitlOutbox: event {event_id[:12]} on '{topic}' is already queued or published.")
+            return None, False
+        pending[event_id] = {"topic": topic, "data": data, "attempts": 0, "next_attempt_at": 0.0}
+        needs_drain = not outbox.get("drain_scheduled")
+        outbox["drain_scheduled"] = True
+        await self._state_manager.set_state(self.key, outbox)
+        return event_id, needs_drain
+
+    async def drain(self, publish: Publisher, batch_size: int = OUTBOX_BATCH_SIZE) -> dict[str, int]:
+        """
+        Publish up to `batch_size` due events concurrently and drop the published ones.
+        Returns counts of `published`, `failed` and `remaining` events; once nothing remains
+        the outbox is marked as not needing a drain.
+        """
+        outbox = await self._load()
+        pending: dict[str, dict[str, object]] = outbox["pending"]
+        now = time.time()
+        due = [event_id for event_id, entry in pending.items() if float(entry["next_attempt_at"]) <= now][:batch_size]  # type: ignore[arg-type]
+
+        results = await asyncio.gather(
+            *(publish(str(pending[event_id]["topic"]), pending[event_id]["data"], event_id) for event_id in due),  # type: ignore[arg-type]
+            return_exceptions=True,
+        )
+        published = failed = 0
+        for event_id, result in zip(due, results, strict=True):
+            entry = pending[event_id]
+            if not isinstance(result, BaseException):
+                del pending[event_id]
+                outbox["published"].append(event_id)
+                published += 1
+                continue
+            failed += 1
+            attempts = int(entry["attempts"]) + 1  # type: ignore[call-overload]
+            entry["attempts"] = attempts
+            entry["last_error"] = str(result)
+            if attempts >= MAX_PUBLISH_ATTEMPTS:
+                logger.error(f"HitlOutbox: giving up on event {event_id[:12]} after {attempts} attempts: {result}")
+                outbox["dead_letter"][event_id] = pending.pop(event_id)
+            else:
+                entry["next_attempt_at"] = now + min(2.0 ** attempts, MAX_BACKOFF_SECONDS)
+                logger.warning(f"HitlOutbox: publishing event {event_id[:12]} failed (attempt {attempts}): {result}")
+
+        del outbox["published"][: max(len(outbox["published"]) - MAX_PUBLISHED_IDS, 0)]
+        for stale in list(outbox["dead_letter"])[: max(len(outbox["dead_letter"]) - MAX_DEAD_LETTERS, 0)]:
+            del outbox["dead_letter"][stale]
+        outbox["drain_scheduled"] = bool(pending)
+        if due or not pending:
+            await self._state_manager.set_state(self.key, outbox)
+        return {"published": published, "failed": failed, "remaining": len(pending)}
+
+    async def stats(self) -> dict[str, int]:
+        outbox = await self._load()
+        return {
+            "pending": len(outbox["pending"]),
+            "published": len(outbox["published"]),
+            "dead_letter": len(outbox["dead_letter"]),
+        }
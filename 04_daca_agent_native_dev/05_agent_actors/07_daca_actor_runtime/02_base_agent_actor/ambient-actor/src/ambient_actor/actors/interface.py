@@ -47,20 +47,106 @@ class BaseActorInterface(ActorInterface):
                 - "message_data": dict, the actual message from the user (e.g., {"role": "user", "content": "Hi"}).
                 - "engine_config": dict, configuration for the agentic engine (e.g., {"run_method": "run", "model": "..."}).
                 - "engine_type": str, specifying the type of engine (e.g., "openai").
+                - "request_id": str, optional client request id used for deduplication.
+                - "idempotency_key": str, optional; derived from "message_data" and "request_id" if absent.
+                  A request whose key matches one this actor recently answered returns the recorded
+                  result (marked "deduplicated") without running the engine again.
+                - "deadline_at": float, optional absolute deadline (epoch seconds). The engine call is
+                  cancelled when it passes, or skipped if the request was queued past it.
+                - "timeout_seconds": float, optional time budget; the turn also ends this long after
+                  it starts, so a clock difference between hosts cannot extend it.
+                - "cancel_token": str, optional token the caller can pass to
+                  `turn_cancellations.cancel()` to abort the engine call (e.g. on client disconnect).
 
         Returns:
             dict[str, object] | None: A dictionary containing the processing status and result.
                 Example Success: `{"status": "success", "result": {"answer": "AI is..."}}`
                 Example Streaming: `{"status": "accepted_for_streaming", "stream_id": "unique_session_id", "stream_info": {"output_topic": "actor_stream_topic"}}`
                 Example Error: `{"status": "error", "error_message": "Failed to process."}`
+                Example Aborted: `{"status": "deadline_exceeded" | "cancelled", "error_message": "..."}`;
+                the turn leaves the conversation unchanged.
                 Returns `None` if the interface method is not implemented.
         """
         pass
 
+    @actormethod(name="ProcessMessageBatch")
+    async def process_message_batch(
+        self, input: dict[str, str | list | dict]
+    ) -> dict[str, object] | None:
+        """
+        What:
+            Handles many messages for the same actor in a single actor turn.
+        Why:
+            Ingestion and replay jobs would otherwise pay one proxy call, one state read and
+            one state write per message. Batching spreads that overhead across the batch.
+        How:
+            Loads the conversation once, runs the messages through the engine either one after
+            another ("sequential", one engine call per message) or together ("coalesced", one
+            engine call for the whole batch), and commits all state changes once at the end.
+
+        Args:
+            input (dict[str, str | list | dict]): A dictionary containing:
+                - "messages": list[dict], the messages in order (e.g. `[{"role": "user", "content": "Hi"}]`).
+                - "engine_config": dict, as for `ProcessMessage` ("run" or "run_sync" only).
+                - "engine_type": str, the engine type (e.g., "openai").
+                - "mode": str, optional, "sequential" (default) or "coalesced".
+                - "deadline_at", "timeout_seconds", "cancel_token": optional, as for `ProcessMessage`.
+
+        Returns:
+            dict[str, object] | None: `{"status", "actor_id", "mode", "processed", "results"}` where
+                `results` holds one `final_output` per engine call. If the batch is aborted, the
+                status is "deadline_exceeded" or "cancelled" and only the messages answered
+                before that are kept.
+        """
+        pass
+
+    @actormethod(name="ProcessMessageStream")
+    async def process_message_stream(
+        self, input: dict[str, str | list | dict]
+    ) -> dict[str, object] | None:
+        """
+        What:
+            Handles a message like `ProcessMessage`, but streams the engine output token by
+            token while the turn is running.
+        Why:
+            Fulfills 'Robust Streaming Capabilities' for LLM responses: clients see the first
+            tokens after first-chunk latency instead of waiting for the full generation.
+        How:
+            Runs the engine in streaming mode and publishes every delta to the process-local
+            stream hub under `stream_id`, where HTTP handlers (e.g. the SSE endpoint) fan them
+            out to clients. The conversation is persisted once, after the stream completes.
+
+        Args:
+            input (dict[str, str | list | dict]): Same keys as `ProcessMessage`, plus:
+                - "stream_id": str, identifier subscribers use to receive the deltas.
+
+        Returns:
+            dict[str, object] | None: The final result, shaped like the `ProcessMessage` response
+                with the additional `stream_id`.
+        """
+        pass
+
     @actormethod(name="GetConversationHistory")
     async def get_conversation_history(self) -> list[dict] | None:
         """Retrieve conversation history."""
         pass
+
+    @actormethod(name="GetConversationPage")
+    async def get_conversation_page(
+        self, input: dict[str, object]
+    ) -> dict[str, object] | None:
+        """
+        Retrieve one page (storage chunk) of the conversation history.
+
+        Args:
+            input (dict[str, object]): A dictionary containing:
+                - "chunk_index": int | None, optional, the chunk to read. Defaults to the most
+                    recent chunk, so callers can page backwards from the latest messages.
+
+        Returns:
+            dict[str, object] | None: `{"chunk_index", "chunk_count", "total_messages", "messages"}`.
+        """
+        pass
         
     @actormethod(name="ProcessEvent")
     async def process_event(
@@ -119,6 +205,8 @@ class BaseActorInterface(ActorInterface):
                     If 0, it's a one-time reminder. Defaults to 0.
                 - "ttl_seconds": int | None, optional, time-to-live in seconds for the reminder registration.
                     Defaults to None (no TTL).
+                - "payload_format": str, optional, "json" (default) or "msgpack" for a compact binary
+                    encoding of `task_data` (requires the `msgpack` extra). Defaults to "json".
 
         Returns:
             str | None: The `reminder_name` as the identifier for the scheduled task, or `None` if scheduling fails or not implemented.
@@ -197,7 +285,10 @@ class BaseActorInterface(ActorInterface):
                 - "memory_types": list[str] | None, optional, specifies which memory systems to target
                 (e.g., ["dapr_state", "vector_db_main"]). Defaults to None (implementation-defined default).
                 - "query_config": dict[str, object] | None, optional, parameters for the query
-                    (e.g., `{"top_k": 5, "include_metadata": True}`). Defaults to None.
+                    (e.g., `{"top_k": 5, "min_score": 0.2, "include_payload": True,
+                    "filters": {"source": "faq"}}`). Defaults to None.
+                A `semantic_query` runs a top-k similarity search over the actor's embedded
+                knowledge index; `memory_types` then filters on each entry's `metadata["memory_type"]`.
 
         Returns:
             dict[str, object] | None: Structured query results, or `None` if no results/error or not implemented.
@@ -258,7 +349,7 @@ class BaseActorInterface(ActorInterface):
     @actormethod(name="IngestStreamChunk")
     async def ingest_stream_chunk(
         self, input: dict[str, object]
-    ) -> None:
+    ) -> dict[str, object] | None:
         """
         What:
             Processes incoming stream chunks for non-message-based workflows (e.g., large file uploads,
@@ -278,11 +369,16 @@ class BaseActorInterface(ActorInterface):
             input (dict[str, object]): A dictionary containing all necessary data for processing.
                 Expected keys typically include:
                 - "stream_id": str, identifier to correlate chunks belonging to the same stream.
-                - "chunk_data": bytes, the actual data chunk.
+                - "chunk_data": bytes, the actual data chunk (base64-encoded when sent as JSON).
                 - "sequence_number": int, for ordering chunks.
                 - "is_last_chunk": bool, flag indicating the end of the stream.
-                - "metadata": dict[str, object] | None, optional, context about the stream or chunk.
-                Defaults to None.
+                - "metadata": dict[str, object] | None, optional, context about the stream or chunk
+                    (e.g. `{"content_type": "text/plain"}`). Defaults to None.
+
+        Returns:
+            dict[str, object] | None: Stream progress: `{"status": "buffered" | "duplicate" | "complete",
+                "stream_id", "next_sequence", "pending_chunks", "total_bytes"}`. Chunks may arrive out of
+                order and be retried; the stream is finalized once every chunk up to the last is present.
         """
         pass
 
@@ -433,6 +529,33 @@ class BaseActorInterface(ActorInterface):
         """
         pass
 
+    @actormethod(name="ListGoalPlans")
+    async def list_goal_plans(
+        self, input: dict[str, object]
+    ) -> dict[str, object] | None:
+        """
+        What:
+            Lists plans managed by this actor with status filtering and pagination.
+        Why:
+            Dashboards poll plan status for every agent; this needs to stay cheap regardless
+            of how many plans an actor has run.
+        How:
+            Reads the actor's plan index (a single state entry maintained alongside the plan
+            records) instead of scanning the state store. Results are ordered newest first.
+
+        Args:
+            input (dict[str, object]): A dictionary containing:
+                - "statuses": list[str] | None, optional, only return plans in these statuses.
+                - "include_terminal": bool, optional, include completed/failed/cancelled plans
+                    when no `statuses` are given. Defaults to False.
+                - "offset": int, optional, number of matches to skip. Defaults to 0.
+                - "limit": int | None, optional, maximum number of plans to return.
+
+        Returns:
+            dict[str, object] | None: `{"plans": [...], "total": int, "offset": int, "limit": int | None}`.
+        """
+        pass
+
     @actormethod(name="GetAgentProfile")
     async def get_agent_profile(self) -> dict[str, object] | None:
         """
@@ -467,9 +590,10 @@ class BaseActorInterface(ActorInterface):
             Meets 'HITL Integration' by enabling human intervention for complex, ambiguous,
             or low-confidence tasks, ensuring safer and more reliable agent operation.
         How:
-            Typically publishes a review request event (containing `review_request_id`, `task_context`, etc.)
-            to a dedicated HITL system or topic, or stores it for polling. `assigned_to` can route
-            the review. In M6, flags handoff tasks or decisions for validation by a human supervisor.
+            Stores the review request, indexes it as open, and queues a review request event
+            (containing `review_request_id`, `task_context`, etc.) in the actor's HITL outbox, all in
+            the same state transaction. A drain reminder publishes queued events to the HITL topic in
+            batches, with retries, outside the flagging turn. `assigned_to` can route the review. In M6, flags handoff tasks or decisions for validation by a human supervisor.
             Aligns with 12-Factor Agents (Factor 4: Treat HITL as a tool call/structured interaction).
 
         Args:
@@ -500,7 +624,8 @@ class BaseActorInterface(ActorInterface):
         How:
             The actor receives the `feedback_payload` for the given `review_request_id`.
             It updates its state, modifies its plan, or takes corrective action based on the feedback
-            and `resolution_status`. `reviewer_details` provides auditability. In M6, human feedback
+            and `resolution_status`. The review leaves the open-review index and a feedback event is
+            queued in the HITL outbox. `reviewer_details` provides auditability. In M6, human feedback
             can refine handoff tasks or approve delegated actions.
             Aligns with 12-Factor Agents (Factor 4).
 
@@ -516,6 +641,34 @@ class BaseActorInterface(ActorInterface):
         """
         pass
 
+    @actormethod(name="ListReviewRequests")
+    async def list_review_requests(
+        self, input: dict[str, object]
+    ) -> dict[str, object] | None:
+        """
+        What:
+            Lists this actor's human review requests, by default the ones still awaiting feedback.
+        Why:
+            Review dashboards and escalation jobs poll open reviews per agent; this should not
+            require scanning the state store or subscribing to the HITL topic.
+        How:
+            Reads the actor's review index (a single state entry maintained alongside the review
+            records) and reports the HITL outbox backlog. Results are ordered oldest first.
+
+        Args:
+            input (dict[str, object]): A dictionary containing:
+                - "statuses": list[str] | None, optional, review statuses to return. Defaults to
+                    open reviews (`["flagged_for_review"]`).
+                - "assigned_to": str | None, optional, only reviews routed to this assignee.
+                - "offset": int, optional, number of matches to skip. Defaults to 0.
+                - "limit": int | None, optional, maximum number of reviews to return.
+
+        Returns:
+            dict[str, object] | None: `{"reviews": [...], "total": int, "offset": int, "limit": int | None,
+                "outbox": {"pending": int, "published": int, "dead_letter": int}}`.
+        """
+        pass
+
     # --- Dapr Workflow Interaction (Retained for explicit orchestration if needed) ---
     @actormethod(name="StartExternalWorkflow")
     async def start_external_workflow(
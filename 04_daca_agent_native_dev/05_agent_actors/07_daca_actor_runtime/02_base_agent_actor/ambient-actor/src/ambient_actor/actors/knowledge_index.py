@@ -0,0 +1,230 @@
+"""
+Embedded per-actor vector index over knowledge entries.
+
+Entries themselves stay under their own `entry_id` state keys (so exact lookups are a
+single read). Alongside them the actor keeps a NumPy matrix of unit-length embeddings,
+persisted as compact binary chunks of `chunk_rows` float32 rows each:
+
+    knowledge_index_head       -> {"dim": 256, "chunk_rows": 256, "rows": [[entry_id, memory_type] | None, ...]}
+    knowledge_vectors_0        -> base64(float32[chunk_rows, dim])
+    knowledge_vectors_1        -> ...
+
+Inserts fill a free slot (left by a delete) or append to the tail, and updates overwrite
+their row in place, so every write touches one vector chunk plus the head. Searches are
+a single matrix-vector product with top-k selection over the in-memory matrix.
+
+The in-memory matrix runs ahead of the actor state until the turn that changed it is
+saved. The actor calls `commit()` once a turn completes; if a turn fails first,
+`discard_uncommitted()` drops the in-memory copy and the next use reloads it from state.
+
+Embedding is pluggable: any callable mapping text to a 1-D float vector works.
+`HashingEmbedder` is a deterministic, dependency-free default (and what tests should use).
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import re
+from collections.abc import Callable
+
+import numpy as np
+from dapr.actor.runtime.state_manager import ActorStateManager
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[str], np.ndarray]
+
+DEFAULT_MEMORY_TYPE = "knowledge"
+DEFAULT_TOP_K = 5
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """Feature-hashing bag-of-words embedder: deterministic across processes and runs."""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def __call__(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dim] += 1.0 if (value >> 63) & 1 else -1.0
+        return vector
+
+
+def payload_text(data_payload: dict[str, object]) -> str:
+    """Text used to embed an entry: its `text`/`content` field, else the whole payload."""
+    for field in ("text", "content"):
+        value = data_payload.get(field)
+        if isinstance(value, str):
+            return value
+    return json.dumps(data_payload, sort_keys=True, default=str)
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+
+class KnowledgeIndex:
+    """Top-k similarity search over an actor's knowledge entries."""
+
+    def __init__(
+        self,
+        state_manager: ActorStateManager,
+        embedder: Embedder,
+        key: str = "knowledge",
+        chunk_rows: int = 256,
+    ):
+        self._state_manager = state_manager
+        self.embedder = embedder
+        self.head_key = f"{key}_index_head"
+        self.vectors_key = f"{key}_vectors"
+        self.chunk_rows = chunk_rows
+        # Loaded lazily and kept in sync with writes for the rest of the activation.
+        self._head: dict[str, object] | None = None
+        self._matrix: np.ndarray | None = None
+        self._row_of: dict[str, int] = {}
+        self._free: list[int] = []
+        # True while writes made in the current turn are not yet committed with its state.
+        self._uncommitted = False
+
+    def _chunk_key(self, index: int) -> str:
+        return f"{self.vectors_key}_{index}"
+
+    async def _load(self) -> None:
+        if self._head is not None:
+            return
+        found, head = await self._state_manager.try_get_state(self.head_key)
+        if not found or not isinstance(head, dict):
+            head = {"dim": None, "chunk_rows": self.chunk_rows, "rows": []}
+        rows: list = head["rows"]
+        dim = head["dim"]
+        chunk_rows = head["chunk_rows"]
+
+        matrix = np.zeros((len(rows), dim or 0), dtype=np.float32)
+        for chunk_index in range(-(-len(rows) // chunk_rows)):
+            found, encoded = await self._state_manager.try_get_state(self._chunk_key(chunk_index))
+            if not found:
+                continue
+            block = np.frombuffer(base64.b64decode(encoded), dtype=np.float32).reshape(-1, dim)
+            start = chunk_index * chunk_rows
+            matrix[start : start + len(block)] = block
+
+        self._head = head
+        self._matrix = matrix
+        self._row_of = {row[0]: i for i, row in enumerate(rows) if row is not None}
+        self._free = [i for i, row in enumerate(rows) if row is None]
+
+    def commit(self) -> None:
+        """The turn that wrote the index completed; its changes are saved with the turn's state."""
+        self._uncommitted = False
+
+    def discard_uncommitted(self) -> None:
+        """Forget the in-memory index if the last turn that wrote it failed before saving."""
+        if not self._uncommitted:
+            return
+        logger.warning("KnowledgeIndex: previous turn failed after changing the index; reloading from state.")
+        self._head = None
+        self._matrix = None
+        self._row_of = {}
+        self._free = []
+        self._uncommitted = False
+
+    def _ensure_capacity(self, size: int) -> None:
+        # Grow geometrically so appends are amortized O(dim), not a full copy each time.
+        assert self._matrix is not None
+        if size <= self._matrix.shape[0]:
+            return
+        grown = np.zeros((max(size, 2 * self._matrix.shape[0], 16), self._matrix.shape[1]), dtype=np.float32)
+        grown[: self._matrix.shape[0]] = self._matrix
+        self._matrix = grown
+
+    async def _save(self, row: int) -> None:
+        assert self._head is not None and self._matrix is not None
+        chunk_rows = self._head["chunk_rows"]
+        chunk_index = row // chunk_rows
+        end = min((chunk_index + 1) * chunk_rows, len(self._head["rows"]))
+        block = self._matrix[chunk_index * chunk_rows : end]
+        await self._state_manager.set_state(
+            self._chunk_key(chunk_index), base64.b64encode(block.tobytes()).decode("ascii")
+        )
+        await self._state_manager.set_state(self.head_key, self._head)
+
+    async def upsert(self, entry_id: str, text: str, memory_type: str = DEFAULT_MEMORY_TYPE) -> None:
+        await self._load()
+        assert self._head is not None and self._matrix is not None
+        vector = _normalize(self.embedder(text))
+        rows: list = self._head["rows"]
+        self._uncommitted = True
+
+        if self._head["dim"] is None:
+            self._head["dim"] = int(vector.shape[0])
+            self._matrix = np.zeros((0, vector.shape[0]), dtype=np.float32)
+        elif vector.shape[0] != self._head["dim"]:
+            raise ValueError(
+                f"Embedding dimension {vector.shape[0]} does not match index dimension {self._head['dim']}"
+            )
+
+        row = self._row_of.get(entry_id)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+            else:
+                row = len(rows)
+                rows.append(None)
+                self._ensure_capacity(len(rows))
+        rows[row] = [entry_id, memory_type]
+        self._matrix[row] = vector
+        self._row_of[entry_id] = row
+        await self._save(row)
+
+    async def remove(self, entry_id: str) -> bool:
+        await self._load()
+        assert self._head is not None and self._matrix is not None
+        row = self._row_of.pop(entry_id, None)
+        if row is None:
+            return False
+        self._uncommitted = True
+        self._head["rows"][row] = None
+        self._matrix[row] = 0.0
+        self._free.append(row)
+        await self._save(row)
+        return True
+
+    async def search(
+        self,
+        text: str,
+        top_k: int = DEFAULT_TOP_K,
+        memory_types: list[str] | None = None,
+        min_score: float | None = None,
+    ) -> list[tuple[str, float]]:
+        """Return up to `top_k` `(entry_id, cosine_score)` pairs, best first."""
+        await self._load()
+        assert self._head is not None and self._matrix is not None
+        rows: list = self._head["rows"]
+        if not self._row_of or top_k <= 0:
+            return []
+
+        scores = self._matrix[: len(rows)] @ _normalize(self.embedder(text))
+        allowed = set(memory_types) if memory_types else None
+        mask = np.array(
+            [slot is not None and (allowed is None or slot[1] in allowed) for slot in rows],
+            dtype=bool,
+        )
+        scores = np.where(mask, scores, -np.inf)
+        candidates = int(mask.sum())
+        if candidates == 0:
+            return []
+
+        k = min(top_k, candidates)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        results = [(rows[i][0], float(scores[i])) for i in top]
+        if min_score is not None:
+            results = [(entry_id, score) for entry_id, score in results if score >= min_score]
+        return results
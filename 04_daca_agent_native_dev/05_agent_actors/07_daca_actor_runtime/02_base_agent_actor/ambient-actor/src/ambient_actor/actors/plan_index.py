@@ -0,0 +1,79 @@
+"""
+Secondary index over an actor's goal plans.
+
+Plan details live under `plan_{plan_id}_status` keys, which a key-value state store cannot
+enumerate. The index keeps one small record per plan under a single `plan_index` key:
+
+    plan_index -> {"<plan_id>": {"status": "running", "goal": "...", "created_at": ..., "updated_at": ...}}
+
+It is updated in the same actor turn as the plan record itself, and Dapr commits all state
+changes of a turn in one transaction, so the index and the plan records never diverge.
+Listing and filtering read one key instead of scanning the store.
+"""
+
+from datetime import datetime, UTC
+
+from dapr.actor.runtime.state_manager import ActorStateManager
+
+TERMINAL_PLAN_STATUSES = frozenset({"completed", "failed", "cancelled"})
+GOAL_PREVIEW_CHARS = 200
+# Finished plans beyond this many index entries are dropped from the index (oldest first).
+MAX_INDEXED_PLANS = 1000
+
+
+class PlanIndex:
+    """Index of plan summaries stored in a single actor state key."""
+
+    def __init__(self, state_manager: ActorStateManager, key: str = "plan_index"):
+        self._state_manager = state_manager
+        self.key = key
+
+    async def _load(self) -> dict[str, dict[str, object]]:
+        found, index = await self._state_manager.try_get_state(self.key)
+        return index if found and isinstance(index, dict) else {}
+
+    async def upsert(self, plan_id: str, status: str, goal: str | None = None) -> None:
+        index = await self._load()
+        now = datetime.now(UTC).isoformat()
+        entry = index.get(plan_id) or {"created_at": now}
+        entry["status"] = status
+        entry["updated_at"] = now
+        if goal is not None:
+            entry["goal"] = goal[:GOAL_PREVIEW_CHARS]
+        index[plan_id] = entry
+        if len(index) > MAX_INDEXED_PLANS:
+            self._prune(index)
+        await self._state_manager.set_state(self.key, index)
+
+    @staticmethod
+    def _prune(index: dict[str, dict[str, object]]) -> None:
+        terminal = sorted(
+            (entry.get("updated_at", ""), plan_id)
+            for plan_id, entry in index.items()
+            if entry.get("status") in TERMINAL_PLAN_STATUSES
+        )
+        for _, plan_id in terminal[: len(index) - MAX_INDEXED_PLANS]:
+            del index[plan_id]
+
+    async def list(
+        self,
+        statuses: list[str] | None = None,
+        include_terminal: bool = False,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> dict[str, object]:
+        """
+        Filter the index, newest first. Returns `{"plans", "total", "offset", "limit"}`
+        where `total` counts all matches before pagination.
+        """
+        index = await self._load()
+        wanted = set(statuses) if statuses else None
+        matches = [
+            {"plan_id": plan_id, **entry}
+            for plan_id, entry in index.items()
+            if (wanted is None or entry.get("status") in wanted)
+            and (include_terminal or wanted is not None or entry.get("status") not in TERMINAL_PLAN_STATUSES)
+        ]
+        matches.sort(key=lambda entry: str(entry.get("created_at", "")), reverse=True)
+        page = matches[offset : offset + limit] if limit is not None else matches[offset:]
+        return {"plans": page, "total": len(matches), "offset": offset, "limit": limit}
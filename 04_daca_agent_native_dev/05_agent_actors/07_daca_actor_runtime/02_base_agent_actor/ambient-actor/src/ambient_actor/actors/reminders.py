@@ -0,0 +1,187 @@
+"""
+Reminder/timer dispatch for DACA actors.
+
+Actor classes declare handlers with the `reminder_handler` decorator instead of growing an
+if/elif chain in `receive_reminder`:
+
+    class MyActor(BaseActor):
+        @reminder_handler("daily_digest")
+        async def _on_daily_digest(self, name: str, task_data: dict) -> None: ...
+
+        @reminder_handler(prefix="poll_")
+        async def _on_poll(self, name: str, task_data: dict) -> None: ...
+
+Handlers are collected once per actor class. Exact names resolve with a single dict
+lookup; prefixes are indexed by length, so resolution costs one lookup per distinct prefix
+length rather than a scan over every handler. Resolved names are memoized.
+
+Payloads can be JSON (the default) or a compact msgpack encoding, tagged with a marker byte
+that can never start a UTF-8 JSON document.
+"""
+
+import json
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import timedelta
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; JSON payloads work without it.
+    msgpack = None
+
+ReminderHandler = Callable[..., Awaitable[None]]
+
+# 0xC1 is unused in msgpack and invalid as a first byte in UTF-8.
+MSGPACK_MARKER = b"\xc1"
+TIMER_WRAPPER_KEY = "actual_timer_name_for_dispatch"
+# Wall-clock time a reminder was registered; stripped before handlers see the task data.
+SCHEDULED_AT_KEY = "__daca_scheduled_at"
+_RESOLVE_CACHE_SIZE = 1024
+
+
+def reminder_handler(name: str | None = None, *, prefix: str | None = None):
+    """Mark an actor method as the handler for a reminder/timer name or name prefix."""
+    if (name is None) == (prefix is None):
+        raise ValueError("reminder_handler needs exactly one of `name` or `prefix`")
+
+    def decorator(func: ReminderHandler) -> ReminderHandler:
+        func.__reminder_handler__ = ("name", name) if name is not None else ("prefix", prefix)  # type: ignore[attr-defined]
+        return func
+
+    return decorator
+
+
+def encode_payload(task_data: dict[str, object] | None, payload_format: str = "json") -> bytes:
+    """Encode reminder task data; falls back to JSON when msgpack is unavailable."""
+    if not task_data:
+        return b""
+    if payload_format == "msgpack" and msgpack is not None:
+        return MSGPACK_MARKER + msgpack.packb(task_data, use_bin_type=True)
+    return json.dumps(task_data).encode("utf-8")
+
+
+def decode_payload(state: bytes) -> object:
+    """Decode a JSON or msgpack reminder payload. Raises ValueError on malformed data."""
+    if not state:
+        return {}
+    if state[:1] == MSGPACK_MARKER:
+        if msgpack is None:
+            raise ValueError("Received a msgpack reminder payload but msgpack is not installed")
+        return msgpack.unpackb(state[1:], raw=False)
+    try:
+        return json.loads(state)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Reminder payload is not valid JSON: {e}") from e
+
+
+def unwrap_task_data(decoded: object) -> tuple[str | None, dict[str, object]]:
+    """Split a decoded payload into `(timer_name_from_wrapper, task_data)`."""
+    if isinstance(decoded, dict):
+        if TIMER_WRAPPER_KEY in decoded:
+            task_data = decoded.get("user_task_data") or {}
+            return decoded[TIMER_WRAPPER_KEY], task_data if isinstance(task_data, dict) else {}
+        return None, decoded
+    return None, {}
+
+
+def stamp_schedule(task_data: dict[str, object] | None) -> dict[str, object]:
+    """Task data plus the current time, so the fire time can be compared with the schedule."""
+    return {**(task_data or {}), SCHEDULED_AT_KEY: time.time()}
+
+
+def reminder_lag(scheduled_at: float, due_time: timedelta, period: timedelta, now: float | None = None) -> float:
+    """
+    Seconds between when a reminder was due and when it fired. For periodic reminders this
+    is measured against the most recent period boundary (so it assumes lag < period).
+    """
+    elapsed = (time.time() if now is None else now) - scheduled_at - due_time.total_seconds()
+    period_seconds = period.total_seconds()
+    if period_seconds > 0 and elapsed > 0:
+        elapsed %= period_seconds
+    return max(elapsed, 0.0)
+
+
+@dataclass
+class HandlerStats:
+    count: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def record(self, elapsed_ms: float, failed: bool) -> None:
+        self.count += 1
+        self.errors += int(failed)
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def as_dict(self) -> dict[str, float | int]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+        }
+
+
+class ReminderRegistry:
+    """Handler lookup table and latency counters for one actor class."""
+
+    def __init__(self):
+        self._exact: dict[str, ReminderHandler] = {}
+        self._prefixes: dict[int, dict[str, ReminderHandler]] = {}
+        self._resolved: dict[str, ReminderHandler | None] = {}
+        self.stats: dict[str, HandlerStats] = {}
+
+    @classmethod
+    def from_class(cls, actor_cls: type) -> "ReminderRegistry":
+        registry = cls()
+        # Walk the MRO base-first so a decorated override replaces the inherited registration.
+        markers: dict[str, tuple[str, str]] = {}
+        for klass in reversed(actor_cls.__mro__):
+            for attr_name, attr in vars(klass).items():
+                marker = getattr(attr, "__reminder_handler__", None)
+                if marker is not None:
+                    markers[attr_name] = marker
+        for attr_name, (kind, key) in markers.items():
+            # Look the method up on the class so an undecorated override still receives the
+            # reminders its base registered.
+            handler = getattr(actor_cls, attr_name)
+            if kind == "name":
+                registry._exact[key] = handler
+            else:
+                registry._prefixes.setdefault(len(key), {})[key] = handler
+        return registry
+
+    def resolve(self, name: str) -> ReminderHandler | None:
+        if name in self._resolved:
+            return self._resolved[name]
+        handler = self._exact.get(name)
+        if handler is None:
+            # Longest prefix wins.
+            for length in sorted(self._prefixes, reverse=True):
+                handler = self._prefixes[length].get(name[:length])
+                if handler is not None:
+                    break
+        if len(self._resolved) >= _RESOLVE_CACHE_SIZE:
+            self._resolved.clear()
+        self._resolved[name] = handler
+        return handler
+
+    async def dispatch(self, actor: object, name: str, task_data: dict[str, object]) -> bool:
+        """Run the handler for `name`. Returns False when no handler is registered."""
+        handler = self.resolve(name)
+        if handler is None:
+            return False
+        stats = self.stats.setdefault(handler.__name__, HandlerStats())
+        started = time.perf_counter()
+        failed = True
+        try:
+            await handler(actor, name, task_data)
+            failed = False
+        finally:
+            stats.record((time.perf_counter() - started) * 1000, failed)
+        return True
+
+    def snapshot(self) -> dict[str, dict[str, float | int]]:
+        return {handler: stats.as_dict() for handler, stats in self.stats.items()}
@@ -0,0 +1,166 @@
+"""
+Coalescing of duplicate ProcessMessage requests (double submits, client retries).
+
+A request is identified by an idempotency key derived from the message content and the
+request id the client sends (X-Request-ID). Duplicates are absorbed at two levels:
+
+- `InFlightRequests` (process-local, used by main.py): concurrent identical requests
+  for the same actor share one ActorProxy call and all receive its result. The call is
+  only abandoned once every request waiting on it has gone away.
+- `IdempotencyLog` (actor state): duplicates that still reach the actor are queued by
+  Dapr behind the original turn. When their turn runs they are answered with the
+  original turn's response instead of running the engine again. The log entry is
+  written in the same transaction as the original turn's conversation update.
+
+Requests without a request id are not deduplicated: a user who sends "ok" twice means it
+twice. Matching them by content alone, within a short window, is opt-in through
+`IDEMPOTENCY_CONTENT_WINDOW_SECONDS`.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from dapr.actor.runtime.state_manager import ActorStateManager
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 0 disables deduplication of requests that carry no request id.
+CONTENT_WINDOW_SECONDS = float(os.getenv("IDEMPOTENCY_CONTENT_WINDOW_SECONDS", "0"))
+REQUEST_ID_WINDOW_SECONDS = float(os.getenv("IDEMPOTENCY_REQUEST_ID_WINDOW_SECONDS", "3600"))
+MAX_LOGGED_REQUESTS = 64
+
+
+def idempotency_key(message_data: object, request_id: str | None = None) -> str | None:
+    """Key of a request for deduplication, or None if it must not be deduplicated."""
+    if request_id is None and CONTENT_WINDOW_SECONDS <= 0:
+        return None
+    encoded = json.dumps([message_data, request_id], sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def request_identity(
+    message_data: object, request_id: str | None = None, explicit_key: str | None = None
+) -> tuple[str | None, bool]:
+    """
+    Idempotency key of a request and whether it is tied to a request id. An explicit key
+    from the caller counts as a request id, so its response is kept for the request-id
+    window rather than the content window.
+    """
+    if explicit_key is not None:
+        return explicit_key, True
+    return idempotency_key(message_data, request_id), request_id is not None
+
+
+class InFlightRequests:
+    """Shares one running call between concurrent identical requests."""
+
+    def __init__(self):
+        self._tasks: dict[tuple[str, str], asyncio.Task] = {}
+        self._waiters: dict[tuple[str, str], int] = {}
+        self._on_abandoned: dict[tuple[str, str], Callable[[], None]] = {}
+        self.coalesced = 0
+
+    def _finish(self, request: tuple[str, str], task: asyncio.Task) -> None:
+        self._tasks.pop(request, None)
+        self._waiters.pop(request, None)
+        abandoned = self._on_abandoned.pop(request, None)
+        if abandoned is not None and not task.cancelled() and task.exception() is not None:
+            # A failed proxy call (e.g. a timeout) may leave the actor still running the turn.
+            abandoned()
+
+    async def run(
+        self,
+        scope: str,
+        key: str,
+        call: Callable[[], Awaitable[T]],
+        on_abandoned: Callable[[], None] | None = None,
+    ) -> T:
+        """
+        Await `call()`, or the identical call already in flight. If the call fails, or
+        every waiter is cancelled before it finishes, the first caller's `on_abandoned`
+        runs (and in the latter case the call is cancelled).
+        """
+        request = (scope, key)
+        task = self._tasks.get(request)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._tasks[request] = task
+            if on_abandoned is not None:
+                self._on_abandoned[request] = on_abandoned
+            task.add_done_callback(lambda done: self._finish(request, done))
+        else:
+            self.coalesced += 1
+            logger.info(f"InFlightRequests: coalesced duplicate request {key[:12]} for '{scope}'.")
+        self._waiters[request] = self._waiters.get(request, 0) + 1
+        try:
+            # One caller going away must not cancel the call the others are waiting on.
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._tasks.get(request) is task:
+                self._waiters[request] -= 1
+                if self._waiters[request] == 0:
+                    logger.info(f"InFlightRequests: all callers of request {key[:12]} for '{scope}' went away.")
+                    abandoned = self._on_abandoned.get(request)
+                    task.cancel()
+                    if abandoned is not None:
+                        abandoned()
+            raise
+
+
+in_flight_requests = InFlightRequests()
+
+
+class IdempotencyLog:
+    """
+    Bounded log of recently completed requests. A small index under one state key records
+    when each request completed; each response is kept under its own key, since responses
+    carry the turn's conversation:
+
+        idempotency_log            -> {"<request_key>": {"completed_at": ..., "has_request_id": true}}
+        idempotency_<request_key>  -> the response returned by the original turn
+    """
+
+    def __init__(self, state_manager: ActorStateManager, key: str = "idempotency_log"):
+        self._state_manager = state_manager
+        self.key = key
+
+    def _result_key(self, request_key: str) -> str:
+        return f"idempotency_{request_key}"
+
+    async def _load(self) -> dict[str, dict[str, object]]:
+        found, log = await self._state_manager.try_get_state(self.key)
+        return log if found and isinstance(log, dict) else {}
+
+    @staticmethod
+    def _expired(entry: dict[str, object], now: float) -> bool:
+        window = REQUEST_ID_WINDOW_SECONDS if entry.get("has_request_id") else CONTENT_WINDOW_SECONDS
+        return now - float(entry.get("completed_at", 0)) > window  # type: ignore[arg-type]
+
+    async def lookup(self, request_key: str) -> dict[str, object] | None:
+        entry = (await self._load()).get(request_key)
+        if entry is None or self._expired(entry, time.time()):
+            return None
+        found, result = await self._state_manager.try_get_state(self._result_key(request_key))
+        return result if found and isinstance(result, dict) else None
+
+    async def record(self, request_key: str, result: dict[str, object], has_request_id: bool) -> None:
+        log = await self._load()
+        now = time.time()
+        log.pop(request_key, None)
+        # Dicts keep insertion order, so the oldest entries come first.
+        stale = [key for key, entry in log.items() if self._expired(entry, now)]
+        stale += [key for key in log if key not in stale][: max(len(log) - len(stale) + 1 - MAX_LOGGED_REQUESTS, 0)]
+        for key in stale:
+            del log[key]
+            await self._state_manager.try_remove_state(self._result_key(key))
+        log[request_key] = {"completed_at": now, "has_request_id": has_request_id}
+        await self._state_manager.set_state(self._result_key(request_key), result)
+        await self._state_manager.set_state(self.key, log)
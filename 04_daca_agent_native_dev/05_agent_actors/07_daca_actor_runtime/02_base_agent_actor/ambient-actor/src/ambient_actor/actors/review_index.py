@@ -0,0 +1,77 @@
+"""
+Secondary index over an actor's human review requests.
+
+Review records live under `hitl_review_{review_request_id}` keys, which a key-value state
+store cannot enumerate. Like the plan index, one small record per review is kept under a
+single `hitl_review_index` key:
+
+    hitl_review_index -> {"<review_request_id>": {"status": "flagged_for_review", "assigned_to": ..., ...}}
+
+It is updated in the same actor turn as the review record, so listing the open reviews of
+an actor reads one key instead of scanning the store.
+"""
+
+from datetime import datetime, UTC
+
+from dapr.actor.runtime.state_manager import ActorStateManager
+
+OPEN_REVIEW_STATUS = "flagged_for_review"
+# Resolved reviews beyond this many index entries are dropped from the index (oldest first).
+MAX_INDEXED_REVIEWS = 1000
+
+
+class ReviewIndex:
+    """Index of review summaries stored in a single actor state key."""
+
+    def __init__(self, state_manager: ActorStateManager, key: str = "hitl_review_index"):
+        self._state_manager = state_manager
+        self.key = key
+
+    async def _load(self) -> dict[str, dict[str, object]]:
+        found, index = await self._state_manager.try_get_state(self.key)
+        return index if found and isinstance(index, dict) else {}
+
+    async def upsert(self, review_request_id: str, status: str, **fields: object) -> None:
+        index = await self._load()
+        now = datetime.now(UTC).isoformat()
+        entry = index.get(review_request_id) or {"created_at": now}
+        entry.update({name: value for name, value in fields.items() if value is not None})
+        entry["status"] = status
+        entry["updated_at"] = now
+        index[review_request_id] = entry
+        if len(index) > MAX_INDEXED_REVIEWS:
+            self._prune(index)
+        await self._state_manager.set_state(self.key, index)
+
+    @staticmethod
+    def _prune(index: dict[str, dict[str, object]]) -> None:
+        resolved = sorted(
+            (entry.get("updated_at", ""), review_request_id)
+            for review_request_id, entry in index.items()
+            if entry.get("status") != OPEN_REVIEW_STATUS
+        )
+        for _, review_request_id in resolved[: len(index) - MAX_INDEXED_REVIEWS]:
+            del index[review_request_id]
+
+    async def list(
+        self,
+        statuses: list[str] | None = None,
+        assigned_to: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> dict[str, object]:
+        """
+        Filter the index, oldest first so the longest-waiting reviews come first. Only open
+        reviews are returned unless `statuses` is given. Returns `{"reviews", "total",
+        "offset", "limit"}` where `total` counts all matches before pagination.
+        """
+        index = await self._load()
+        wanted = set(statuses) if statuses else {OPEN_REVIEW_STATUS}
+        matches = [
+            {"review_request_id": review_request_id, **entry}
+            for review_request_id, entry in index.items()
+            if entry.get("status") in wanted and (assigned_to is None or entry.get("assigned_to") == assigned_to)
+        ]
+        matches.sort(key=lambda entry: str(entry.get("created_at", "")))
+        page = matches[offset : offset + limit] if limit is not None else matches[offset:]
+        return {"reviews": page, "total": len(matches), "offset": offset, "limit": limit}
@@ -0,0 +1,246 @@
+"""
+Per-key binary codecs for actor state.
+
+Actor classes opt keys into a codec by pattern; everything else stays plain JSON:
+
+    class MyActor(BaseActor):
+        state_codecs = {"conversation_chunk_*": "msgpack+zstd", "knowledge_*": "json+zstd"}
+
+Codecs are "json", "msgpack" and "protobuf" (a `google.protobuf.Value` tree), each with a
+"+zstd" compressed variant. The Dapr actor state API only carries JSON values, so an
+encoded value is stored as a small envelope:
+
+    {"__daca_codec__": "msgpack+zstd", "data": "<base64>"}
+
+Reads detect the format from the value itself: envelopes are decoded with the codec they
+name, whatever the key is configured with now, and anything else is a legacy JSON value.
+A legacy value read from a key that is configured with a binary codec is rewritten in that
+codec in the same turn, so existing actors migrate as they are used.
+
+base64 costs a third on top of the encoded size, so uncompressed msgpack/protobuf mainly
+save CPU; the zstd variants are the ones that shrink large, repetitive values such as
+conversation history. Run `benchmarks/state_codec_bench.py` to compare them on your data.
+
+msgpack and zstd are optional (the `binary` extra; zstd comes from `compression.zstd` on
+Python 3.14+ or the `zstandard` package). Like reminder payloads, writes fall back to the
+nearest available codec when one is missing.
+"""
+
+import base64
+import fnmatch
+import json
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from dapr.actor.runtime.state_manager import ActorStateManager
+from google.protobuf import json_format, struct_pb2
+
+CODEC_TAG = "__daca_codec__"
+ZSTD_LEVEL = 3
+ZSTD_SUFFIX = "+zstd"
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; JSON state works without it.
+    msgpack = None
+
+try:
+    from compression import zstd as _zstd  # Python 3.14+
+
+    def _zstd_compress(data: bytes) -> bytes:
+        return _zstd.compress(data, level=ZSTD_LEVEL)
+
+    _zstd_decompress = _zstd.decompress
+except ImportError:
+    try:
+        import zstandard as _zstd  # type: ignore[no-redef]
+
+        def _zstd_compress(data: bytes) -> bytes:
+            return _zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+        def _zstd_decompress(data: bytes) -> bytes:
+            return _zstd.ZstdDecompressor().decompress(data)
+    except ImportError:  # zstd is optional; values are stored uncompressed without it.
+        _zstd = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StateCodec:
+    name: str
+    encode: Callable[[Any], bytes]
+    decode: Callable[[bytes], Any]
+
+
+def _json_encode(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _protobuf_encode(value: Any) -> bytes:
+    return json_format.ParseDict(value, struct_pb2.Value()).SerializeToString()
+
+
+def _restore_ints(value: Any) -> Any:
+    # google.protobuf.Value stores every number as a double.
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, list):
+        return [_restore_ints(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _restore_ints(item) for key, item in value.items()}
+    return value
+
+
+def _protobuf_decode(data: bytes) -> Any:
+    message = struct_pb2.Value()
+    message.ParseFromString(data)
+    return _restore_ints(json_format.MessageToDict(message))
+
+
+_BASE_CODECS: dict[str, StateCodec] = {
+    "json": StateCodec("json", _json_encode, json.loads),
+    "protobuf": StateCodec("protobuf", _protobuf_encode, _protobuf_decode),
+}
+if msgpack is not None:
+    _BASE_CODECS["msgpack"] = StateCodec(
+        "msgpack",
+        lambda value: msgpack.packb(value, use_bin_type=True),
+        lambda data: msgpack.unpackb(data, raw=False),
+    )
+
+
+def _with_zstd(codec: StateCodec) -> StateCodec:
+    return StateCodec(
+        codec.name + ZSTD_SUFFIX,
+        lambda value: _zstd_compress(codec.encode(value)),
+        lambda data: codec.decode(_zstd_decompress(data)),
+    )
+
+
+STATE_CODECS: dict[str, StateCodec] = dict(_BASE_CODECS)
+if _zstd is not None:
+    STATE_CODECS.update({name + ZSTD_SUFFIX: _with_zstd(codec) for name, codec in _BASE_CODECS.items()})
+
+
+def get_codec(name: str) -> StateCodec:
+    """The codec called `name`, or the nearest available one if its library is missing."""
+    codec = STATE_CODECS.get(name)
+    if codec is not None:
+        return codec
+    base = name.removesuffix(ZSTD_SUFFIX)
+    if base not in ("json", "msgpack", "protobuf"):
+        raise ValueError(f"Unknown state codec '{name}'")
+    fallback = STATE_CODECS.get(base) or STATE_CODECS["json"]
+    logger.warning(f"State codec '{name}' is not available here; writing '{fallback.name}' instead.")
+    STATE_CODECS[name] = fallback
+    return fallback
+
+
+def encode_state(value: Any, codec: StateCodec) -> Any:
+    """Wrap `value` in a codec envelope; JSON values are stored as they are."""
+    if codec.name == "json":
+        return value
+    return {CODEC_TAG: codec.name, "data": base64.b64encode(codec.encode(value)).decode("ascii")}
+
+
+def decode_state(stored: Any) -> tuple[Any, str]:
+    """Decode a stored value. Returns `(value, codec_name)`; legacy values report "json"."""
+    if isinstance(stored, dict) and CODEC_TAG in stored:
+        name = stored[CODEC_TAG]
+        codec = STATE_CODECS.get(name)
+        if codec is None:
+            raise ValueError(f"State was written with codec '{name}', which is not available here")
+        return codec.decode(base64.b64decode(stored["data"])), name
+    return stored, "json"
+
+
+class StateCodecMap:
+    """Resolves state keys to codecs from `{pattern: codec_name}`, first match wins."""
+
+    def __init__(self, patterns: dict[str, str]):
+        self.patterns = dict(patterns)
+        self._resolved: dict[str, StateCodec] = {}
+
+    def for_key(self, key: str) -> StateCodec:
+        codec = self._resolved.get(key)
+        if codec is None:
+            name = next((name for pattern, name in self.patterns.items() if fnmatch.fnmatchcase(key, pattern)), "json")
+            codec = self._resolved[key] = get_codec(name)
+        return codec
+
+
+class CodecStateManager:
+    """
+    `ActorStateManager` view that encodes values with their key's codec. Decoded values
+    are cached against the stored envelope, so repeated reads in an activation decode once.
+    """
+
+    def __init__(self, state_manager: ActorStateManager, codecs: StateCodecMap, migrate_on_read: bool = True):
+        self._inner = state_manager
+        self.codecs = codecs
+        self.migrate_on_read = migrate_on_read
+        self._decoded: dict[str, tuple[Any, Any]] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        # remove_state, contains_state, save_state, clear_cache, ... need no encoding.
+        return getattr(self._inner, name)
+
+    async def _decode(self, key: str, stored: Any) -> Any:
+        cached = self._decoded.get(key)
+        if cached is not None and cached[0] is stored:
+            return cached[1]
+        value, codec_name = decode_state(stored)
+        codec = self.codecs.for_key(key)
+        if self.migrate_on_read and codec_name == "json" and codec.name != "json":
+            logger.info(f"Migrating state '{key}' from legacy JSON to '{codec.name}'.")
+            await self.set_state(key, value)
+        else:
+            self._decoded[key] = (stored, value)
+        return value
+
+    def _encode(self, key: str, value: Any) -> Any:
+        stored = encode_state(value, self.codecs.for_key(key))
+        self._decoded[key] = (stored, value)
+        return stored
+
+    async def try_get_state(self, key: str) -> tuple[bool, Any]:
+        found, stored = await self._inner.try_get_state(key)
+        return (True, await self._decode(key, stored)) if found else (False, None)
+
+    async def get_state(self, key: str) -> Any:
+        return await self._decode(key, await self._inner.get_state(key))
+
+    async def set_state(self, key: str, value: Any) -> None:
+        await self._inner.set_state(key, self._encode(key, value))
+
+    async def set_state_ttl(self, key: str, value: Any, ttl_in_seconds: int) -> None:
+        await self._inner.set_state_ttl(key, self._encode(key, value), ttl_in_seconds)
+
+    async def add_state(self, key: str, value: Any) -> None:
+        await self._inner.add_state(key, self._encode(key, value))
+
+    async def try_add_state(self, key: str, value: Any) -> bool:
+        return await self._inner.try_add_state(key, self._encode(key, value))
+
+    async def get_or_add_state(self, key: str, value: Any) -> Any:
+        found, existing = await self.try_get_state(key)
+        if found:
+            return existing
+        await self.add_state(key, value)
+        return value
+
+    async def add_or_update_state(self, key: str, value: Any, update_value_factory: Callable[[str, Any], Any]) -> Any:
+        found, existing = await self.try_get_state(key)
+        new_value = update_value_factory(key, existing) if found else value
+        await self.set_state(key, new_value)
+        return new_value
+
+
+def codec_state_manager(state_manager: ActorStateManager, patterns: dict[str, str]) -> ActorStateManager:
+    """Wrap `state_manager` for the given key patterns; without patterns it is returned as is."""
+    if not patterns:
+        return state_manager
+    return CodecStateManager(state_manager, StateCodecMap(patterns))  # type: ignore[return-value]
@@ -0,0 +1,70 @@
+"""
+Process-local fan-out hub for streamed engine output.
+
+Dapr actor methods are request/response, so token deltas produced inside an actor turn
+cannot travel back through the ActorProxy call. Instead the actor publishes each delta
+to this hub under a `stream_id`, and any number of local subscribers (e.g. the SSE
+endpoint in main.py) receive them as they arrive. The hub lives in the app process that
+hosts the actor, which is the same FastAPI app that serves the HTTP endpoints.
+
+Deltas only reach subscribers in that process. When Dapr places the actor on another
+replica than the one serving the SSE request, the actor finds no subscriber, logs it and
+returns `"streamed": false`; the client then receives only the final result.
+"""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Marker pushed to subscribers once a stream is closed.
+STREAM_CLOSED: dict[str, object] = {"type": "closed"}
+
+
+class StreamHub:
+    """Fans out stream events to every subscriber registered for a `stream_id`."""
+
+    def __init__(self, max_queue_size: int = 1024):
+        self._max_queue_size = max_queue_size
+        self._subscribers: dict[str, list[asyncio.Queue]] = {}
+
+    def subscribe(self, stream_id: str) -> asyncio.Queue:
+        """Register a new subscriber queue for `stream_id`."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._max_queue_size)
+        self._subscribers.setdefault(stream_id, []).append(queue)
+        return queue
+
+    def unsubscribe(self, stream_id: str, queue: asyncio.Queue) -> None:
+        """Remove a subscriber queue; drops the stream entry once nobody listens."""
+        queues = self._subscribers.get(stream_id)
+        if not queues:
+            return
+        if queue in queues:
+            queues.remove(queue)
+        if not queues:
+            self._subscribers.pop(stream_id, None)
+
+    def has_subscribers(self, stream_id: str) -> bool:
+        return bool(self._subscribers.get(stream_id))
+
+    def publish(self, stream_id: str, event: dict[str, object]) -> None:
+        """Push an event to all subscribers without blocking the producer."""
+        for queue in self._subscribers.get(stream_id, []):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A slow consumer must not stall the actor turn; drop the event for it.
+                logger.warning(f"Stream '{stream_id}': subscriber queue full, dropping event.")
+
+    def close(self, stream_id: str) -> None:
+        """Signal the end of the stream to all subscribers."""
+        for queue in self._subscribers.get(stream_id, []):
+            try:
+                queue.put_nowait(STREAM_CLOSED)
+            except asyncio.QueueFull:
+                # Make room for the close marker so the consumer always terminates.
+                queue.get_nowait()
+                queue.put_nowait(STREAM_CLOSED)
+
+
+stream_hub = StreamHub()
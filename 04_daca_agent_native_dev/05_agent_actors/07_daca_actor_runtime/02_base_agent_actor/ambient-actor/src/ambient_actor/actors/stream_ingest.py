@@ -0,0 +1,234 @@
+"""
+Reassembly of chunked input streams for DACA actors.
+
+Chunks may arrive out of order, more than once, and across actor deactivations, so all
+progress lives in actor state:
+
+    stream_{id}_meta          -> {"next_seq", "pending", "parts", "tail_size", "total_bytes", "last_seq", "metadata"}
+    stream_{id}_part_{k}      -> base64 of contiguous bytes (sealed once it reaches `part_size`)
+    stream_{id}_pending_{seq} -> base64 of a chunk that arrived ahead of a gap
+
+In-order chunks are appended to the tail part, so each chunk rewrites at most one part
+of bounded size. Chunks that arrive early are parked under their own key until the gap
+closes. Memory and state use are bounded by `max_stream_bytes` and by how far ahead of
+the gap a chunk may be (`max_out_of_order`). Duplicates are acknowledged and dropped.
+
+A completed stream stays in its parts: `complete()` returns a small manifest naming the
+part keys, so no single state value or actor turn has to carry the whole payload (the
+Dapr sidecar rejects requests over a few MB). `iter_parts()` streams the parts back;
+`assemble()` concatenates them and should only be used for streams known to be small.
+"""
+
+import base64
+import binascii
+import logging
+from collections.abc import AsyncIterator
+
+from dapr.actor.runtime.state_manager import ActorStateManager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PART_SIZE = 256 * 1024
+DEFAULT_MAX_STREAM_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_OUT_OF_ORDER = 64
+
+
+class StreamIngestError(ValueError):
+    """Raised when a chunk cannot be accepted (malformed, too far ahead, or over the size limit)."""
+
+
+def decode_chunk(chunk_data: bytes | str) -> bytes:
+    """Actor calls are JSON, so bytes arrive base64-encoded; accept both forms."""
+    if isinstance(chunk_data, bytes):
+        return chunk_data
+    try:
+        return base64.b64decode(chunk_data, validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise StreamIngestError(f"chunk_data is neither bytes nor valid base64: {e}") from e
+
+
+class StreamReassembler:
+    """Durable, bounded reassembly buffer for one actor's incoming streams."""
+
+    def __init__(
+        self,
+        state_manager: ActorStateManager,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_stream_bytes: int = DEFAULT_MAX_STREAM_BYTES,
+        max_out_of_order: int = DEFAULT_MAX_OUT_OF_ORDER,
+    ):
+        self._state_manager = state_manager
+        self.part_size = part_size
+        self.max_stream_bytes = max_stream_bytes
+        self.max_out_of_order = max_out_of_order
+
+    @staticmethod
+    def _meta_key(stream_id: str) -> str:
+        return f"stream_{stream_id}_meta"
+
+    @staticmethod
+    def _part_key(stream_id: str, part: int) -> str:
+        return f"stream_{stream_id}_part_{part}"
+
+    @staticmethod
+    def _pending_key(stream_id: str, seq: int) -> str:
+        return f"stream_{stream_id}_pending_{seq}"
+
+    async def add_chunk(
+        self,
+        stream_id: str,
+        sequence_number: int,
+        data: bytes,
+        is_last_chunk: bool,
+        metadata: dict[str, object] | None = None,
+    ) -> dict[str, object]:
+        """
+        Record one chunk. Returns the stream progress; `status` is "duplicate", "buffered"
+        or "complete" (all chunks up to the last one are present).
+        """
+        found, meta = await self._state_manager.try_get_state(self._meta_key(stream_id))
+        if not found or not isinstance(meta, dict):
+            meta = {
+                "next_seq": 0,
+                "pending": [],
+                "parts": 0,
+                "tail_size": 0,
+                "total_bytes": 0,
+                "last_seq": None,
+                "metadata": metadata or {},
+            }
+
+        if (
+            meta.get("completed")
+            or sequence_number < meta["next_seq"]
+            or sequence_number in meta["pending"]
+        ):
+            return self._progress(stream_id, meta, "duplicate")
+        if meta["last_seq"] is not None and sequence_number > meta["last_seq"]:
+            raise StreamIngestError(
+                f"Stream '{stream_id}': chunk {sequence_number} is past the last chunk {meta['last_seq']}"
+            )
+        if sequence_number - meta["next_seq"] > self.max_out_of_order:
+            raise StreamIngestError(
+                f"Stream '{stream_id}': chunk {sequence_number} is too far ahead of {meta['next_seq']}"
+            )
+        if meta["total_bytes"] + len(data) > self.max_stream_bytes:
+            raise StreamIngestError(f"Stream '{stream_id}' exceeds {self.max_stream_bytes} bytes")
+
+        if is_last_chunk:
+            meta["last_seq"] = sequence_number
+        meta["total_bytes"] += len(data)
+
+        if sequence_number == meta["next_seq"]:
+            await self._append(stream_id, meta, data)
+            meta["next_seq"] += 1
+            await self._drain_pending(stream_id, meta)
+        else:
+            await self._state_manager.set_state(
+                self._pending_key(stream_id, sequence_number), base64.b64encode(data).decode("ascii")
+            )
+            meta["pending"] = sorted([*meta["pending"], sequence_number])
+
+        await self._state_manager.set_state(self._meta_key(stream_id), meta)
+        complete = meta["last_seq"] is not None and meta["next_seq"] > meta["last_seq"]
+        return self._progress(stream_id, meta, "complete" if complete else "buffered")
+
+    async def _append(self, stream_id: str, meta: dict, data: bytes) -> None:
+        part = meta["parts"]
+        tail = b""
+        if meta["tail_size"]:
+            _, encoded = await self._state_manager.try_get_state(self._part_key(stream_id, part))
+            tail = base64.b64decode(encoded or "")
+        tail += data
+        await self._state_manager.set_state(
+            self._part_key(stream_id, part), base64.b64encode(tail).decode("ascii")
+        )
+        if len(tail) >= self.part_size:
+            # Seal this part; the next append starts a fresh one.
+            meta["parts"] = part + 1
+            meta["tail_size"] = 0
+        else:
+            meta["tail_size"] = len(tail)
+
+    async def _drain_pending(self, stream_id: str, meta: dict) -> None:
+        while meta["pending"] and meta["pending"][0] == meta["next_seq"]:
+            seq = meta["pending"].pop(0)
+            key = self._pending_key(stream_id, seq)
+            _, encoded = await self._state_manager.try_get_state(key)
+            await self._append(stream_id, meta, base64.b64decode(encoded or ""))
+            await self._state_manager.try_remove_state(key)
+            meta["next_seq"] += 1
+
+    async def _completed_meta(self, stream_id: str) -> dict:
+        _, meta = await self._state_manager.try_get_state(self._meta_key(stream_id))
+        if not isinstance(meta, dict):
+            raise StreamIngestError(f"Unknown stream '{stream_id}'")
+        return meta
+
+    def _part_keys(self, stream_id: str, meta: dict) -> list[str]:
+        total_parts = meta["parts"] + (1 if meta["tail_size"] else 0)
+        return [self._part_key(stream_id, part) for part in range(total_parts)]
+
+    async def complete(self, stream_id: str) -> dict[str, object]:
+        """
+        Mark a stream complete and return its manifest, `{"stream_id", "size", "part_keys",
+        "metadata"}`. The parts stay in state; the meta record becomes a tombstone so late
+        duplicates are still recognized.
+        """
+        meta = await self._completed_meta(stream_id)
+        # Chunks parked past the final `last_seq` (sent before the sender marked an earlier
+        # chunk as last) never drain; drop them so they neither leak nor count toward the size.
+        for seq in meta["pending"]:
+            key = self._pending_key(stream_id, seq)
+            _, encoded = await self._state_manager.try_get_state(key)
+            meta["total_bytes"] -= len(base64.b64decode(encoded or ""))
+            await self._state_manager.try_remove_state(key)
+        if meta["pending"]:
+            logger.warning(f"Stream '{stream_id}': dropped {len(meta['pending'])} chunks past the last chunk.")
+        meta = {**meta, "completed": True, "pending": []}
+        await self._state_manager.set_state(self._meta_key(stream_id), meta)
+        return {
+            "stream_id": stream_id,
+            "size": meta["total_bytes"],
+            "part_keys": self._part_keys(stream_id, meta),
+            "metadata": meta.get("metadata") or {},
+        }
+
+    async def iter_parts(self, stream_id: str) -> AsyncIterator[bytes]:
+        """Yield the parts of a completed stream in order, one state read each."""
+        meta = await self._completed_meta(stream_id)
+        for key in self._part_keys(stream_id, meta):
+            _, encoded = await self._state_manager.try_get_state(key)
+            yield base64.b64decode(encoded or "")
+
+    async def discard(self, stream_id: str) -> None:
+        """Remove the parts of a completed stream, keeping the tombstone."""
+        meta = await self._completed_meta(stream_id)
+        for key in self._part_keys(stream_id, meta):
+            await self._state_manager.try_remove_state(key)
+        await self._state_manager.set_state(
+            self._meta_key(stream_id),
+            {**meta, "completed": True, "parts": 0, "tail_size": 0, "pending": []},
+        )
+
+    async def assemble(self, stream_id: str) -> tuple[bytes, dict[str, object]]:
+        """
+        Concatenate a completed stream in memory and remove its parts from state. Only for
+        streams known to be small; large ones should be read with `iter_parts`.
+        """
+        meta = await self._completed_meta(stream_id)
+        buffer = bytearray()
+        async for part in self.iter_parts(stream_id):
+            buffer += part
+        await self.discard(stream_id)
+        return bytes(buffer), meta.get("metadata") or {}
+
+    @staticmethod
+    def _progress(stream_id: str, meta: dict, status: str) -> dict[str, object]:
+        return {
+            "status": status,
+            "stream_id": stream_id,
+            "next_sequence": meta["next_seq"],
+            "pending_chunks": len(meta["pending"]),
+            "total_bytes": meta["total_bytes"],
+        }
@@ -0,0 +1,145 @@
+# ambient_actor/agents/composite_adapter.py
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from ambient_actor.agents.engine_adapter import AgenticEngineAdapter
+from ambient_actor.agents.engine_pool import engine_config_key, engine_pool
+from ambient_actor.agents.engine_registry import engine_registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEDGE_DELAY_SECONDS = 2.0
+
+
+@dataclass
+class CompositeEngineAdapter(AgenticEngineAdapter):
+    """
+    Runs one input across several engines and returns the first successful result.
+
+    - "race": all engines start at once.
+    - "hedge": the first engine starts alone; the next one is started each time
+      `hedge_delay_seconds` pass without an answer, or immediately when one fails.
+
+    Losing calls are cancelled. The winning result carries `engine_index`.
+    """
+
+    engines: list[AgenticEngineAdapter] = field(default_factory=list)
+    strategy: Literal["race", "hedge"] = "hedge"
+    hedge_delay_seconds: float = DEFAULT_HEDGE_DELAY_SECONDS
+
+    async def initialize(self, agent_name: str, agent_instructions: str, agent_tools: list[Any], model: str | Any) -> None:
+        await asyncio.gather(
+            *(engine.initialize(agent_name, agent_instructions, agent_tools, model) for engine in self.engines)
+        )
+
+    async def process_input(
+        self,
+        input_text: str | list[dict[str, str]],
+        run_method: Literal["run", "run_sync", 'stream'],
+        context: dict[str, object] | None = None,
+    ) -> dict[str, object]:
+        if not self.engines:
+            raise ValueError("Composite engine has no member engines")
+        return await self._first_success(
+            lambda engine: engine.process_input(input_text, run_method, context=context)
+        )
+
+    async def _first_success(
+        self, call: Callable[[AgenticEngineAdapter], Awaitable[dict[str, object]]]
+    ) -> dict[str, object]:
+        pending: dict[asyncio.Task, int] = {}
+        next_index = 0
+        last_error: BaseException | None = None
+
+        def launch_next() -> None:
+            nonlocal next_index
+            pending[asyncio.create_task(call(self.engines[next_index]))] = next_index
+            next_index += 1
+
+        launch_next()
+        while self.strategy == "race" and next_index < len(self.engines):
+            launch_next()
+
+        try:
+            while pending:
+                more = next_index < len(self.engines)
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_delay_seconds if more else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    logger.info(f"CompositeEngine: no answer after {self.hedge_delay_seconds}s, hedging.")
+                    launch_next()
+                    continue
+                for task in done:
+                    index = pending.pop(task)
+                    if task.exception() is None:
+                        return {**task.result(), "engine_index": index}
+                    last_error = task.exception()
+                    logger.warning(f"CompositeEngine: engine {index} failed: {last_error}")
+                # Fail over right away instead of waiting out the hedge delay.
+                if next_index < len(self.engines):
+                    launch_next()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise RuntimeError("All composite member engines failed") from last_error
+
+    async def stream_input(
+        self,
+        input_text: str | list[dict[str, str]],
+        context: dict[str, object] | None = None,
+    ) -> AsyncIterator[dict[str, object]]:
+        """
+        Streams from the first engine that produces output. Engines are tried in order,
+        falling over to the next only if one fails before yielding its first event; partial
+        output that was already sent cannot be retracted.
+        """
+        last_error: Exception | None = None
+        for index, engine in enumerate(self.engines):
+            started = False
+            try:
+                async for event in engine.stream_input(input_text, context=context):
+                    started = True
+                    yield event if event.get("type") != "final" else {**event, "engine_index": index}
+                return
+            except Exception as e:
+                if started:
+                    raise
+                last_error = e
+                logger.warning(f"CompositeEngine: engine {index} failed to stream: {e}")
+        raise RuntimeError("All composite member engines failed") from last_error
+
+
+@engine_registry.register("composite")
+async def create_composite_engine(engine_config: dict[str, object]) -> CompositeEngineAdapter:
+    """
+    Build from `engine_config["engines"]`, a list of member configs. Each member inherits
+    the composite's name/instructions/tools/model unless it overrides them, and names its own
+    `engine_type` (default "openai"). Members are shared through the engine pool.
+    """
+    base = {k: v for k, v in engine_config.items() if k not in ("engine_type", "engines", "strategy", "hedge_delay_seconds")}
+    members: list[dict[str, object]] = []
+    for member in engine_config.get("engines") or []:  # type: ignore[union-attr]
+        members.append({**base, **member})
+    if not members:
+        raise ValueError("Composite engine config needs a non-empty 'engines' list")
+
+    async def build(member: dict[str, object]) -> AgenticEngineAdapter:
+        engine_type = str(member.get("engine_type", "openai"))
+        return await engine_pool.get_or_create(
+            engine_config_key(engine_type, member),
+            lambda: engine_registry.create(engine_type, member),
+        )
+
+    return CompositeEngineAdapter(
+        engines=list(await asyncio.gather(*(build(member) for member in members))),
+        strategy=engine_config.get("strategy", "hedge"),  # type: ignore[arg-type]
+        hedge_delay_seconds=float(engine_config.get("hedge_delay_seconds", DEFAULT_HEDGE_DELAY_SECONDS)),  # type: ignore[arg-type]
+    )
@@ -1,24 +1,44 @@
 # ambient_actor/agents/engine_adapter.py
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from typing import Any, Literal
 
 @dataclass
 class AgenticEngineAdapter(ABC):
     """Abstract adapter for any agentic engine"""
-    
+
     @abstractmethod
     async def initialize(self, agent_name: str, agent_instructions: str, agent_tools: list[Any], model: str | Any) -> None:
         """Initialize the engine with configuration"""
         pass
-    
+
     @abstractmethod
     async def process_input(
-        self, 
+        self,
         input_text: str | list[dict[str, str]],
         run_method: Literal["run", "run_sync", 'stream'],
         context: dict[str, object] | None = None,
     ) -> dict[str, object]:
         """Process input through the engine"""
-        pass
\ No newline at end of file
+        pass
+
+    async def stream_input(
+        self,
+        input_text: str | list[dict[str, str]],
+        context: dict[str, object] | None = None,
+    ) -> AsyncIterator[dict[str, object]]:
+        """
+        Stream input through the engine.
+        Yields `{"type": "delta", "delta": str}` events as output is generated and
+        finishes with a single `{"type": "final", "conversation": [...], "final_output": ...}`.
+        Engines without native streaming inherit this default, which runs the whole turn
+        and yields only the final event.
+        """
+        result = await self.process_input(input_text, run_method="run", context=context)
+        yield {
+            "type": "final",
+            "conversation": result.get("conversation"),
+            "final_output": result.get("final_output"),
+        }
@@ -0,0 +1,86 @@
+# ambient_actor/agents/engine_pool.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from ambient_actor.agents.engine_adapter import AgenticEngineAdapter
+
+logger = logging.getLogger(__name__)
+
+
+# Engine config keys that only affect a single turn, not how the engine is built.
+TURN_OPTION_KEYS = frozenset({"engine_type", "run_method", "context_max_tokens", "summary_max_tokens"})
+
+
+def engine_config_key(engine_type: str, engine_config: dict[str, object]) -> str:
+    """Stable hash of everything that affects how an engine is built."""
+    material = {key: value for key, value in engine_config.items() if key not in TURN_OPTION_KEYS}
+    material["engine_type"] = engine_type
+    encoded = json.dumps(material, sort_keys=True, default=repr).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class EnginePool:
+    """
+    Process-wide LRU registry of initialized engine adapters.
+
+    Actors come and go constantly, but most of them share a handful of engine configs.
+    Adapters (and the Agent / model objects inside them) are built once per config and
+    handed to every actor activation that asks for it.
+
+    HTTP connections are not owned by the adapters: `LitellmModel` calls go through
+    LiteLLM's process-wide client cache, keyed by provider and event loop, so adapters
+    for different configs already share one connection pool per provider.
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._engines: OrderedDict[str, AgenticEngineAdapter] = OrderedDict()
+        self._build_locks: dict[str, asyncio.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._engines)
+
+    async def get_or_create(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[AgenticEngineAdapter]],
+    ) -> AgenticEngineAdapter:
+        engine = self._engines.get(key)
+        if engine is not None:
+            self._engines.move_to_end(key)
+            return engine
+
+        # Only one activation builds a given config; concurrent ones wait and reuse it.
+        lock = self._build_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                logger.info(f"EnginePool: building engine for config {key[:12]}.")
+                try:
+                    engine = await factory()
+                except BaseException:
+                    # Don't keep a lock for a config that never made it into the pool.
+                    if self._build_locks.get(key) is lock:
+                        del self._build_locks[key]
+                    raise
+                self._engines[key] = engine
+                while len(self._engines) > self.max_size:
+                    evicted_key, _ = self._engines.popitem(last=False)
+                    self._build_locks.pop(evicted_key, None)
+                    logger.info(f"EnginePool: evicted engine for config {evicted_key[:12]}.")
+            else:
+                self._engines.move_to_end(key)
+        return engine
+
+    def clear(self) -> None:
+        self._engines.clear()
+        self._build_locks.clear()
+
+
+engine_pool = EnginePool(max_size=int(os.getenv("ENGINE_POOL_SIZE", "128")))
@@ -0,0 +1,70 @@
+# ambient_actor/agents/engine_registry.py
+
+import logging
+from collections.abc import Awaitable, Callable
+from importlib.metadata import entry_points
+
+from ambient_actor.agents.engine_adapter import AgenticEngineAdapter
+
+logger = logging.getLogger(__name__)
+
+EngineFactory = Callable[[dict[str, object]], Awaitable[AgenticEngineAdapter]]
+
+ENTRY_POINT_GROUP = "ambient_actor.engines"
+
+
+class EngineRegistry:
+    """
+    Maps an `engine_type` to an async factory that builds an initialized adapter from
+    an `engine_config` dict.
+
+    Adapters register themselves with the decorator:
+
+        @engine_registry.register("my_engine")
+        async def create_my_engine(engine_config: dict[str, object]) -> AgenticEngineAdapter: ...
+
+    Engines shipped in other distributions can instead declare an entry point in the
+    `ambient_actor.engines` group pointing at such a factory; those are loaded the first
+    time an unknown engine type is requested.
+    """
+
+    def __init__(self):
+        self._factories: dict[str, EngineFactory] = {}
+        self._entry_points_loaded = False
+
+    def register(self, engine_type: str) -> Callable[[EngineFactory], EngineFactory]:
+        def decorator(factory: EngineFactory) -> EngineFactory:
+            if engine_type in self._factories:
+                logger.warning(f"EngineRegistry: replacing factory for engine type '{engine_type}'.")
+            self._factories[engine_type] = factory
+            return factory
+
+        return decorator
+
+    def names(self) -> list[str]:
+        self._load_entry_points()
+        return sorted(self._factories)
+
+    def _load_entry_points(self) -> None:
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            if entry_point.name in self._factories:
+                continue
+            try:
+                self._factories[entry_point.name] = entry_point.load()
+            except Exception as e:
+                logger.error(f"EngineRegistry: failed to load engine '{entry_point.name}': {e}", exc_info=True)
+
+    async def create(self, engine_type: str, engine_config: dict[str, object]) -> AgenticEngineAdapter:
+        factory = self._factories.get(engine_type)
+        if factory is None:
+            self._load_entry_points()
+            factory = self._factories.get(engine_type)
+        if factory is None:
+            raise ValueError(f"Unsupported engine type: {engine_type}")
+        return await factory(engine_config)
+
+
+engine_registry = EngineRegistry()
@@ -1,33 +1,69 @@
-from typing import Literal
+from collections.abc import AsyncIterator
+from typing import Literal, cast
 from dataclasses import dataclass
+import hashlib
 import os
 
-from agents import Agent, Runner, Tool, RunResult, RunResultStreaming
+from agents import Agent, ItemHelpers, Runner, Tool, RunResult, RunResultStreaming
 from ambient_actor.agents.engine_adapter import AgenticEngineAdapter
+from ambient_actor.agents.engine_registry import engine_registry
+from ambient_actor.agents.response_cache import ResponseCache, create_response_cache, response_cache_key
+from ambient_actor.agents.sync_runner import blocking_run_pool
 from agents.extensions.models.litellm_model import LitellmModel
+from openai.types.responses import ResponseTextDeltaEvent
 
 @dataclass
 class OpenAIEngineAdapter(AgenticEngineAdapter):
     agent: Agent | None = None
+    # Optional cache of final results; skipped for agents with tools, whose runs have side effects.
+    response_cache: ResponseCache | None = None
+    cache_namespace: str = ""
 
     async def initialize(self, agent_name: str, agent_instructions: str, agent_tools: list[Tool], model: str) -> None:
+        self.cache_namespace = hashlib.sha256(
+            "\x00".join([agent_name, agent_instructions, str(model)]).encode("utf-8")
+        ).hexdigest()
         self.agent = Agent(
             name=agent_name,
             instructions=agent_instructions,
             tools=agent_tools,
+            # LitellmModel holds no HTTP client; LiteLLM reuses one per provider and event loop.
             model=LitellmModel(model=model, api_key=os.getenv("GEMINI_API_KEY"))
         )
-    
+
     async def process_input(
-        self, 
+        self,
         input_text: str | list[dict[str, str]],
         run_method: Literal["run", "run_sync", 'stream'],
         context: dict[str, object] | None = None,
     ) -> dict[str, object]:  # Changed return type to match base class
-        result: RunResult | RunResultStreaming | None = None
         if self.agent is None or run_method is None:
             raise ValueError("Agent not initialized")
 
+        if self.response_cache is None or self.agent.tools:
+            return await self._run(input_text, run_method, context)
+        key = response_cache_key(self.cache_namespace, input_text)
+        # Inputs that differ only in whitespace share an entry, so the entry holds just the
+        # items the run produced; the conversation is rebuilt around this request's input.
+        conversation = ItemHelpers.input_to_new_input_list(input_text)  # type: ignore[arg-type]
+        cached = await self.response_cache.get(key)
+        if cached is not None:
+            produced = cast(list, cached.get("conversation") or [])
+            return {**cached, "conversation": conversation + produced, "run_method": run_method, "cached": True}
+        output = await self._run(input_text, run_method, context)
+        produced = cast(list, output.get("conversation") or [])[len(conversation):]
+        await self.response_cache.set(key, {**output, "conversation": produced})
+        return output
+
+    async def _run(
+        self,
+        input_text: str | list[dict[str, str]],
+        run_method: Literal["run", "run_sync", 'stream'],
+        context: dict[str, object] | None = None,
+    ) -> dict[str, object]:
+        result: RunResult | RunResultStreaming | None = None
+        assert self.agent is not None
+
         if run_method == "run":
             result = await Runner.run(
                 self.agent,
@@ -35,21 +71,63 @@ class OpenAIEngineAdapter(AgenticEngineAdapter):
                 context=context
             )
         elif run_method == "run_sync":
-            result = Runner.run_sync(
+            # Runner.run_sync blocks; run it on the bounded worker pool, not the event loop.
+            result = await blocking_run_pool.run(
+                Runner.run_sync,
                 self.agent,
                 input=input_text,
                 context=context
             )
         elif run_method == "stream":
-            raise NotImplementedError("Streaming is not supported for OpenAI")
-            # result = Runner.run_streamed(
-            #     self.agent,
-            #     input=input_text,
-            #     context=context
-            # )
-        
+            # Drain the stream and return only the final result.
+            final_event: dict[str, object] = {}
+            async for event in self.stream_input(input_text, context=context):
+                if event["type"] == "final":
+                    final_event = event
+            return {
+                "conversation": final_event.get("conversation"),
+                "run_method": run_method,
+                "final_output": final_event.get("final_output")
+            }
+
         return {
             "conversation": result.to_input_list(),
             "run_method": run_method,
             "final_output": result.final_output
-        }
\ No newline at end of file
+        }
+
+    async def stream_input(
+        self,
+        input_text: str | list[dict[str, str]],
+        context: dict[str, object] | None = None,
+    ) -> AsyncIterator[dict[str, object]]:
+        if self.agent is None:
+            raise ValueError("Agent not initialized")
+
+        result = Runner.run_streamed(
+            self.agent,
+            input=input_text,
+            context=context
+        )
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                yield {"type": "delta", "delta": event.data.delta}
+
+        yield {
+            "type": "final",
+            "conversation": result.to_input_list(),
+            "final_output": result.final_output
+        }
+
+
+@engine_registry.register("openai")
+async def create_openai_engine(engine_config: dict[str, object]) -> OpenAIEngineAdapter:
+    engine = OpenAIEngineAdapter()
+    await engine.initialize(
+        agent_name=engine_config.get("name", "DACA Agent"), # type: ignore
+        agent_instructions=engine_config.get("instructions", "You are a helpful assistant"), # type: ignore
+        agent_tools=engine_config.get("tools", []), # type: ignore
+        model=engine_config.get("model", "gpt-4") # type: ignore
+    )
+    engine.response_cache = create_response_cache(engine_config.get("response_cache"))  # type: ignore[arg-type]
+    return engine
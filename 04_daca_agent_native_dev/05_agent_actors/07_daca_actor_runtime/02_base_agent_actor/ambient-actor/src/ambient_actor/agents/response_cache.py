@@ -0,0 +1,164 @@
+# ambient_actor/agents/response_cache.py
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 300.0
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def normalize_input(input_text: str | list[dict[str, str]]) -> list[dict[str, object]]:
+    """A bare string and the equivalent single user message hash the same."""
+    if isinstance(input_text, str):
+        return [{"role": "user", "content": input_text.strip()}]
+    normalized: list[dict[str, object]] = []
+    for item in input_text:
+        content = item.get("content")
+        normalized.append({**item, "content": content.strip()} if isinstance(content, str) else dict(item))
+    return normalized
+
+
+def response_cache_key(namespace: str, input_text: str | list[dict[str, str]]) -> str:
+    """`namespace` identifies the engine config (model, instructions, ...)."""
+    encoded = json.dumps(
+        [namespace, normalize_input(input_text)], sort_keys=True, separators=(",", ":"), default=repr
+    ).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ResponseCache(ABC):
+    """TTL + LRU cache of engine results, keyed by `response_cache_key`."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> dict[str, object] | None:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: dict[str, object]) -> None:
+        pass
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class MemoryResponseCache(ResponseCache):
+    """In-process cache; entries are copied in and out so callers cannot mutate them."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        super().__init__(ttl_seconds, max_entries)
+        self._entries: OrderedDict[str, tuple[float, dict[str, object]]] = OrderedDict()
+
+    async def get(self, key: str) -> dict[str, object] | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(entry[1])
+
+    async def set(self, key: str, value: dict[str, object]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    File-backed cache that survives restarts and can be shared by the processes on one host.
+    Values must be JSON-serializable; others are not cached. Queries run in a worker thread.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        super().__init__(ttl_seconds, max_entries)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    def _get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0] if row is not None else None
+
+    def _set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl_seconds, now),
+            )
+            self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    async def get(self, key: str) -> dict[str, object] | None:
+        encoded = await asyncio.to_thread(self._get, key)
+        if encoded is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(encoded)
+
+    async def set(self, key: str, value: dict[str, object]) -> None:
+        try:
+            encoded = json.dumps(value)
+        except (TypeError, ValueError):
+            logger.debug("SQLiteResponseCache: result is not JSON-serializable; not caching.")
+            return
+        await asyncio.to_thread(self._set, key, encoded)
+
+
+def create_response_cache(config: dict[str, object] | None = None) -> ResponseCache | None:
+    """
+    Build a cache from an engine config's `response_cache` section, falling back to the
+    RESPONSE_CACHE_* environment variables. Returns None (no caching) by default.
+
+        {"backend": "memory" | "sqlite" | "none", "ttl_seconds": 300, "max_entries": 1024, "path": "..."}
+    """
+    config = config or {}
+    backend = str(config.get("backend", os.getenv("RESPONSE_CACHE_BACKEND", "none")))
+    ttl_seconds = float(config.get("ttl_seconds", os.getenv("RESPONSE_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)))  # type: ignore[arg-type]
+    max_entries = int(config.get("max_entries", os.getenv("RESPONSE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)))  # type: ignore[arg-type]
+    if backend == "memory":
+        return MemoryResponseCache(ttl_seconds, max_entries)
+    if backend == "sqlite":
+        path = str(config.get("path", os.getenv("RESPONSE_CACHE_PATH", "response_cache.sqlite3")))
+        return SQLiteResponseCache(path, ttl_seconds, max_entries)
+    if backend != "none":
+        raise ValueError(f"Unknown response cache backend: {backend}")
+    return None
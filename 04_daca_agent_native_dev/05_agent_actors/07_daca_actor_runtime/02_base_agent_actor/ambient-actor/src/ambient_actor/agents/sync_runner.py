@@ -0,0 +1,117 @@
+# ambient_actor/agents/sync_runner.py
+
+import asyncio
+import functools
+import logging
+import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import ParamSpec, TypeVar
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class EngineOverloadedError(RuntimeError):
+    """Raised when a blocking engine call cannot get a worker slot in time."""
+
+
+def _init_worker_loop() -> None:
+    # Runner.run_sync drives its own event loop; give each worker thread one to reuse.
+    # Engines are shared with the main loop, which is safe for LitellmModel: it holds no
+    # HTTP client, and LiteLLM caches its clients per event loop, so each worker loop
+    # gets its own connections.
+    asyncio.set_event_loop(asyncio.new_event_loop())
+
+
+class BlockingRunPool:
+    """
+    Bounded thread pool for blocking engine calls such as `Runner.run_sync`.
+
+    At most `max_workers` calls run at once and up to `max_queue` more wait in the
+    executor queue. Callers beyond that wait for a slot, and give up with
+    `EngineOverloadedError` after `queue_timeout` seconds, so a burst of blocking turns
+    applies back-pressure instead of piling up unbounded work behind the event loop.
+
+    Cancelling the caller (deadline, disconnect) cannot stop a call that is already
+    running in a worker thread; only queued calls are dropped. A slot is therefore held
+    until the call really finishes, so `in_flight` and the bound include abandoned calls.
+    """
+
+    def __init__(self, max_workers: int = 8, max_queue: int = 32, queue_timeout: float = 30.0):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(max_workers + max_queue)
+        self.in_flight = 0
+        self.rejected = 0
+        self.abandoned = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="engine-sync",
+                initializer=_init_worker_loop,
+            )
+        return self._executor
+
+    async def run(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except TimeoutError:
+            self.rejected += 1
+            raise EngineOverloadedError(
+                f"No blocking engine worker free after {self.queue_timeout}s "
+                f"({self.max_workers} workers, {self.max_queue} queued)"
+            ) from None
+        self.in_flight += 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._get_executor().submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # Release when the worker is done with the call, not when the caller stops waiting.
+        future.add_done_callback(lambda _: self._release_threadsafe(loop))
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if future.running():
+                self.abandoned += 1
+                logger.warning("BlockingRunPool: caller cancelled; the running blocking call keeps its worker until it returns.")
+            raise
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+
+    def _release_threadsafe(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            pass  # The loop is closed (shutdown); nothing is waiting for the slot any more.
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "abandoned": self.abandoned,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+blocking_run_pool = BlockingRunPool(
+    max_workers=int(os.getenv("ENGINE_SYNC_WORKERS", "8")),
+    max_queue=int(os.getenv("ENGINE_SYNC_QUEUE_SIZE", "32")),
+    queue_timeout=float(os.getenv("ENGINE_SYNC_QUEUE_TIMEOUT_SECONDS", "30")),
+)
@@ -1,14 +1,28 @@
+import asyncio
+import json
 import logging
+import math
 import os
+import uuid
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from dapr.ext.fastapi import DaprActor # type: ignore
-from dapr.actor import ActorProxy, ActorId
+from dapr.actor import ActorProxy, ActorProxyFactory, ActorId
+
+from collections.abc import Awaitable, Callable
+from typing import Literal, TypeVar
 
 from pydantic import BaseModel
 
 from ambient_actor.actors.base_actor import BaseActor
+from ambient_actor.actors.cancellation import deadline_after, turn_cancellations
+from ambient_actor.agents.sync_runner import blocking_run_pool
+from ambient_actor.actors.dapr_clients import shared_dapr_client
 from ambient_actor.actors.interface import BaseActorInterface
+from ambient_actor.actors.metrics import MeteredStateSerializer, metrics
+from ambient_actor.actors.request_coalescing import idempotency_key, in_flight_requests
+from ambient_actor.actors.stream_hub import stream_hub, STREAM_CLOSED
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
@@ -17,12 +31,70 @@ app = FastAPI(title="DACA Ambient Agent", description="DACA Ambient Agent")
 # Add Dapr Actor Extension
 actor = DaprActor(app)
 
+T = TypeVar("T")
+
+# Default time budget for one actor call; clients can lower it with X-Request-Timeout.
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "120"))
+DISCONNECT_POLL_SECONDS = 0.5
+# ActorProxy.create() uses Dapr's 60s HTTP timeout. Proxies for engine turns outlast the
+# turn budget instead, so the actor reports "deadline_exceeded" itself rather than the
+# proxy giving up on a turn that is still running.
+TURN_PROXY_TIMEOUT_SECONDS = math.ceil(REQUEST_TIMEOUT_SECONDS) + 5
+
+
+def turn_proxy(actor_id: str) -> ActorProxy:
+    """Proxy for calls that run an engine turn under `turn_limits()`."""
+    factory = ActorProxyFactory(http_timeout_seconds=TURN_PROXY_TIMEOUT_SECONDS)
+    return ActorProxy.create("BaseActor", ActorId(actor_id), BaseActorInterface, factory)
+
+
+def turn_limits(timeout_seconds: float | None) -> dict[str, object]:
+    """
+    Time budget and cancel token passed to the actor so it can abort its engine call. The
+    budget is sent both as an absolute deadline, which also covers time spent queued behind
+    other turns, and as a relative timeout, which caps the turn if the clocks disagree.
+    """
+    timeout = REQUEST_TIMEOUT_SECONDS if timeout_seconds is None else min(timeout_seconds, REQUEST_TIMEOUT_SECONDS)
+    return {"deadline_at": deadline_after(timeout), "timeout_seconds": timeout, "cancel_token": str(uuid.uuid4())}
+
+
+async def until_disconnected(
+    request: Request, call: Awaitable[T], on_abandoned: Callable[[], object] | None = None
+) -> T:
+    """
+    Await an actor call, cancelling it if the HTTP client disconnects first. `on_abandoned`,
+    which should cancel the actor's engine call, runs when the client disconnects or the
+    call fails (e.g. the proxy timed out), since the actor may still be running the turn.
+    """
+    task = asyncio.ensure_future(call)
+    completed = False
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                result = task.result()
+                completed = True
+                return result
+            if await request.is_disconnected():
+                logging.info("Client disconnected, cancelling the actor call")
+                raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+        if not completed and on_abandoned is not None:
+            on_abandoned()
+
 
 class Message(BaseModel):
     role: str
     content: str
 
 
+class MessageBatch(BaseModel):
+    messages: list[Message]
+    mode: Literal["sequential", "coalesced"] = "sequential"
+
+
 # Register the actor
 @app.on_event("startup")
 async def startup():
@@ -32,19 +104,40 @@ async def startup():
     if api is None:
         raise HTTPException(status_code=500, detail="GEMINI_API_KEY is not set")
     logging.info("Starting up the Ambient Agent")
-    await actor.register_actor(BaseActor)
+    await actor.register_actor(BaseActor, state_serializer=MeteredStateSerializer(BaseActor.__name__))
     logging.info(f"Registered actor: {BaseActor.__name__}")
 
+@app.on_event("shutdown")
+async def shutdown():
+    await shared_dapr_client.close()
+    blocking_run_pool.shutdown()
+
 @app.get("/app-health")
 def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Actor runtime metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Core Actor APIs
 @app.post("/actor/{actor_id}/message")
-async def process_user_message(actor_id: str, message: Message):
-    """Process a message through the actor."""
+async def process_user_message(
+    actor_id: str,
+    message: Message,
+    request: Request,
+    request_id: str | None = Header(default=None, alias="X-Request-ID"),
+    request_timeout: float | None = Header(default=None, alias="X-Request-Timeout"),
+):
+    """
+    Process a message through the actor. Retries of a request (same content and
+    X-Request-ID) that is still in flight share one actor call; requests without
+    X-Request-ID are never merged. The engine call is cancelled after X-Request-Timeout
+    seconds, or when every client waiting on it has disconnected.
+    """
     try:
-        proxy = ActorProxy.create("BaseActor", ActorId(actor_id), BaseActorInterface)
+        proxy = turn_proxy(actor_id)
         engine_config = {
             "run_method": "run",
             "engine_type": "openai",
@@ -53,18 +146,164 @@ async def process_user_message(actor_id: str, message: Message):
             "tools": [],
             "model": "gemini/gemini-2.0-flash"
         }
+        message_data = message.model_dump()
+        request_key = idempotency_key(message_data, request_id)
+        limits = turn_limits(request_timeout)
         input_data = {
-            "message_data": message.model_dump(),
+            "message_data": message_data,
             "engine_config": engine_config,
-            "engine_type": "openai"
+            "engine_type": "openai",
+            "request_id": request_id,
+            # The actor treats an explicit key as a request id; a content-only key it derives itself.
+            "idempotency_key": request_key if request_id is not None else None,
+            **limits,
         }
-        logging.info(f"Processing message: {input_data}")
-        result = await proxy.ProcessMessage(input_data)
-        logging.info(f"Processed message: {result}")
+        # Message content and the returned conversation are not logged; they can be large and private.
+        logging.info(f"Processing message for actor {actor_id}: request {request_id}, {len(message.content)} chars")
+        cancel_token = str(limits["cancel_token"])
+        if request_key is None:
+            result = await until_disconnected(
+                request,
+                proxy.ProcessMessage(input_data),
+                on_abandoned=lambda: turn_cancellations.cancel(cancel_token),
+            )
+        else:
+            # The engine call is only cancelled once the shared call fails or no coalesced
+            # duplicate still waits on it.
+            result = await until_disconnected(
+                request,
+                in_flight_requests.run(
+                    actor_id,
+                    request_key,
+                    lambda: proxy.ProcessMessage(input_data),
+                    on_abandoned=lambda: turn_cancellations.cancel(cancel_token),
+                ),
+            )
+        logging.info(f"Processed message for actor {actor_id}: request {request_id}, status {(result or {}).get('status')}")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/actor/{actor_id}/messages")
+async def process_user_message_batch(
+    actor_id: str,
+    batch: MessageBatch,
+    request: Request,
+    request_timeout: float | None = Header(default=None, alias="X-Request-Timeout"),
+):
+    """Process a batch of messages through the actor in a single actor call."""
+    try:
+        proxy = turn_proxy(actor_id)
+        engine_config = {
+            "run_method": "run",
+            "engine_type": "openai",
+            "name": "DACA Agent",
+            "instructions": "You are a helpful assistant",
+            "tools": [],
+            "model": "gemini/gemini-2.0-flash"
+        }
+        input_data = {
+            "messages": [message.model_dump() for message in batch.messages],
+            "engine_config": engine_config,
+            "engine_type": "openai",
+            "mode": batch.mode,
+            **turn_limits(request_timeout),
+        }
+        logging.info(f"Processing batch of {len(batch.messages)} messages for actor {actor_id}")
+        cancel_token = str(input_data["cancel_token"])
+        result = await until_disconnected(
+            request, proxy.ProcessMessageBatch(input_data), on_abandoned=lambda: turn_cancellations.cancel(cancel_token)
+        )
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/actor/{actor_id}/message/stream")
+async def stream_user_message(
+    actor_id: str,
+    message: Message,
+    request_timeout: float | None = Header(default=None, alias="X-Request-Timeout"),
+):
+    """
+    Process a message through the actor and stream the response as Server-Sent Events.
+    Closing the event stream cancels the engine call.
+
+    Streaming is best-effort: deltas travel through the in-process stream hub, so they are
+    only delivered when Dapr places the actor on the replica serving this request. When the
+    actor runs elsewhere the stream carries the final event alone. The `X-Stream-Delivery`
+    header says so up front, and the final event's `delivery` field reports what happened:
+    "deltas" or "final_only".
+    """
+    stream_id = str(uuid.uuid4())
+    queue = stream_hub.subscribe(stream_id)
+    proxy = turn_proxy(actor_id)
+    engine_config = {
+        "run_method": "stream",
+        "engine_type": "openai",
+        "name": "DACA Agent",
+        "instructions": "You are a helpful assistant",
+        "tools": [],
+        "model": "gemini/gemini-2.0-flash"
+    }
+    input_data = {
+        "message_data": message.model_dump(),
+        "engine_config": engine_config,
+        "engine_type": "openai",
+        "stream_id": stream_id,
+        **turn_limits(request_timeout),
+    }
+    logging.info(f"Streaming message {stream_id} for actor {actor_id}")
+    call = asyncio.create_task(proxy.ProcessMessageStream(input_data))
+
+    def sse(event: dict) -> str:
+        return f"data: {json.dumps(event)}\n\n"
+
+    async def event_source():
+        try:
+            # Forward deltas as they arrive; stop when the actor closes the stream
+            # or the actor call returns without having published to this host.
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, call}, return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    break
+                event = getter.result()
+                if event is STREAM_CLOSED:
+                    break
+                yield sse(event)
+            while not queue.empty():
+                event = queue.get_nowait()
+                if event is not STREAM_CLOSED:
+                    yield sse(event)
+            try:
+                result = await call
+                if result and result.get("streamed") is False:
+                    logging.warning(
+                        f"Stream {stream_id}: actor {actor_id} is hosted on another replica; "
+                        "no deltas were delivered, sending the final result only"
+                    )
+                delivery = "deltas" if result and result.get("streamed") else "final_only"
+                yield sse({"type": "final", **(result or {}), "delivery": delivery})
+            except Exception as e:
+                # The actor may still be running the turn, e.g. after a proxy timeout.
+                turn_cancellations.cancel(str(input_data["cancel_token"]))
+                yield sse({"type": "error", "error_message": str(e)})
+        finally:
+            stream_hub.unsubscribe(stream_id, queue)
+            if not call.done():
+                # The client went away mid-stream.
+                call.cancel()
+                turn_cancellations.cancel(str(input_data["cancel_token"]))
+
+    return StreamingResponse(
+        event_source(), media_type="text/event-stream", headers={"X-Stream-Delivery": "best-effort"}
+    )
+
 @app.get("/actor/{actor_id}/profile")
 async def get_profile(actor_id: str):
     """Get the actor's profile and capabilities."""
@@ -75,6 +314,48 @@ async def get_profile(actor_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
+@app.get("/actor/{actor_id}/plans")
+async def list_goal_plans(
+    actor_id: str,
+    status: list[str] | None = Query(default=None),
+    include_terminal: bool = False,
+    offset: int = 0,
+    limit: int | None = None,
+):
+    """List the actor's goal plans, optionally filtered by status."""
+    try:
+        proxy = ActorProxy.create("BaseActor", ActorId(actor_id), BaseActorInterface)
+        plans = await proxy.ListGoalPlans({
+            "statuses": status,
+            "include_terminal": include_terminal,
+            "offset": offset,
+            "limit": limit
+        })
+        return plans
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/actor/{actor_id}/reviews")
+async def list_review_requests(
+    actor_id: str,
+    status: list[str] | None = Query(default=None),
+    assigned_to: str | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+):
+    """List the actor's human review requests (open ones unless `status` is given)."""
+    try:
+        proxy = ActorProxy.create("BaseActor", ActorId(actor_id), BaseActorInterface)
+        reviews = await proxy.ListReviewRequests({
+            "statuses": status,
+            "assigned_to": assigned_to,
+            "offset": offset,
+            "limit": limit
+        })
+        return reviews
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/actor/{actor_id}/history")
 async def get_conversation_history(actor_id: str):
     """Get the conversation history."""
@@ -84,3 +365,13 @@ async def get_conversation_history(actor_id: str):
         return history
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/actor/{actor_id}/history/page")
+async def get_conversation_page(actor_id: str, chunk_index: int | None = None):
+    """Get one page of the conversation history (latest page by default)."""
+    try:
+        proxy = ActorProxy.create("BaseActor", ActorId(actor_id), BaseActorInterface)
+        page = await proxy.GetConversationPage({"chunk_index": chunk_index})
+        return page
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,28 @@
+import pytest
+
+
+class InMemoryStateManager:
+    """The part of Dapr's `ActorStateManager` the actor helpers use, kept in a dict."""
+
+    def __init__(self):
+        self.state: dict[str, object] = {}
+
+    async def try_get_state(self, key: str) -> tuple[bool, object]:
+        return (key in self.state, self.state.get(key))
+
+    async def get_state(self, key: str) -> object:
+        return self.state[key]
+
+    async def set_state(self, key: str, value: object) -> None:
+        self.state[key] = value
+
+    async def remove_state(self, key: str) -> None:
+        del self.state[key]
+
+    async def try_remove_state(self, key: str) -> bool:
+        return self.state.pop(key, None) is not None
+
+
+@pytest.fixture
+def state_manager() -> InMemoryStateManager:
+    return InMemoryStateManager()
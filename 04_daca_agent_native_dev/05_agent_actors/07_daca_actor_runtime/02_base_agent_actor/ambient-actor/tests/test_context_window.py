@@ -0,0 +1,126 @@
+import pytest
+
+from ambient_actor.actors.context_window import ContextWindow, estimate_tokens
+from ambient_actor.actors.conversation_store import ConversationStore
+
+
+def conversation(count: int) -> list[dict]:
+    # 40-character messages: 14 estimated tokens each.
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i:02d} ".ljust(40, "x")}
+        for i in range(count)
+    ]
+
+
+async def window_for(state_manager, messages: list[dict], chunk_size: int = 8) -> ContextWindow:
+    store = ConversationStore(state_manager, chunk_size=chunk_size)
+    await store.append(messages)
+    return ContextWindow(state_manager, store)
+
+
+def summary_lines(context: dict) -> list[str]:
+    return [line for line in str(context["summary"]).split("\n") if line]
+
+
+@pytest.mark.asyncio
+async def test_window_fits_the_budget(state_manager):
+    messages = conversation(40)
+    window = await window_for(state_manager, messages)
+    context = await window.build(max_tokens=200, summary_max_tokens=50)
+    assert context["included_messages"] == 10
+    assert context["messages"][-10:] == messages[-10:]
+    assert context["token_estimate"] <= 200
+
+
+@pytest.mark.asyncio
+async def test_small_budget_still_keeps_the_latest_turn(state_manager):
+    messages = conversation(10)
+    window = await window_for(state_manager, messages)
+    context = await window.build(max_tokens=20, persist_summary=False)
+    assert context["messages"][-2:] == messages[-2:]
+    assert context["included_messages"] == 2
+
+
+@pytest.mark.asyncio
+async def test_latest_turn_across_chunks(state_manager):
+    messages = conversation(9) + [
+        {"type": "function_call", "call_id": "c1", "name": "lookup", "arguments": "{}"},
+        {"type": "function_call_output", "call_id": "c1", "output": "y" * 400},
+        {"role": "assistant", "content": "z" * 400},
+    ]
+    window = await window_for(state_manager, messages, chunk_size=4)
+    context = await window.build(max_tokens=40, persist_summary=False)
+    assert context["messages"][-4:] == messages[-4:]
+    assert context["messages"][-4]["role"] == "user"
+
+
+@pytest.mark.asyncio
+async def test_summary_budget_is_capped_by_max_tokens(state_manager):
+    messages = conversation(10)
+    window = await window_for(state_manager, messages)
+    pending = [{"role": "user", "content": "new question"}]
+    # The default 512-token summary budget alone exceeds max_tokens.
+    context = await window.build(pending=pending, max_tokens=100)
+    assert context["messages"][-1] == pending[0]
+    assert context["included_messages"] > 0
+    assert context["token_estimate"] <= 100
+
+
+@pytest.mark.asyncio
+async def test_summary_header_counts_against_the_summary_budget(state_manager):
+    # Long messages fold into full-width summary lines. Two of them fit in 105 tokens, but not with the header.
+    messages = [{**message, "content": message["content"].ljust(300, "x")} for message in conversation(10)]
+    window = await window_for(state_manager, messages)
+    context = await window.build(max_tokens=420, summary_max_tokens=105)
+    summary_message = context["messages"][0]
+    assert summary_message["role"] == "system"
+    assert estimate_tokens(summary_message) <= 105
+    assert context["token_estimate"] <= 420
+
+    # A summary stored under a larger budget is trimmed to this turn's budget.
+    state_manager.state["conversation_summary"] = {"text": "\n".join(["x" * 206] * 2), "covered": 7}
+    context = await window.build(max_tokens=420, summary_max_tokens=105)
+    assert summary_lines(context) == ["x" * 206]
+    assert estimate_tokens(context["messages"][0]) <= 105
+
+
+@pytest.mark.asyncio
+async def test_summary_is_folded_once_and_persisted(state_manager):
+    messages = conversation(40)
+    window = await window_for(state_manager, messages)
+    context = await window.build(max_tokens=200, summary_max_tokens=50)
+    lines = summary_lines(context)
+    assert lines[-1].startswith("assistant: message 29")
+    assert context["messages"][0]["role"] == "system"
+    assert state_manager.state["conversation_summary"]["covered"] == 30
+
+    # The same window again folds nothing new.
+    again = await window.build(max_tokens=200, summary_max_tokens=50)
+    assert again["summary"] == context["summary"]
+
+
+@pytest.mark.asyncio
+async def test_growing_window_drops_summary_lines_for_resent_messages(state_manager):
+    messages = conversation(40)
+    window = await window_for(state_manager, messages)
+    first = await window.build(max_tokens=400, summary_max_tokens=100)
+    assert len(summary_lines(first)) == 2
+
+    # One more message fits: its summary line goes, the older one stays.
+    wider = await window.build(max_tokens=414, summary_max_tokens=100)
+    window_start = 40 - wider["included_messages"]
+    assert window_start == 18
+    assert summary_lines(wider) == summary_lines(first)[:1]
+    assert state_manager.state["conversation_summary"]["covered"] == window_start
+
+    # Shrinking again re-folds the message that leaves the window.
+    narrow = await window.build(max_tokens=400, summary_max_tokens=100)
+    assert summary_lines(narrow) == summary_lines(first)
+
+
+@pytest.mark.asyncio
+async def test_preview_does_not_persist_the_summary(state_manager):
+    window = await window_for(state_manager, conversation(40))
+    context = await window.build(max_tokens=200, summary_max_tokens=50, persist_summary=False)
+    assert context["summary"]
+    assert "conversation_summary" not in state_manager.state
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+
+import pytest
+
+from ambient_actor.actors import dapr_clients
+from ambient_actor.actors.dapr_clients import SharedDaprClient
+
+
+class FakeDaprClient:
+    instances = 0
+
+    def __init__(self):
+        FakeDaprClient.instances += 1
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_client_is_created_once_and_waits_for_the_sidecar_off_the_loop(monkeypatch):
+    health_checks = []
+    FakeDaprClient.instances = 0
+    monkeypatch.setattr(dapr_clients, "DaprClient", FakeDaprClient)
+    monkeypatch.setattr(
+        dapr_clients.DaprHealth, "wait_until_ready", lambda: health_checks.append(threading.current_thread())
+    )
+    shared = SharedDaprClient()
+
+    clients = await asyncio.gather(*(shared.get() for _ in range(3)))
+    assert FakeDaprClient.instances == 1
+    assert all(client is clients[0] for client in clients)
+    assert health_checks and threading.main_thread() not in health_checks
+
+    await shared.close()
+    assert clients[0].closed
+
+
+@pytest.mark.asyncio
+async def test_calls_are_bounded_by_the_timeout():
+    shared = SharedDaprClient(default_timeout=0.01)
+    with pytest.raises(TimeoutError):
+        await shared.run(asyncio.Event().wait())
@@ -0,0 +1,98 @@
+import pytest
+
+from ambient_actor.actors import hitl_outbox
+from ambient_actor.actors.hitl_outbox import MAX_BACKOFF_SECONDS, MAX_PUBLISH_ATTEMPTS, HitlOutbox
+
+TOPIC = "hitl_requests_topic"
+
+
+def review_event(n: int, timestamp: str = "2026-01-01T00:00:00") -> dict[str, object]:
+    return {"review_request_id": f"review-{n}", "status": "flagged_for_review", "timestamp": timestamp}
+
+
+class FakePublisher:
+    def __init__(self, failing: set[str] | None = None):
+        self.failing = failing or set()
+        self.sent: list[tuple[str, dict[str, object], str]] = []
+
+    async def __call__(self, topic: str, data: dict[str, object], event_id: str) -> None:
+        if data["review_request_id"] in self.failing:
+            raise ConnectionError("sidecar unavailable")
+        self.sent.append((topic, data, event_id))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(hitl_outbox.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.mark.asyncio
+async def test_retried_event_is_queued_once(state_manager):
+    outbox = HitlOutbox(state_manager)
+    event_id, needs_drain = await outbox.enqueue(TOPIC, review_event(1))
+    assert event_id is not None and needs_drain
+
+    # Same content with a new timestamp is the same event.
+    assert await outbox.enqueue(TOPIC, review_event(1, timestamp="2026-01-01T00:00:05")) == (None, False)
+    second_id, needs_drain = await outbox.enqueue(TOPIC, review_event(2))
+    assert second_id not in (None, event_id)
+    assert not needs_drain
+    assert await outbox.stats() == {"pending": 2, "published": 0, "dead_letter": 0}
+
+
+@pytest.mark.asyncio
+async def test_drain_publishes_in_batches(state_manager, clock):
+    outbox = HitlOutbox(state_manager)
+    for n in range(5):
+        await outbox.enqueue(TOPIC, review_event(n))
+    publish = FakePublisher()
+
+    assert await outbox.drain(publish, batch_size=3) == {"published": 3, "failed": 0, "remaining": 2}
+    assert state_manager.state["hitl_outbox"]["drain_scheduled"]
+    assert await outbox.drain(publish, batch_size=3) == {"published": 2, "failed": 0, "remaining": 0}
+    assert not state_manager.state["hitl_outbox"]["drain_scheduled"]
+
+    assert [data["review_request_id"] for _, data, _ in publish.sent] == [f"review-{n}" for n in range(5)]
+    # A published event is not queued again.
+    assert await outbox.enqueue(TOPIC, review_event(0)) == (None, False)
+
+
+@pytest.mark.asyncio
+async def test_failed_events_back_off_then_move_to_dead_letter(state_manager, clock):
+    outbox = HitlOutbox(state_manager)
+    await outbox.enqueue(TOPIC, review_event(1))
+    await outbox.enqueue(TOPIC, review_event(2))
+    publish = FakePublisher(failing={"review-1"})
+
+    assert await outbox.drain(publish) == {"published": 1, "failed": 1, "remaining": 1}
+    (entry,) = state_manager.state["hitl_outbox"]["pending"].values()
+    assert entry["attempts"] == 1
+    assert entry["next_attempt_at"] == clock[0] + 2
+    assert entry["last_error"] == "sidecar unavailable"
+
+    # Not due yet, so nothing is published.
+    assert await outbox.drain(publish) == {"published": 0, "failed": 0, "remaining": 1}
+
+    for attempt in range(2, MAX_PUBLISH_ATTEMPTS + 1):
+        clock[0] = entry["next_attempt_at"]
+        await outbox.drain(publish)
+        entry = next(iter(state_manager.state["hitl_outbox"]["pending"].values()), entry)
+        if attempt < MAX_PUBLISH_ATTEMPTS:
+            assert entry["next_attempt_at"] == clock[0] + min(2.0**attempt, MAX_BACKOFF_SECONDS)
+
+    assert await outbox.stats() == {"pending": 0, "published": 1, "dead_letter": 1}
+    assert not state_manager.state["hitl_outbox"]["drain_scheduled"]
+
+
+@pytest.mark.asyncio
+async def test_recovered_publisher_drains_the_retried_event(state_manager, clock):
+    outbox = HitlOutbox(state_manager)
+    event_id, _ = await outbox.enqueue(TOPIC, review_event(1))
+    await outbox.drain(FakePublisher(failing={"review-1"}))
+
+    clock[0] += 2
+    publish = FakePublisher()
+    assert await outbox.drain(publish) == {"published": 1, "failed": 0, "remaining": 0}
+    assert publish.sent == [(TOPIC, review_event(1), event_id)]
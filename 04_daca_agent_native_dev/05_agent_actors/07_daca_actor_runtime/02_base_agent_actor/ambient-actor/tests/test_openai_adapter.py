@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+import pytest
+
+from ambient_actor.agents.openai_adapter import OpenAIEngineAdapter
+from ambient_actor.agents.response_cache import MemoryResponseCache
+
+REPLY = {"role": "assistant", "content": "Done."}
+
+
+def cached_engine() -> tuple[OpenAIEngineAdapter, list]:
+    engine = OpenAIEngineAdapter(response_cache=MemoryResponseCache(), cache_namespace="test")
+    engine.agent = SimpleNamespace(tools=[])  # type: ignore[assignment]
+    runs = []
+
+    async def run(input_text, run_method, context=None):
+        runs.append(input_text)
+        conversation = [{"role": "user", "content": input_text}] if isinstance(input_text, str) else list(input_text)
+        return {"conversation": [*conversation, REPLY], "run_method": run_method, "final_output": "Done."}
+
+    engine._run = run  # type: ignore[method-assign]
+    return engine, runs
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_keeps_this_requests_input():
+    engine, runs = cached_engine()
+    await engine.process_input([{"role": "user", "content": "ok"}], "run")
+
+    result = await engine.process_input([{"role": "user", "content": "  ok\n"}], "run")
+    assert len(runs) == 1
+    assert result["cached"] is True
+    assert result["conversation"] == [{"role": "user", "content": "  ok\n"}, REPLY]
+    assert result["final_output"] == "Done."
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_for_a_bare_string_input():
+    engine, runs = cached_engine()
+    await engine.process_input("ok", "run")
+    result = await engine.process_input("ok ", "run")
+    assert len(runs) == 1
+    assert result["conversation"] == [{"role": "user", "content": "ok "}, REPLY]
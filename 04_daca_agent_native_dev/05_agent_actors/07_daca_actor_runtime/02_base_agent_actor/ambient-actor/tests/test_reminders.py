@@ -0,0 +1,45 @@
+import pytest
+
+from ambient_actor.actors.reminders import ReminderRegistry, reminder_handler
+
+
+class BaseHandlers:
+    def __init__(self):
+        self.calls: list[tuple[str, str]] = []
+
+    @reminder_handler("daily_digest")
+    async def _on_daily_digest(self, name: str, task_data: dict) -> None:
+        self.calls.append(("base", name))
+
+    @reminder_handler(prefix="poll_")
+    async def _on_poll(self, name: str, task_data: dict) -> None:
+        self.calls.append(("base", name))
+
+
+class UndecoratedOverride(BaseHandlers):
+    async def _on_daily_digest(self, name: str, task_data: dict) -> None:
+        self.calls.append(("override", name))
+
+
+class RenamedOverride(BaseHandlers):
+    @reminder_handler(prefix="check_")
+    async def _on_poll(self, name: str, task_data: dict) -> None:
+        self.calls.append(("override", name))
+
+
+@pytest.mark.asyncio
+async def test_undecorated_override_receives_the_inherited_reminder():
+    actor = UndecoratedOverride()
+    registry = ReminderRegistry.from_class(UndecoratedOverride)
+    assert await registry.dispatch(actor, "daily_digest", {})
+    assert await registry.dispatch(actor, "poll_inbox", {})
+    assert actor.calls == [("override", "daily_digest"), ("base", "poll_inbox")]
+
+
+@pytest.mark.asyncio
+async def test_decorated_override_replaces_the_inherited_registration():
+    actor = RenamedOverride()
+    registry = ReminderRegistry.from_class(RenamedOverride)
+    assert await registry.dispatch(actor, "check_inbox", {})
+    assert not await registry.dispatch(actor, "poll_inbox", {})
+    assert actor.calls == [("override", "check_inbox")]
@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+
+from ambient_actor.actors import request_coalescing
+from ambient_actor.actors.request_coalescing import IdempotencyLog, InFlightRequests, idempotency_key, request_identity
+
+MESSAGE = {"role": "user", "content": "ok"}
+RESPONSE = {"status": "received", "conversation": [MESSAGE, {"role": "assistant", "content": "Done."}], "final_output": "Done."}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(request_coalescing.time, "time", lambda: now[0])
+    return now
+
+
+def test_requests_without_request_id_are_not_deduplicated_by_default():
+    assert idempotency_key(MESSAGE) is None
+    assert idempotency_key(MESSAGE, "req-1") == idempotency_key(MESSAGE, "req-1")
+    assert idempotency_key(MESSAGE, "req-1") != idempotency_key(MESSAGE, "req-2")
+
+
+def test_content_only_deduplication_is_opt_in(monkeypatch):
+    monkeypatch.setattr(request_coalescing, "CONTENT_WINDOW_SECONDS", 30.0)
+    assert idempotency_key(MESSAGE) == idempotency_key(dict(MESSAGE))
+    assert idempotency_key(MESSAGE) != idempotency_key(MESSAGE, "req-1")
+
+
+def test_explicit_key_without_request_id_counts_as_a_request_id():
+    assert request_identity(MESSAGE, explicit_key="client-key") == ("client-key", True)
+    assert request_identity(MESSAGE, "req-1") == (idempotency_key(MESSAGE, "req-1"), True)
+    assert request_identity(MESSAGE) == (None, False)
+
+
+@pytest.mark.asyncio
+async def test_explicit_key_response_is_kept_for_the_request_id_window(state_manager, clock, monkeypatch):
+    monkeypatch.setattr(request_coalescing, "CONTENT_WINDOW_SECONDS", 30.0)
+    log = IdempotencyLog(state_manager)
+    key, has_request_id = request_identity(MESSAGE, explicit_key="client-key")
+    await log.record(key, RESPONSE, has_request_id=has_request_id)
+    clock[0] += 31
+    assert await log.lookup(key) == RESPONSE
+
+
+@pytest.mark.asyncio
+async def test_replayed_response_matches_the_original(state_manager, clock):
+    log = IdempotencyLog(state_manager)
+    key = idempotency_key(MESSAGE, "req-1")
+    assert await log.lookup(key) is None
+    await log.record(key, RESPONSE, has_request_id=True)
+    assert await log.lookup(key) == RESPONSE
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_their_window(state_manager, clock, monkeypatch):
+    monkeypatch.setattr(request_coalescing, "CONTENT_WINDOW_SECONDS", 30.0)
+    monkeypatch.setattr(request_coalescing, "REQUEST_ID_WINDOW_SECONDS", 3600.0)
+    log = IdempotencyLog(state_manager)
+    by_content, by_request_id = idempotency_key(MESSAGE), idempotency_key(MESSAGE, "req-1")
+    await log.record(by_content, RESPONSE, has_request_id=False)
+    await log.record(by_request_id, RESPONSE, has_request_id=True)
+
+    clock[0] += 31
+    assert await log.lookup(by_content) is None
+    assert await log.lookup(by_request_id) == RESPONSE
+
+    clock[0] += 3600
+    assert await log.lookup(by_request_id) is None
+
+
+@pytest.mark.asyncio
+async def test_expired_and_oldest_responses_are_removed(state_manager, clock, monkeypatch):
+    monkeypatch.setattr(request_coalescing, "MAX_LOGGED_REQUESTS", 2)
+    log = IdempotencyLog(state_manager)
+    keys = [idempotency_key(MESSAGE, f"req-{n}") for n in range(3)]
+    for key in keys:
+        clock[0] += 1
+        await log.record(key, RESPONSE, has_request_id=True)
+    assert list(state_manager.state["idempotency_log"]) == keys[1:]
+    assert f"idempotency_{keys[0]}" not in state_manager.state
+
+    clock[0] += 3601
+    await log.record(keys[0], RESPONSE, has_request_id=True)
+    assert list(state_manager.state["idempotency_log"]) == keys[:1]
+    assert sorted(key for key in state_manager.state if key.startswith("idempotency_")) == sorted(
+        ["idempotency_log", f"idempotency_{keys[0]}"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_share_one_call():
+    requests = InFlightRequests()
+    calls = 0
+    release = asyncio.Event()
+
+    async def call() -> str:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "answer"
+
+    waiters = [asyncio.create_task(requests.run("actor-1", "key", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiters) == ["answer"] * 3
+    assert calls == 1
+    assert requests.coalesced == 2
+
+
+@pytest.mark.asyncio
+async def test_call_is_abandoned_only_when_every_waiter_leaves():
+    requests = InFlightRequests()
+    abandoned = []
+    started = asyncio.Event()
+
+    async def call() -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    first = asyncio.create_task(requests.run("actor-1", "key", call, on_abandoned=lambda: abandoned.append(True)))
+    second = asyncio.create_task(requests.run("actor-1", "key", call))
+    await started.wait()
+
+    first.cancel()
+    await asyncio.gather(first, return_exceptions=True)
+    assert abandoned == []
+
+    second.cancel()
+    await asyncio.gather(second, return_exceptions=True)
+    assert abandoned == [True]
+
+
+@pytest.mark.asyncio
+async def test_failed_shared_call_runs_on_abandoned_once():
+    requests = InFlightRequests()
+    abandoned = []
+    release = asyncio.Event()
+
+    async def call() -> None:
+        await release.wait()
+        raise TimeoutError("proxy timed out")
+
+    waiters = [
+        asyncio.create_task(requests.run("actor-1", "key", call, on_abandoned=lambda: abandoned.append(True)))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, TimeoutError) for result in results)
+    assert abandoned == [True]
@@ -0,0 +1,94 @@
+import pytest
+
+from ambient_actor.actors import state_codecs
+from ambient_actor.actors.state_codecs import (
+    CODEC_TAG,
+    STATE_CODECS,
+    CodecStateManager,
+    StateCodecMap,
+    codec_state_manager,
+    decode_state,
+    encode_state,
+    get_codec,
+)
+
+HISTORY = [
+    {"role": "user", "content": "Where is order 42?"},
+    {"type": "function_call", "call_id": "call_1", "name": "lookup_order", "arguments": '{"id": 42}'},
+    {"type": "function_call_output", "call_id": "call_1", "output": "Shipped", "attempt": 1, "score": 0.5},
+]
+
+
+def codec_manager(state_manager, patterns: dict[str, str], **options) -> CodecStateManager:
+    return CodecStateManager(state_manager, StateCodecMap(patterns), **options)
+
+
+@pytest.mark.parametrize("name", sorted(STATE_CODECS))
+def test_codecs_round_trip(name):
+    stored = encode_state(HISTORY, STATE_CODECS[name])
+    if name == "json":
+        assert stored is HISTORY
+    else:
+        assert stored[CODEC_TAG] == name
+    assert decode_state(stored) == (HISTORY, name)
+
+
+def test_reads_detect_the_format_from_the_value():
+    assert decode_state(HISTORY) == (HISTORY, "json")
+    assert decode_state({"data": "not an envelope"}) == ({"data": "not an envelope"}, "json")
+    with pytest.raises(ValueError, match="not available"):
+        decode_state({CODEC_TAG: "lz4", "data": ""})
+
+
+@pytest.mark.asyncio
+async def test_envelopes_decode_with_the_codec_they_name(state_manager):
+    state_manager.state["conversation_chunk_0"] = encode_state(HISTORY, STATE_CODECS["protobuf"])
+    state = codec_manager(state_manager, {"conversation_chunk_*": "json"})
+    assert await state.get_state("conversation_chunk_0") == HISTORY
+    # Only legacy JSON is migrated; an envelope stays in the codec it was written with.
+    assert state_manager.state["conversation_chunk_0"][CODEC_TAG] == "protobuf"
+
+
+@pytest.mark.asyncio
+async def test_legacy_json_is_migrated_on_read(state_manager):
+    state_manager.state["conversation_chunk_0"] = HISTORY
+    state_manager.state["profile"] = {"name": "agent"}
+    state = codec_manager(state_manager, {"conversation_chunk_*": "protobuf"})
+
+    assert await state.try_get_state("conversation_chunk_0") == (True, HISTORY)
+    assert state_manager.state["conversation_chunk_0"][CODEC_TAG] == "protobuf"
+    assert await state.get_state("profile") == {"name": "agent"}
+    assert state_manager.state["profile"] == {"name": "agent"}
+    assert await state.try_get_state("missing") == (False, None)
+
+
+@pytest.mark.asyncio
+async def test_migration_can_be_turned_off(state_manager):
+    state_manager.state["conversation_chunk_0"] = HISTORY
+    state = codec_manager(state_manager, {"conversation_chunk_*": "protobuf"}, migrate_on_read=False)
+    assert await state.get_state("conversation_chunk_0") == HISTORY
+    assert state_manager.state["conversation_chunk_0"] is HISTORY
+
+
+@pytest.mark.asyncio
+async def test_writes_use_the_first_matching_pattern(state_manager):
+    state = codec_manager(state_manager, {"conversation_chunk_meta": "json", "conversation_chunk_*": "protobuf"})
+    await state.set_state("conversation_chunk_meta", {"chunks": 1})
+    await state.set_state("conversation_chunk_0", HISTORY)
+    assert state_manager.state["conversation_chunk_meta"] == {"chunks": 1}
+    assert state_manager.state["conversation_chunk_0"][CODEC_TAG] == "protobuf"
+    assert await state.get_state("conversation_chunk_0") == HISTORY
+
+
+def test_missing_codecs_fall_back_to_the_nearest_available(monkeypatch):
+    available = {name: codec for name, codec in STATE_CODECS.items() if name in ("json", "protobuf")}
+    monkeypatch.setattr(state_codecs, "STATE_CODECS", available)
+    assert get_codec("protobuf+zstd").name == "protobuf"
+    assert get_codec("msgpack+zstd").name == "json"
+    with pytest.raises(ValueError, match="Unknown state codec"):
+        get_codec("lz4")
+
+
+def test_without_patterns_the_state_manager_is_unwrapped(state_manager):
+    assert codec_state_manager(state_manager, {}) is state_manager
+    assert isinstance(codec_state_manager(state_manager, {"knowledge_*": "json"}), CodecStateManager)
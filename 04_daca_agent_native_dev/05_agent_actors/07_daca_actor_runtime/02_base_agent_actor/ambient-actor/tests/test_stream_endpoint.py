@@ -0,0 +1,50 @@
+import asyncio
+import importlib
+import json
+
+from fastapi.testclient import TestClient
+
+from ambient_actor.actors.stream_hub import stream_hub
+
+# `ambient_actor.main` is shadowed by the package's `main()` entry point.
+main = importlib.import_module("ambient_actor.main")
+
+FINAL = {"status": "received", "final_output": "Done."}
+
+
+class FakeProxy:
+    """Answers ProcessMessageStream the way a local or a remote actor placement does."""
+
+    def __init__(self, local: bool):
+        self.local = local
+
+    async def ProcessMessageStream(self, input_data: dict) -> dict:
+        stream_id = input_data["stream_id"]
+        if self.local:
+            stream_hub.publish(stream_id, {"type": "delta", "delta": "Do"})
+            stream_hub.publish(stream_id, {"type": "delta", "delta": "ne."})
+            stream_hub.close(stream_id)
+        await asyncio.sleep(0)
+        # On another replica the hub has no subscriber for this stream, so nothing is published.
+        return {**FINAL, "streamed": self.local}
+
+
+def stream(monkeypatch, local: bool):
+    monkeypatch.setattr(main, "turn_proxy", lambda actor_id: FakeProxy(local))
+    client = TestClient(main.app)
+    response = client.post("/actor/user-1/message/stream", json={"role": "user", "content": "ok"})
+    events = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+    return response, events
+
+
+def test_remote_placement_sends_the_final_event_only(monkeypatch):
+    response, events = stream(monkeypatch, local=False)
+    assert response.headers["X-Stream-Delivery"] == "best-effort"
+    assert events == [{"type": "final", **FINAL, "streamed": False, "delivery": "final_only"}]
+
+
+def test_local_placement_forwards_deltas_before_the_final_event(monkeypatch):
+    response, events = stream(monkeypatch, local=True)
+    assert response.headers["X-Stream-Delivery"] == "best-effort"
+    assert [event["type"] for event in events] == ["delta", "delta", "final"]
+    assert events[-1]["delivery"] == "deltas"
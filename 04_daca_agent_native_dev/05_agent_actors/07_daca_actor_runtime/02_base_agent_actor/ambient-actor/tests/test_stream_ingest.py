@@ -0,0 +1,117 @@
+import base64
+
+import pytest
+
+from ambient_actor.actors.stream_ingest import StreamIngestError, StreamReassembler, decode_chunk
+
+
+def reassembler(state_manager, **limits) -> StreamReassembler:
+    return StreamReassembler(state_manager, **{"part_size": 8, "max_stream_bytes": 64, "max_out_of_order": 3, **limits})
+
+
+async def send(reassembler: StreamReassembler, chunks: dict[int, bytes], order: list[int]) -> list[str]:
+    last = max(chunks)
+    statuses = []
+    for seq in order:
+        progress = await reassembler.add_chunk("s1", seq, chunks[seq], seq == last, {"content_type": "text/plain"})
+        statuses.append(progress["status"])
+    return statuses
+
+
+CHUNKS = {0: b"hello ", 1: b"chunked ", 2: b"stream ", 3: b"world"}
+PAYLOAD = b"".join(CHUNKS[seq] for seq in sorted(CHUNKS))
+
+
+@pytest.mark.asyncio
+async def test_in_order_stream_completes(state_manager):
+    streams = reassembler(state_manager)
+    assert await send(streams, CHUNKS, [0, 1, 2, 3]) == ["buffered", "buffered", "buffered", "complete"]
+    data, metadata = await streams.assemble("s1")
+    assert data == PAYLOAD
+    assert metadata == {"content_type": "text/plain"}
+
+
+@pytest.mark.asyncio
+async def test_out_of_order_chunks_are_parked_until_the_gap_closes(state_manager):
+    streams = reassembler(state_manager)
+    assert await send(streams, CHUNKS, [2, 3, 1]) == ["buffered", "buffered", "buffered"]
+    assert "stream_s1_pending_2" in state_manager.state
+    assert await send(streams, CHUNKS, [0]) == ["complete"]
+    assert not any("_pending_" in key for key in state_manager.state)
+    data, _ = await streams.assemble("s1")
+    assert data == PAYLOAD
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_acknowledged_and_dropped(state_manager):
+    streams = reassembler(state_manager)
+    assert await send(streams, CHUNKS, [0, 0, 2, 2]) == ["buffered", "duplicate", "buffered", "duplicate"]
+    assert await send(streams, CHUNKS, [1, 3]) == ["buffered", "complete"]
+    await streams.assemble("s1")
+    # The completed stream's tombstone still recognizes late redeliveries.
+    assert await send(streams, CHUNKS, [1]) == ["duplicate"]
+
+
+@pytest.mark.asyncio
+async def test_parts_are_bounded_and_referenced_by_the_manifest(state_manager):
+    streams = reassembler(state_manager)
+    await send(streams, CHUNKS, [0, 1, 2, 3])
+    manifest = await streams.complete("s1")
+    assert manifest["size"] == len(PAYLOAD)
+    assert manifest["part_keys"] == ["stream_s1_part_0", "stream_s1_part_1"]
+    # A part is sealed by the chunk that fills it, so it holds at most part_size + one chunk.
+    for key in manifest["part_keys"]:
+        assert len(base64.b64decode(state_manager.state[key])) < streams.part_size + 8
+    assert b"".join([part async for part in streams.iter_parts("s1")]) == PAYLOAD
+
+    await streams.discard("s1")
+    assert not any("_part_" in key for key in state_manager.state)
+
+
+@pytest.mark.asyncio
+async def test_chunk_too_far_ahead_is_rejected(state_manager):
+    streams = reassembler(state_manager, max_out_of_order=1)
+    with pytest.raises(StreamIngestError, match="too far ahead"):
+        await streams.add_chunk("s1", 2, b"x", False)
+
+
+@pytest.mark.asyncio
+async def test_oversized_stream_is_rejected(state_manager):
+    streams = reassembler(state_manager, max_stream_bytes=10)
+    await streams.add_chunk("s1", 0, b"x" * 8, False)
+    with pytest.raises(StreamIngestError, match="exceeds 10 bytes"):
+        await streams.add_chunk("s1", 1, b"x" * 8, False)
+
+
+@pytest.mark.asyncio
+async def test_chunk_past_the_last_one_is_rejected(state_manager):
+    streams = reassembler(state_manager)
+    await streams.add_chunk("s1", 1, b"end", True)
+    with pytest.raises(StreamIngestError, match="past the last chunk"):
+        await streams.add_chunk("s1", 2, b"more", False)
+
+
+@pytest.mark.asyncio
+async def test_chunks_past_the_last_one_are_removed_on_completion(state_manager):
+    streams = reassembler(state_manager)
+    # Chunk 3 is parked before the sender marks chunk 1 as the last one.
+    await streams.add_chunk("s1", 3, b"stray", False)
+    await streams.add_chunk("s1", 0, b"hello ", False)
+    assert (await streams.add_chunk("s1", 1, b"world", True))["status"] == "complete"
+
+    manifest = await streams.complete("s1")
+    assert manifest["size"] == len(b"hello world")
+    assert not any("_pending_" in key for key in state_manager.state)
+    assert state_manager.state["stream_s1_meta"]["pending"] == []
+
+    # A chunk arriving after completion is acknowledged without being stored.
+    assert (await streams.add_chunk("s1", 4, b"late", False))["status"] == "duplicate"
+    assert not any("_pending_" in key for key in state_manager.state)
+    assert b"".join([part async for part in streams.iter_parts("s1")]) == b"hello world"
+
+
+def test_decode_chunk_accepts_bytes_and_base64():
+    assert decode_chunk(b"raw") == b"raw"
+    assert decode_chunk(base64.b64encode(b"raw").decode("ascii")) == b"raw"
+    with pytest.raises(StreamIngestError):
+        decode_chunk("not base64!")
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+
+import pytest
+
+from ambient_actor.agents.sync_runner import BlockingRunPool, EngineOverloadedError
+
+
+async def wait_for(condition, timeout: float = 2.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_results_and_errors_pass_through():
+    pool = BlockingRunPool(max_workers=2, max_queue=0)
+
+    def fail():
+        raise ValueError("boom")
+
+    assert await pool.run(sum, [1, 2, 3]) == 6
+    with pytest.raises(ValueError, match="boom"):
+        await pool.run(fail)
+    await wait_for(lambda: pool.in_flight == 0)
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_keeps_the_slot_until_the_call_returns():
+    pool = BlockingRunPool(max_workers=1, max_queue=0, queue_timeout=0.05)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_call() -> str:
+        started.set()
+        release.wait(5)
+        return "done"
+
+    caller = asyncio.create_task(pool.run(blocking_call))
+    await wait_for(started.is_set)
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+
+    # The worker is still busy, so the slot is still taken.
+    assert pool.stats()["in_flight"] == 1
+    assert pool.stats()["abandoned"] == 1
+    with pytest.raises(EngineOverloadedError):
+        await pool.run(blocking_call)
+
+    release.set()
+    await wait_for(lambda: pool.in_flight == 0)
+    assert await pool.run(lambda: "next") == "next"
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_call_releases_its_slot_at_once():
+    pool = BlockingRunPool(max_workers=1, max_queue=1)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_call() -> None:
+        started.set()
+        release.wait(5)
+
+    running = asyncio.create_task(pool.run(blocking_call))
+    await wait_for(started.is_set)
+    queued = asyncio.create_task(pool.run(lambda: "never runs"))
+    await wait_for(lambda: pool.in_flight == 2)
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    await wait_for(lambda: pool.in_flight == 1)
+    assert pool.stats()["abandoned"] == 0
+
+    release.set()
+    await running
+    await wait_for(lambda: pool.in_flight == 0)
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_worker_loops_get_their_own_litellm_http_clients():
+    # Engines are shared between the main loop and the worker loops; this relies on LiteLLM
+    # caching its HTTP clients per event loop.
+    import litellm
+    from litellm.llms.custom_httpx.http_handler import get_async_httpx_client
+
+    async def client():
+        return get_async_httpx_client(llm_provider=litellm.LlmProviders.GEMINI)
+
+    def client_in_worker_loop():
+        return asyncio.get_event_loop().run_until_complete(client())
+
+    pool = BlockingRunPool(max_workers=1, max_queue=0)
+    main_client = await client()
+    assert await client() is main_client
+    worker_client = await pool.run(client_in_worker_loop)
+    assert worker_client is not main_client
+    assert await pool.run(client_in_worker_loop) is worker_client
+    pool.shutdown()
@@ -0,0 +1,93 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from ambient_actor.actors.base_actor import BaseActor
+from ambient_actor.actors.cancellation import TurnCancellations, TurnDeadlineExceeded
+from ambient_actor.main import REQUEST_TIMEOUT_SECONDS, TURN_PROXY_TIMEOUT_SECONDS, turn_limits, until_disconnected
+
+
+class FakeRequest:
+    def __init__(self, disconnected: bool = False):
+        self.disconnected = disconnected
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+def begin_turn(input: dict) -> tuple[bool, float | None]:
+    actor = SimpleNamespace()
+    expired = BaseActor._begin_turn_limits(actor, input)  # type: ignore[arg-type]
+    return expired, actor._turn_deadline_at
+
+
+def test_turn_proxy_outlasts_the_turn_budget():
+    assert TURN_PROXY_TIMEOUT_SECONDS > REQUEST_TIMEOUT_SECONDS
+    limits = turn_limits(REQUEST_TIMEOUT_SECONDS * 2)
+    assert limits["timeout_seconds"] == REQUEST_TIMEOUT_SECONDS
+
+
+def test_relative_budget_caps_a_deadline_from_a_clock_that_runs_ahead():
+    expired, deadline_at = begin_turn({"deadline_at": time.time() + 3600, "timeout_seconds": 5})
+    assert not expired
+    assert deadline_at == pytest.approx(time.time() + 5, abs=1)
+
+
+def test_deadline_passed_while_queued_skips_the_turn():
+    expired, _ = begin_turn({"deadline_at": time.time() - 1, "timeout_seconds": 5})
+    assert expired
+    assert begin_turn({}) == (False, None)
+
+
+@pytest.mark.asyncio
+async def test_completed_call_is_not_cancelled():
+    abandoned = []
+
+    async def call() -> str:
+        return "answer"
+
+    assert await until_disconnected(FakeRequest(), call(), on_abandoned=lambda: abandoned.append(True)) == "answer"
+    assert abandoned == []
+
+
+@pytest.mark.asyncio
+async def test_failed_call_cancels_the_turn():
+    abandoned = []
+
+    async def call() -> str:
+        raise TimeoutError("proxy timed out")
+
+    with pytest.raises(TimeoutError):
+        await until_disconnected(FakeRequest(), call(), on_abandoned=lambda: abandoned.append(True))
+    assert abandoned == [True]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_the_call_and_the_turn():
+    abandoned = []
+    call = asyncio.ensure_future(asyncio.Event().wait())
+
+    with pytest.raises(HTTPException) as error:
+        await until_disconnected(FakeRequest(disconnected=True), call, on_abandoned=lambda: abandoned.append(True))
+    assert error.value.status_code == 499
+    await asyncio.sleep(0)
+    assert call.cancelled()
+    assert abandoned == [True]
+
+
+@pytest.mark.asyncio
+async def test_passed_deadline_ends_the_turn():
+    with pytest.raises(TurnDeadlineExceeded):
+        async with TurnCancellations().guard("token", time.time() + 0.05):
+            await asyncio.sleep(1)
+
+
+@pytest.mark.asyncio
+async def test_engine_timeout_before_the_deadline_is_not_a_deadline():
+    with pytest.raises(TimeoutError) as raised:
+        async with TurnCancellations().guard("token", time.time() + 60):
+            raise TimeoutError("read timed out")
+    assert not isinstance(raised.value, TurnDeadlineExceeded)